@@ -0,0 +1,76 @@
+"""
+Trip log size and load time: CSV vs. the chunked binary format (raw and zlib).
+Loading means getting every sensor column back as numbers.
+
+    python benchmarks/bench_binary_log.py
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from binary_log import BinaryLogReader, csv_to_binary
+from data_logger import DataLogger
+
+ROWS = 100000
+SENSORS = ["RPM", "SPEED", "COOLANT_TEMP", "CONTROL_MODULE_VOLTAGE", "ENGINE_LOAD", "THROTTLE_POS", "MAF",
+           "INTAKE_TEMP", "FUEL_LEVEL", "BAROMETRIC_PRESSURE"]
+
+
+def write_csv(log_dir):
+    logger = DataLogger(flush_rows=1000)
+    logger.set_directory(log_dir)
+    logger.start_new_log(SENSORS)
+    for i in range(ROWS):
+        logger.write_row({key: round(800 + (i * (n + 1)) % 5000 * 0.37, 2) for n, key in enumerate(SENSORS)})
+    logger.close()
+    return logger.current_filepath
+
+
+def load_csv(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        cols = [header.index(k) for k in SENSORS]
+        columns = {k: [] for k in SENSORS}
+        for row in reader:
+            for key, col in zip(SENSORS, cols):
+                columns[key].append(float(row[col]) if row[col] else None)
+    return columns
+
+
+def load_binary(path):
+    with BinaryLogReader(path) as log:
+        return log.columns_for(SENSORS)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    log_dir = tempfile.mkdtemp()
+    try:
+        csv_path = write_csv(log_dir)
+        raw_path = csv_to_binary(csv_path, os.path.join(log_dir, "raw.obdb"), compression=None)
+        zlib_path = csv_to_binary(csv_path, os.path.join(log_dir, "zlib.obdb"), compression="zlib")
+
+        print(f"{ROWS:,} rows x {len(SENSORS)} sensors")
+        print(f"{'':<16}{'size MB':>10}{'load ms':>10}")
+        for name, path, loader in (("csv", csv_path, load_csv),
+                                   ("binary", raw_path, load_binary),
+                                   ("binary + zlib", zlib_path, load_binary)):
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<16}{size:>10.2f}{timed(loader, path) * 1000:>10.1f}")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Per-sample cost of decoding standard PIDs: python-obd's decoder + magnitude (a pint Quantity
+per sample) vs. the table-driven decoders in pid_decoders.
+
+    python benchmarks/bench_decoders.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import obd
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+from pid_decoders import STANDARD_DECODERS
+
+SAMPLES = 20000
+PAYLOADS = {"RPM": b"\x1A\xF8", "SPEED": b"\x32", "COOLANT_TEMP": b"\x5A", "MAF": b"\x04\xD2"}
+
+
+def python_obd_decode(cmd, message):
+    value = cmd([message]).value.magnitude
+    return round(value, 2) if isinstance(value, float) else value
+
+
+def main():
+    print(f"{'sensor':<16}{'python-obd us':>15}{'table us':>11}{'speedup':>10}")
+    for key, payload in PAYLOADS.items():
+        cmd = obd.commands[key]
+        message = Message([])
+        message.data = bytearray([0x41, cmd.pid]) + bytearray(payload)
+        message.ecu = ECU.ENGINE
+        decoder = STANDARD_DECODERS[key]
+
+        t_obd = timeit.timeit(lambda: python_obd_decode(cmd, message), number=SAMPLES) / SAMPLES * 1e6
+        t_table = timeit.timeit(lambda: decoder(message.data[2:]), number=SAMPLES) / SAMPLES * 1e6
+        print(f"{key:<16}{t_obd:>15.2f}{t_table:>11.2f}{t_obd / t_table:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fleet report throughput over a synthetic corpus of 1,000 trip logs, serial vs. the process pool.
+
+    python benchmarks/bench_fleet_report.py
+"""
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from data_logger import DataLogger
+from fleet_report import find_logs, analyze_logs
+
+LOGS = 1000
+ROWS = 1200  # one minute at 20 Hz per log
+SENSORS = ["RPM", "SPEED", "COOLANT_TEMP", "CONTROL_MODULE_VOLTAGE", "ENGINE_LOAD", "THROTTLE_POS", "MAF",
+           "INTAKE_TEMP"]
+
+
+def make_corpus(log_dir):
+    rng = random.Random(1)
+    for n in range(LOGS):
+        logger = DataLogger(flush_rows=ROWS)
+        logger.set_directory(log_dir)
+        logger.set_format("binary" if n % 4 == 0 else "csv")
+        logger.start_new_log(SENSORS)
+        hot = rng.random() < 0.1
+        for i in range(ROWS):
+            speed = int(max(0.0, 60 + 40 * math.sin(i / 200 + n)))
+            logger.write_row({"RPM": 800 + speed * 28 + rng.randint(-15, 15), "SPEED": speed,
+                              "COOLANT_TEMP": 88 + (i // 40 if hot else 0), "CONTROL_MODULE_VOLTAGE": 14.1,
+                              "ENGINE_LOAD": 20 + speed // 3, "THROTTLE_POS": 10 + speed // 5,
+                              "MAF": round(speed / 4 + 2, 1), "INTAKE_TEMP": 30})
+        logger.close()
+        # Logs started in the same second would share a name
+        os.rename(logger.current_filepath, os.path.join(log_dir, f"{n:04d}_" + os.path.basename(logger.current_filepath)))
+
+
+def main():
+    log_dir = tempfile.mkdtemp()
+    try:
+        make_corpus(log_dir)
+        paths = find_logs(log_dir)
+        print(f"{len(paths)} logs, {ROWS} rows each, {os.cpu_count()} cores")
+        serial = None
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            started = time.perf_counter()
+            analyze_logs(paths, workers=workers)
+            elapsed = time.perf_counter() - started
+            serial = serial or elapsed
+            print(f"{workers:>3} workers {elapsed:>8.2f} s  {len(paths) / elapsed:>7.0f} logs/s  {serial / elapsed:.1f}x")
+            workers *= 2
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-sample cost of pro-pack formula evaluation: the old eval() path vs. formulas compiled once,
+and the vectorized batch decoder used to re-decode captured responses.
+
+    python benchmarks/bench_formula.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from formula_compiler import compile_formula, signed
+
+FORMULAS = ["A-40", "((A*256)+B)/100", "signed(A)*0.75", "max(A, B) - min(C, D)"]
+DATA = b'\x62\x11\x4F\x0A\x14\x33'
+SAMPLES = 100000
+BATCH_ROWS = 500000
+
+
+def legacy_eval(formula, data_bytes):
+    variables = {}
+    for i, byte_val in enumerate(data_bytes):
+        char_code = 65 + i
+        if char_code > 90: break
+        variables[chr(char_code)] = byte_val
+    try:
+        allowed_names = {"min": min, "max": max, "abs": abs, "signed": signed}
+        allowed_names.update(variables)
+        return float(eval(formula, {"__builtins__": {}}, allowed_names))
+    except:
+        return None
+
+
+def main():
+    print(f"{'formula':<24}{'eval() us/sample':>18}{'compiled us/sample':>20}{'speedup':>10}")
+    for formula in FORMULAS:
+        compiled = compile_formula(formula)
+        assert compiled(DATA) == legacy_eval(formula, DATA)
+
+        before = timeit.timeit(lambda: legacy_eval(formula, DATA), number=SAMPLES) / SAMPLES * 1e6
+        after = timeit.timeit(lambda: compiled(DATA), number=SAMPLES) / SAMPLES * 1e6
+        print(f"{formula:<24}{before:>18.2f}{after:>20.3f}{before / after:>9.1f}x")
+
+    matrix = np.random.default_rng(0).integers(0, 256, size=(BATCH_ROWS, len(DATA)), dtype=np.uint8)
+    print(f"\nRe-decoding {BATCH_ROWS} captured responses:")
+    print(f"{'formula':<24}{'row loop s':>18}{'batch s':>20}{'speedup':>10}")
+    rows = [bytes(r) for r in matrix.tolist()]
+    for formula in FORMULAS:
+        compiled = compile_formula(formula)
+        loop = timeit.timeit(lambda: [compiled(r) for r in rows], number=1)
+        batch = timeit.timeit(lambda: compiled.evaluate_batch(matrix), number=1)
+        print(f"{formula:<24}{loop:>18.3f}{batch:>20.4f}{loop / batch:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Drawing a whole two-hour trip (20 Hz) on the Live Graph: every sample vs. the min-max
+decimated pyramid query (about one point per pixel).
+
+    python benchmarks/bench_graph_pyramid.py
+"""
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from pyramid import SeriesPyramid
+
+SAMPLES = 144000
+PIXELS = 800
+ROUNDS = 10
+
+
+def draw(fig, line, x, y):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        line.set_data(x, y)
+        fig.canvas.draw()
+    return (time.perf_counter() - started) / ROUNDS
+
+
+def main():
+    t = np.arange(SAMPLES) * 0.05
+    v = 2000 + 1500 * np.sin(t / 60) + np.random.default_rng(1).normal(0, 30, SAMPLES)
+    series = SeriesPyramid()
+    started = time.perf_counter()
+    series.extend(t, v)
+    build = time.perf_counter() - started
+
+    fig, ax = plt.subplots(figsize=(PIXELS / 100, 4), dpi=100)
+    line, = ax.plot([], [])
+    ax.set_xlim(t[0], t[-1])
+    ax.set_ylim(0, 4000)
+
+    full = draw(fig, line, t, v)
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        x, y = series.query(t[0], t[-1], PIXELS)
+    query = (time.perf_counter() - started) / ROUNDS
+    pyramid = draw(fig, line, x, y)
+
+    print(f"pyramid build  {build * 1e3:8.1f} ms for {SAMPLES} samples")
+    print(f"{'all samples':<15}{full * 1e3:8.1f} ms/frame  {SAMPLES} points")
+    print(f"{'pyramid':<15}{(query + pyramid) * 1e3:8.1f} ms/frame  {len(x)} points "
+          f"({full / (query + pyramid):.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
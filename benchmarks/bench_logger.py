@@ -0,0 +1,61 @@
+"""
+Trip logging throughput: the old open/append/close per row vs. the buffered DataLogger
+(time spent in write_row by the caller, and rows/second until everything is on disk).
+
+    python benchmarks/bench_logger.py
+"""
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from data_logger import DataLogger
+
+ROWS = 20000
+SENSORS = ["RPM", "SPEED", "COOLANT_TEMP", "CONTROL_MODULE_VOLTAGE", "ENGINE_LOAD", "THROTTLE_POS", "MAF"]
+SAMPLE = {"RPM": 1726.0, "SPEED": 50.0, "COOLANT_TEMP": 90, "CONTROL_MODULE_VOLTAGE": 14.02,
+          "ENGINE_LOAD": 25.1, "THROTTLE_POS": 50.2, "MAF": 12.34}
+
+
+def legacy_write_row(path, data_dict):
+    row_data = [time.strftime("%H:%M:%S")]
+    for key in SENSORS:
+        row_data.append(data_dict.get(key, ""))
+    with open(path, mode='a', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(row_data)
+
+
+def main():
+    log_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(log_dir, "legacy.csv")
+        start = time.perf_counter()
+        for _ in range(ROWS):
+            legacy_write_row(path, SAMPLE)
+        legacy = time.perf_counter() - start
+
+        logger = DataLogger()
+        logger.set_directory(log_dir)
+        logger.start_new_log(SENSORS)
+        start = time.perf_counter()
+        for _ in range(ROWS):
+            logger.write_row(SAMPLE)
+        caller = time.perf_counter() - start
+        logger.close()
+        total = time.perf_counter() - start
+
+        print(f"{'':<28}{'rows/s':>12}")
+        print(f"{'open/append per row':<28}{ROWS / legacy:>12,.0f}")
+        print(f"{'buffered (write_row call)':<28}{ROWS / caller:>12,.0f}")
+        print(f"{'buffered (until on disk)':<28}{ROWS / total:>12,.0f}")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
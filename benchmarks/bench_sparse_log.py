@@ -0,0 +1,68 @@
+"""
+Trip log size: dense rows vs. sparse (deadband) logging of the same simulated 20 Hz drive.
+
+    python benchmarks/bench_sparse_log.py
+"""
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from data_logger import DataLogger
+
+ROWS = 36000  # 30 minutes at 20 Hz
+DEADBANDS = {"RPM": 25, "CONTROL_MODULE_VOLTAGE": 0.05, "MAF": 0.5, "ENGINE_LOAD": 2}
+
+
+def drive():
+    rng = random.Random(1)
+    fuel = 62.0
+    for i in range(ROWS):
+        t = i / 20.0
+        speed = int(max(0.0, 60 + 40 * math.sin(t / 90)))
+        rpm = round(800 + speed * 28 + rng.uniform(-15, 15), 2)
+        fuel -= 0.0004
+        yield {
+            "RPM": rpm,
+            "SPEED": speed,
+            "COOLANT_TEMP": 88 + int(t // 600) % 3,
+            "CONTROL_MODULE_VOLTAGE": round(14.0 + rng.uniform(-0.03, 0.03), 3),
+            "ENGINE_LOAD": round(20 + speed * 0.3 + rng.uniform(-1, 1), 1),
+            "MAF": round(rpm / 150 + rng.uniform(-0.2, 0.2), 2),
+            "FUEL_LEVEL": round(round(fuel * 2.55) / 2.55, 2),
+            "BAROMETRIC_PRESSURE": 101,
+            "VAG_DIST_SINCE_REGEN": round(t * speed / 3600.0 / 10, 1),
+        }
+
+
+def record(log_dir, sparse):
+    logger = DataLogger(flush_rows=1000)
+    logger.set_directory(log_dir)
+    logger.set_sparse(sparse, DEADBANDS)
+    rows = list(drive())
+    logger.start_new_log(list(rows[0]))
+    for row in rows:
+        logger.write_row(row)
+    logger.close()
+    return os.path.getsize(logger.current_filepath)
+
+
+def main():
+    log_dir = tempfile.mkdtemp()
+    try:
+        dense = record(log_dir, False)
+        # Both logs may get the same trip_log_<second> name
+        os.remove(os.path.join(log_dir, os.listdir(log_dir)[0]))
+        sparse = record(log_dir, True)
+        print(f"{'dense':<8}{dense / 1e6:>8.2f} MB")
+        print(f"{'sparse':<8}{sparse / 1e6:>8.2f} MB  ({dense / sparse:.1f}x smaller)")
+    finally:
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request Python overhead of a query: python-obd's ELM327 send_and_parse vs. the in-project
+ElmTransport, for a single PID and a 6-PID multi-frame answer. Both talk to an in-memory port
+that answers instantly, so the numbers are pure Python cost (write, read-to-prompt, parse, decode).
+
+    python benchmarks/bench_transport.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import obd
+from obd.elm327 import ELM327
+from obd.protocols import ISO_15765_4_11bit_500k
+from obd.utils import OBDStatus
+
+from elm_transport import ElmTransport
+
+SAMPLES = 20000
+RESPONSES = {
+    "single PID": b"7E8 04 41 0C 1A F8 \r\r>",
+    "6 PIDs": b"7E8 10 10 41 0C 1A F8 0D 32 \r7E8 21 05 7B 04 80 11 40 42 \r7E8 22 30 D4 00 00 00 00 00 \r\r>",
+}
+
+
+class LoopbackPort:
+    """Answers every write with a fixed reply, like an adapter with zero bus latency."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.pending = b""
+
+    @property
+    def in_waiting(self):
+        return len(self.pending)
+
+    def write(self, data):
+        self.pending = self.reply
+
+    def read(self, size=1):
+        chunk, self.pending = self.pending[:size], self.pending[size:]
+        return chunk
+
+    def reset_input_buffer(self):
+        self.pending = b""
+
+    flushInput = reset_input_buffer
+
+    def flush(self):
+        pass
+
+
+def python_obd_interface(port, protocol):
+    # A connected ELM327 without running its serial init sequence
+    elm = ELM327.__new__(ELM327)
+    elm._ELM327__port = port
+    elm._ELM327__protocol = protocol
+    elm._ELM327__status = OBDStatus.CAR_CONNECTED
+    elm._ELM327__low_power = False
+    elm.timeout = 10
+    return elm
+
+
+def main():
+    protocol = ISO_15765_4_11bit_500k(["7E8 06 41 00 BE 3F A8 13"])
+    raw_cmd = obd.OBDCommand("RAW", "Raw", b"01", 0, lambda m: m)
+
+    print(f"{'response':<14}{'python-obd us':>15}{'transport us':>15}{'speedup':>10}")
+    for name, reply in RESPONSES.items():
+        elm = python_obd_interface(LoopbackPort(reply), protocol)
+        transport = ElmTransport(LoopbackPort(reply), ecu_map=protocol.ecu_map)
+
+        t_obd = timeit.timeit(lambda: raw_cmd(elm.send_and_parse(b"010C")), number=SAMPLES) / SAMPLES * 1e6
+        t_fast = timeit.timeit(lambda: raw_cmd(transport.request(b"010C")), number=SAMPLES) / SAMPLES * 1e6
+        print(f"{name:<14}{t_obd:>15.1f}{t_fast:>15.1f}{t_obd / t_fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,618 @@
+import bisect
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from replay_engine import parse_time, ReplayEngine, TimeIndex, INDEX_STEP, SECONDS_PER_DAY
+from log_segments import TripManifest, MANIFEST_SUFFIX
+from zone_map import ZoneMap, compare
+
+BINARY_SUFFIX = ".obdb"
+FILE_MAGIC = b"PYOBDBL1"
+# magic, header json length
+FILE_HEADER = struct.Struct("<8sI")
+CHUNK_MAGIC = b"CHNK"
+# magic, row count, codec, stored payload length
+CHUNK_HEADER = struct.Struct("<4sIII")
+DEFAULT_CHUNK_ROWS = 1024
+
+# Per-chunk compression; zstd only when the zstandard package is installed
+CODECS = {None: 0, "zlib": 1, "zstd": 2}
+
+# Row stamp columns written before the sensors, as in the CSV log
+TIME_COLUMNS = [("Epoch", "f8"), ("Mono_ns", "i8")]
+SAMPLE_TIME_SUFFIX = "_ns"
+SENSOR_DTYPE = "f4"
+# Missing values: NaN for float columns, 0 for integer (ns) columns
+INT_MISSING = 0
+
+
+def available_codecs():
+    return [name for name in CODECS if name != "zstd" or zstandard is not None]
+
+
+def _compress(codec, data):
+    if codec == 1: return zlib.compress(data, 6)
+    if codec == 2: return zstandard.ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompress(codec, data):
+    if codec == 1: return zlib.decompress(data)
+    if codec == 2:
+        if zstandard is None:
+            raise ValueError("zstd compressed log, but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def _pad8(n):
+    return -n % 8
+
+
+def forward_fill(values):
+    """Float column with each NaN replaced by the last value before it (leading NaNs stay)."""
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    idx = np.where(missing, 0, np.arange(len(values)))
+    np.maximum.accumulate(idx, out=idx)
+    return values[idx]
+
+
+def is_binary_log(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(FILE_MAGIC)) == FILE_MAGIC
+    except OSError:
+        return False
+
+
+class BinaryLogWriter:
+    """
+    Writes a trip log as typed columns in chunks of `chunk_rows` rows:
+
+        file header | json header | chunk header | column 0 | column 1 | ... | chunk header | ...
+
+    The json header lists every column (name, numpy dtype, sensor name and unit). Inside a
+    chunk each column is stored contiguously, 8-byte aligned when uncompressed, so a reader
+    can map the file and view the columns without copying. Chunks are only written whole;
+    close() writes the last, shorter one.
+    """
+
+    def __init__(self, path, sensor_keys, sensor_info=None, sample_times=False,
+                 chunk_rows=DEFAULT_CHUNK_ROWS, compression=None):
+        if compression == "zstd" and zstandard is None:
+            # Same fallback as compressed CSV segments: a trip is never lost to a missing package
+            print("Binary Log Warning: zstandard is not installed, compressing with zlib")
+            compression = "zlib"
+        if compression not in CODECS:
+            raise ValueError(f"Unsupported log compression: {compression}")
+
+        self.path = path
+        self.sensor_keys = list(sensor_keys)
+        self.sample_times = sample_times
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.codec = CODECS[compression]
+        self.rows_written = 0
+
+        sensor_info = sensor_info or {}
+        columns = [{"name": name, "type": dtype} for name, dtype in TIME_COLUMNS]
+        for key in self.sensor_keys:
+            info = sensor_info.get(key) or ()
+            columns.append({"name": key, "type": SENSOR_DTYPE,
+                            "label": info[0] if len(info) > 0 else key,
+                            "unit": info[1] if len(info) > 1 else ""})
+        if sample_times:
+            columns += [{"name": key + SAMPLE_TIME_SUFFIX, "type": "i8"} for key in self.sensor_keys]
+        # Wide columns first keeps every column aligned to its item size
+        columns.sort(key=lambda c: -np.dtype(c["type"]).itemsize)
+        self.columns = columns
+        self._dtypes = [np.dtype(c["type"]) for c in columns]
+        self._order = [c["name"] for c in columns]
+
+        header = json.dumps({
+            "version": 1,
+            "created": time.time(),
+            "compression": compression,
+            "chunk_rows": self.chunk_rows,
+            "columns": columns,
+        }).encode()
+        header += b" " * _pad8(FILE_HEADER.size + len(header))
+
+        self._pending = []
+        self._file = open(path, "wb")
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, len(header)))
+        self._file.write(header)
+        self._file.flush()
+
+    def write_rows(self, rows):
+        """rows: (epoch, mono_ns, values, sample_times) as queued by DataLogger."""
+        self._pending.extend(rows)
+        while len(self._pending) >= self.chunk_rows:
+            self._write_chunk(self._pending[:self.chunk_rows])
+            del self._pending[:self.chunk_rows]
+
+    @property
+    def size(self):
+        return self._file.tell()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._pending:
+            self._write_chunk(self._pending)
+            self._pending = []
+        self._file.close()
+        self._file = None
+
+    def _column_values(self, rows):
+        data = {"Epoch": [r[0] for r in rows], "Mono_ns": [r[1] for r in rows]}
+        for i, key in enumerate(self.sensor_keys):
+            data[key] = [_to_float(r[2][i]) for r in rows]
+        if self.sample_times:
+            for i, key in enumerate(self.sensor_keys):
+                data[key + SAMPLE_TIME_SUFFIX] = [_to_int(r[3][i]) if r[3] else INT_MISSING
+                                                  for r in rows]
+        return data
+
+    def _write_chunk(self, rows):
+        data = self._column_values(rows)
+        parts = []
+        for name, dtype in zip(self._order, self._dtypes):
+            parts.append(np.asarray(data[name], dtype=dtype).tobytes())
+        payload = b"".join(parts)
+        payload = _compress(self.codec, payload)
+        payload += b"\0" * _pad8(len(payload))
+
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(rows), self.codec, len(payload)))
+        self._file.write(payload)
+        self.rows_written += len(rows)
+
+
+def _to_float(value):
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_int(value):
+    if value is None or value == "":
+        return INT_MISSING
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return INT_MISSING
+
+
+class BinaryLogReader:
+    """
+    Memory-maps a BinaryLogWriter file. Uncompressed chunks are returned as read-only views
+    into the map; compressed chunks are decompressed on access. A chunk cut short by a
+    crash is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+
+        try:
+            magic, header_len = FILE_HEADER.unpack_from(self._map, 0)
+            if magic != FILE_MAGIC:
+                raise ValueError(f"{path} is not a binary trip log")
+            self.header = json.loads(self._map[FILE_HEADER.size:FILE_HEADER.size + header_len])
+        except (struct.error, ValueError):
+            self.close()
+            raise ValueError(f"{path} is not a binary trip log")
+
+        self.columns = self.header["columns"]
+        self.column_names = [c["name"] for c in self.columns]
+        self._dtypes = [np.dtype(c["type"]) for c in self.columns]
+
+        names = set(self.column_names)
+        self.sensor_keys = [c["name"] for c in self.columns if c["type"] == SENSOR_DTYPE]
+        self.sample_times = all(k + SAMPLE_TIME_SUFFIX in names for k in self.sensor_keys) and bool(self.sensor_keys)
+        self.sensor_info = {c["name"]: (c.get("label", c["name"]), c.get("unit", ""))
+                            for c in self.columns if c["type"] == SENSOR_DTYPE}
+
+        self.chunks = self._scan(FILE_HEADER.size + header_len)
+        self.row_count = sum(rows for _, rows, _, _ in self.chunks)
+
+    def _scan(self, offset):
+        chunks = []
+        size = len(self._map)
+        while offset + CHUNK_HEADER.size <= size:
+            magic, rows, codec, length = CHUNK_HEADER.unpack_from(self._map, offset)
+            start = offset + CHUNK_HEADER.size
+            if magic != CHUNK_MAGIC or start + length > size:
+                break
+            chunks.append((start, rows, codec, length))
+            offset = start + length
+        return chunks
+
+    def chunk(self, i):
+        """{column name: numpy array} for chunk `i`."""
+        start, rows, codec, length = self.chunks[i]
+        if codec:
+            buf = _decompress(codec, self._map[start:start + length])
+            start = 0
+        else:
+            buf = self._map
+
+        out = {}
+        for name, dtype in zip(self.column_names, self._dtypes):
+            out[name] = np.frombuffer(buf, dtype=dtype, count=rows, offset=start)
+            start += rows * dtype.itemsize
+        return out
+
+    def column(self, name):
+        """The whole column across all chunks (a view when the log has a single raw chunk)."""
+        return self.columns_for([name])[name]
+
+    def columns_for(self, names, fill=False):
+        """
+        {name: whole column} for several columns, inflating each compressed chunk once.
+        fill forward-fills the sensor columns of sparse logs.
+        """
+        parts = {name: [] for name in names}
+        for chunk in self.iter_chunks():
+            for name in names:
+                parts[name].append(chunk[name])
+        out = {}
+        for name, arrays in parts.items():
+            if not arrays:
+                out[name] = np.empty(0, dtype=self._dtypes[self.column_names.index(name)])
+            else:
+                out[name] = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+            if fill and out[name].dtype.kind == "f":
+                out[name] = forward_fill(out[name])
+        return out
+
+    def iter_chunks(self):
+        for i in range(len(self.chunks)):
+            yield self.chunk(i)
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Column views are still alive; the map is released with the last of them
+                pass
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryReplayEngine(ReplayEngine):
+    """
+    ReplayEngine over a binary log, or a manifest of binary segments, read straight from
+    the mapped chunks: only the chunk being played is decoded, so a large log starts playing
+    without being converted first. The time index (first row of every second) is built from
+    the Epoch columns in the background, as the CSV sidecar is.
+    """
+
+    def __init__(self, path, speed=1.0):
+        super().__init__(path, speed)
+        self._readers = []
+        # (reader, chunk number) in play order, and the first row of each (plus the total)
+        self._chunks = []
+        self._chunk_rows = [0]
+        # (chunk position, [(epoch, values, sample times)]) of the chunk being played
+        self._decoded = None
+        self._row = 0
+        self._epochs = None
+
+    def open(self):
+        """Maps the log (or every segment). False when it is not a binary trip log."""
+        paths = [self.path]
+        try:
+            if TripManifest.is_manifest(self.path):
+                manifest = TripManifest.load(self.path)
+                if manifest.data.get("format", "csv") != "binary":
+                    return False
+                paths = manifest.segment_paths()
+            for path in paths:
+                self._readers.append(BinaryLogReader(path))
+        except (OSError, ValueError):
+            self._close()
+            return False
+        if not self._readers:
+            return False
+
+        for reader in self._readers:
+            for i, (_, rows, _, _) in enumerate(reader.chunks):
+                self._chunks.append((reader, i))
+                self._chunk_rows.append(self._chunk_rows[-1] + rows)
+        self.headers = list(self._readers[0].sensor_keys)
+        return True
+
+    def find_next(self, key, op, value, after=None):
+        """Same as ReplayEngine.find_next; chunks the zone map rules out are not decoded."""
+        index = self.index
+        if index is None or key not in self.headers:
+            return None
+        start = index.first_time + (self.position if after is None else after)
+        zones = self.zones
+        ranges = zones.time_ranges(key, op, value) if zones is not None else [(None, None)]
+        epochs = self._epochs
+
+        for c, (reader, i) in enumerate(self._chunks):
+            first, last = self._chunk_rows[c], self._chunk_rows[c + 1]
+            if first == last or epochs[last - 1] <= start:
+                continue
+            if not any((lo is None or lo <= epochs[last - 1]) and (hi is None or hi >= epochs[first])
+                       for lo, hi in ranges):
+                continue
+            chunk = reader.chunk(i)
+            values = chunk[key].astype("f8")
+            with np.errstate(invalid="ignore"):
+                hit = (chunk["Epoch"] > start) & ~np.isnan(values) & compare(values, op, value)
+            if hit.any():
+                return float(chunk["Epoch"][np.argmax(hit)]) - index.first_time
+        return None
+
+    # --- Source hooks ---
+    def _is_open(self):
+        return bool(self._readers)
+
+    def _seek_to(self, row):
+        self._row = row
+
+    def _close(self):
+        for reader in self._readers:
+            reader.close()
+        self._readers = []
+        self._decoded = None
+
+    def _load_index(self):
+        try:
+            epochs = np.concatenate([reader.column("Epoch") for reader in self._readers])
+        except (ValueError, TypeError, AttributeError):
+            # Stopped (and unmapped) while reading
+            return
+        if not len(epochs):
+            return
+        first, last = float(epochs[0]), float(epochs[-1])
+        seconds = first + np.arange(int((last - first) // INDEX_STEP) + 1) * INDEX_STEP
+        offsets = array("Q", np.searchsorted(epochs, seconds, "left").tolist())
+        offsets.append(len(epochs))
+        self._epochs = epochs
+        self.zones = ZoneMap.load(self.path)
+        self.index = TimeIndex(offsets, first, last)
+
+    def _decode(self, c):
+        reader, i = self._chunks[c]
+        chunk = reader.chunk(i)
+        keys = reader.sensor_keys
+        # float32 cells read back with the digits they were logged with (as the CSV copy has)
+        columns = [[float(format(v, ".7g")) for v in chunk[k].tolist()] for k in keys]
+        if reader.sample_times:
+            monos = chunk["Mono_ns"].tolist()
+            sample_cols = [chunk[k + SAMPLE_TIME_SUFFIX].tolist() for k in keys]
+
+        rows = []
+        for r, epoch in enumerate(chunk["Epoch"].tolist()):
+            row_ns = int(epoch * 1e9)
+            values = {}
+            times = {}
+            for key, col in zip(keys, columns):
+                if col[r] == col[r]:
+                    values[key] = col[r]
+                    times[key] = row_ns
+            if reader.sample_times:
+                # Acquisition times are monotonic; shift them onto the row's epoch
+                for key, col in zip(keys, sample_cols):
+                    if key in values and col[r] != INT_MISSING:
+                        times[key] = row_ns + col[r] - monos[r]
+            rows.append((epoch, values, times))
+        return rows
+
+    def _read_row(self):
+        with self._lock:
+            if not self._readers or self._row >= self._chunk_rows[-1]:
+                return None
+            row = self._row
+            self._row += 1
+            c = bisect.bisect_right(self._chunk_rows, row) - 1
+            if self._decoded is None or self._decoded[0] != c:
+                self._decoded = (c, self._decode(c))
+            t, values, times = self._decoded[1][row - self._chunk_rows[c]]
+            if t != t:
+                return False
+            return self._generation, t, (values, times)
+
+    def _apply(self, generation, t, row):
+        values, times = row
+        with self._lock:
+            # Rows read before a seek are dropped
+            if generation != self._generation:
+                return
+            self._values.update(values)
+            self._sample_times.update(times)
+            self._position = t
+
+
+# --- CSV conversion ---
+def _default_output(path, suffix):
+    return os.path.splitext(path)[0] + suffix
+
+
+def _format_float(value):
+    return "" if value != value else format(float(value), ".7g")
+
+
+def binary_to_csv(src, dst=None, fill=False):
+    """
+    Writes the DataLogger CSV equivalent of a binary log. Returns the CSV path.
+    fill writes every sensor on every row (forward-filled) for tools that do not expect sparse logs.
+    """
+    dst = dst or _default_output(src, ".csv")
+    with BinaryLogReader(src) as reader, open(dst, "w", newline="") as f:
+        writer = csv.writer(f)
+        keys = reader.sensor_keys
+        sample_cols = [k + SAMPLE_TIME_SUFFIX for k in keys] if reader.sample_times else []
+        writer.writerow(["Timestamp", "Epoch", "Mono_ns"] + keys + sample_cols)
+
+        clock_second, clock = None, ""
+        carry = [np.nan] * len(keys)
+        for chunk in reader.iter_chunks():
+            epochs = chunk["Epoch"].tolist()
+            monos = chunk["Mono_ns"].tolist()
+            values = [chunk[k] for k in keys]
+            if fill:
+                # Continue the fill across chunk boundaries from the previous chunk's last value
+                values = [forward_fill(np.concatenate(([last], col)))[1:] for last, col in zip(carry, values)]
+                carry = [col[-1] if len(col) else last for last, col in zip(carry, values)]
+            values = [col.tolist() for col in values]
+            times = [chunk[c].tolist() for c in sample_cols]
+            for i, epoch in enumerate(epochs):
+                if int(epoch) != clock_second:
+                    clock_second = int(epoch)
+                    clock = time.strftime("%H:%M:%S", time.localtime(epoch))
+                row = [clock, f"{epoch:.6f}", monos[i]]
+                row += [_format_float(col[i]) for col in values]
+                row += ["" if col[i] == INT_MISSING else col[i] for col in times]
+                writer.writerow(row)
+    return dst
+
+
+def as_csv(path):
+    """
+    CSV version of a binary log for CSV-only readers, converted once and reused while up to
+    date. A manifest of binary segments gives a manifest of their CSV copies.
+    """
+    if TripManifest.is_manifest(path):
+        return _manifest_as_csv(path)
+    dst = _default_output(path, ".csv")
+    if not os.path.exists(dst) or os.path.getmtime(dst) < os.path.getmtime(path):
+        binary_to_csv(path, dst)
+    return dst
+
+
+def _manifest_as_csv(path):
+    manifest = TripManifest.load(path)
+    if manifest.data.get("format", "csv") != "binary":
+        return path
+
+    segments = []
+    for entry, segment in zip(manifest.segments, manifest.segment_paths()):
+        csv_path = as_csv(segment)
+        segments.append(dict(entry, file=os.path.basename(csv_path), bytes=os.path.getsize(csv_path),
+                             compressed=None))
+    dst = path[:-len(MANIFEST_SUFFIX)] + ".csv" + MANIFEST_SUFFIX
+    TripManifest(dst, dict(manifest.data, format="csv", segments=segments)).save()
+    return dst
+
+
+def _legacy_day_start(path):
+    # Old logs only have HH:MM:SS; take the date from trip_log_<epoch>.csv or the file time
+    match = re.search(r"trip_log_(\d+)", os.path.basename(path))
+    stamp = int(match.group(1)) if match else os.path.getmtime(path)
+    day = time.localtime(stamp)
+    return time.mktime((day.tm_year, day.tm_mon, day.tm_mday, 0, 0, 0, 0, 0, -1))
+
+
+def csv_to_binary(src, dst=None, compression="zlib", chunk_rows=DEFAULT_CHUNK_ROWS, sensor_info=None):
+    """Converts a DataLogger CSV (with or without Epoch/Mono_ns columns). Returns the binary path."""
+    dst = dst or _default_output(src, BINARY_SUFFIX)
+    with open(src, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip() for h in next(reader, [])]
+        if "Timestamp" not in header and "Epoch" not in header:
+            raise ValueError(f"{src} is not a PyOBD log (no Timestamp column)")
+
+        time_names = {"Timestamp", "Epoch", "Mono_ns"}
+        names = set(header)
+        keys = [h for h in header if h not in time_names
+                and not (h.endswith(SAMPLE_TIME_SUFFIX) and h[:-len(SAMPLE_TIME_SUFFIX)] in names)]
+        has_times = bool(keys) and all(k + SAMPLE_TIME_SUFFIX in names for k in keys)
+        key_cols = [header.index(k) for k in keys]
+        time_cols = [header.index(k + SAMPLE_TIME_SUFFIX) for k in keys] if has_times else []
+        epoch_col = header.index("Epoch") if "Epoch" in header else None
+        mono_col = header.index("Mono_ns") if "Mono_ns" in header else None
+        clock_col = header.index("Timestamp") if "Timestamp" in header else None
+
+        writer = BinaryLogWriter(dst, keys, sensor_info, has_times, chunk_rows, compression)
+        day_start = None if epoch_col is not None else _legacy_day_start(src)
+        day_offset = 0.0
+        last = None
+        batch = []
+        try:
+            for cells in reader:
+                try:
+                    if epoch_col is not None:
+                        epoch = float(cells[epoch_col])
+                    else:
+                        t = parse_time(cells[clock_col]) + day_offset
+                        if last is not None and t < last - SECONDS_PER_DAY / 2:
+                            day_offset += SECONDS_PER_DAY
+                            t += SECONDS_PER_DAY
+                        last = t
+                        epoch = day_start + t
+                    mono = _to_int(cells[mono_col]) if mono_col is not None else INT_MISSING
+                except (ValueError, IndexError):
+                    continue
+                values = [cells[c] if c < len(cells) else "" for c in key_cols]
+                times = [cells[c] if c < len(cells) else "" for c in time_cols] if has_times else None
+                batch.append((epoch, mono, values, times))
+                if len(batch) >= chunk_rows:
+                    writer.write_rows(batch)
+                    batch = []
+            writer.write_rows(batch)
+        finally:
+            writer.close()
+    return dst
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    fill = "--fill" in argv
+    argv = [a for a in argv if a != "--fill"]
+    if len(argv) < 2 or argv[0] not in ("to-csv", "to-binary"):
+        print("usage: python binary_log.py to-csv [--fill]|to-binary <log> [output]")
+        return 2
+    src, dst = argv[1], argv[2] if len(argv) > 2 else None
+    try:
+        out = binary_to_csv(src, dst, fill) if argv[0] == "to-csv" else csv_to_binary(src, dst)
+    except (OSError, ValueError) as e:
+        print(f"Conversion Error: {e}")
+        return 1
+    print(out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
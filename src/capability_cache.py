@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+
+CACHE_FILE = "vehicle_cache.json"
+
+
+class CapabilityCache:
+    """
+    Remembers, per vehicle (VIN), the protocol, the supported standard commands and which
+    pro-pack PIDs answered, plus which vehicle was last seen on each port.
+    Lets OBDHandler.connect skip protocol auto-detection and the supported-PID scan.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {"ports": {}, "vehicles": {}}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            data.setdefault("ports", {})
+            data.setdefault("vehicles", {})
+            return data
+        except Exception as e:
+            print(f"Error loading capability cache: {e}")
+            return {"ports": {}, "vehicles": {}}
+
+    def save(self):
+        with self._lock:
+            try:
+                with open(self.path, 'w') as f:
+                    json.dump(self.data, f, indent=4)
+            except Exception as e:
+                print(f"Error saving capability cache: {e}")
+
+    @staticmethod
+    def port_key(port_name):
+        return port_name if port_name else "Auto"
+
+    def lookup_port(self, port_name):
+        """Returns (vehicle_id, entry) for the vehicle last connected on this port, or (None, None)."""
+        vehicle_id = self.data["ports"].get(self.port_key(port_name))
+        entry = self.data["vehicles"].get(vehicle_id) if vehicle_id else None
+        if not entry:
+            return None, None
+        return vehicle_id, entry
+
+    def get(self, vehicle_id):
+        return self.data["vehicles"].get(vehicle_id)
+
+    def store(self, vehicle_id, port_name, protocol, command_names, pro_probes=None):
+        entry = self.data["vehicles"].get(vehicle_id, {})
+        entry["protocol"] = protocol
+        entry["commands"] = sorted(command_names)
+        entry.setdefault("pro_probes", {})
+        if pro_probes:
+            entry["pro_probes"].update(pro_probes)
+        entry["updated"] = int(time.time())
+
+        self.data["vehicles"][vehicle_id] = entry
+        self.data["ports"][self.port_key(port_name)] = vehicle_id
+        self.save()
+
+    def update_probes(self, vehicle_id, pro_probes):
+        """Replaces the vehicle's probe results with a session's, which started from the cached ones."""
+        entry = self.data["vehicles"].get(vehicle_id)
+        if entry is None:
+            return
+        entry["pro_probes"] = dict(pro_probes)
+        self.save()
+
+    def forget_port(self, port_name):
+        self.data["ports"].pop(self.port_key(port_name), None)
+        self.save()
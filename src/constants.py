@@ -55,15 +55,42 @@ STANDARD_SENSORS = {
     )
 }
 
-HIGH_PRIORITY_SENSORS = [
-    "RPM",
-    "SPEED",
-    "THROTTLE_POS",
-    "ENGINE_LOAD",
-    "CONTROL_MODULE_VOLTAGE",
+# Target refresh rate (Hz) per sensor for the polling scheduler.
+# Pro-pack sensors may declare their own rate as a 9th definition field.
+SENSOR_POLL_RATES = {
+    "RPM": 10,
+    "SPEED": 5,
+    "THROTTLE_POS": 10,
+    "ENGINE_LOAD": 5,
+    "CONTROL_MODULE_VOLTAGE": 2,
+    "MAF": 5,
+    "TIMING_ADVANCE": 2,
+    "COOLANT_TEMP": 0.5,
+    "INTAKE_TEMP": 0.5,
+    "RUN_TIME": 1,
+    "FUEL_LEVEL": 0.1,
+    "BAROMETRIC_PRESSURE": 0.1,
 
-    "BMW_BOOST_PRESSURE",
-    "BMW_RAIL_PRESSURE",
-    "F150L_HV_BATTERY_CURRENT",
-    "VW_HV_BATTERY_CURRENT"
-]
\ No newline at end of file
+    "BMW_BOOST_PRESSURE": 10,
+    "BMW_RAIL_PRESSURE": 10,
+    "F150L_HV_BATTERY_CURRENT": 10,
+    "VW_HV_BATTERY_CURRENT": 10
+}
+
+DEFAULT_POLL_RATE_HZ = 1.0
+# Sensors shown on the Live Graph are polled at least this fast
+GRAPH_POLL_RATE_HZ = 10
+# Per-sensor sample history kept in memory (config "history_minutes"); the polling loop
+# stores at most one sample per sensor per 50 ms cycle, which sizes the raw history
+HISTORY_MINUTES = 10
+MAX_SAMPLE_RATE_HZ = 20
+# Run Analysis judges each sensor by its median over this much recent history (seconds)
+ANALYSIS_WINDOW_SECONDS = 10
+# Live Graph time windows (seconds); None shows the whole trip
+GRAPH_WINDOWS = {"1 min": 60, "10 min": 600, "1 h": 3600, "Trip": None}
+# Dashboard/graph refresh rate (config "ui_fps"), independent of how fast sensors are polled
+UI_FPS = 20
+
+# Sparse trip logs write every sensor's current value at least this often (seconds), so
+# replay seeking only has to look this far back to have a value for every sensor.
+LOG_KEYFRAME_SECONDS = 10
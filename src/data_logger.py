@@ -1,47 +1,447 @@
 import csv
+import threading
 import time
 import os
 
+from binary_log import BinaryLogWriter, BINARY_SUFFIX
+from log_segments import TripManifest, SegmentCompressor, MANIFEST_SUFFIX, segment_name
+from zone_map import ZoneMapBuilder, zone_path, DEFAULT_BLOCK_ROWS
+from constants import LOG_KEYFRAME_SECONDS
+
+LOG_FORMATS = ("csv", "binary")
+
+
+class CsvSink:
+    """Writes queued rows as the DataLogger CSV: clock time, epoch, monotonic ns, values, sample times."""
+
+    def __init__(self, path, header):
+        self._file = open(path, mode='w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+        self._file.flush()
+        self._clock_second = None
+        self._clock = ""
+
+    @property
+    def size(self):
+        return self._file.tell()
+
+    def write_rows(self, rows):
+        out = []
+        for epoch, mono, values, times in rows:
+            second = int(epoch)
+            if second != self._clock_second:
+                self._clock_second = second
+                self._clock = time.strftime("%H:%M:%S", time.localtime(epoch))
+            row = [self._clock, f"{epoch:.6f}", mono] + values
+            if times is not None:
+                row += times
+            out.append(row)
+        self._writer.writerows(out)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
 
 class DataLogger:
-    def __init__(self):
+    """
+    Trip logger. write_row only stamps the row and appends it to an in-memory batch;
+    a writer thread drains the batch to a file kept open for the whole trip, either CSV
+    or the chunked columnar format of binary_log (log_format = "binary").
+
+    With rotation set, a trip is split into trip_log_<ts>.partNNN segments once a segment
+    reaches a size or age limit. Closed CSV segments are compressed in the background and
+    trip_log_<ts>.manifest.json lists the segments in order (see log_segments).
+
+    In sparse mode a value is only written when it moved more than the sensor's deadband
+    since it was last written; every keyframe_seconds (and at the start of each segment) a
+    keyframe row holds the current value of every sensor. Readers forward-fill empty cells.
+
+    Every row carries the clock time, the wall-clock epoch and time.monotonic_ns(). With
+    record_sample_times each sensor also gets a <KEY>_ns column holding the monotonic time
+    its value was acquired (OBDHandler.sample_times).
+
+    Next to each trip, trip_log_<ts>.zones.json keeps the min/max/count of every sensor per
+    block of zone_block_rows rows (see zone_map); 0 turns it off.
+    """
+
+    TIME_COLUMNS = ["Timestamp", "Epoch", "Mono_ns"]
+    SAMPLE_TIME_SUFFIX = "_ns"
+
+    # Flush policy: write out once this many rows are waiting, or after this long
+    DEFAULT_FLUSH_ROWS = 50
+    DEFAULT_FLUSH_MS = 1000
+
+    def __init__(self, flush_rows=DEFAULT_FLUSH_ROWS, flush_interval_ms=DEFAULT_FLUSH_MS):
         self.enabled = True
         self.log_dir = os.path.join(os.getcwd(), "logs")
         self.current_filepath = None
         self.active_headers = []
+        self.record_sample_times = False
+        self.log_format = "csv"
+        self.compression = "zlib"
+        self._sample_headers = False
+
+        # Rotation: 0/None disables a limit; segment_compression is "gzip", "zstd" or None
+        self.rotate_bytes = None
+        self.rotate_seconds = None
+        self.segment_compression = None
+        self.manifest_path = None
+        self._manifest = None
+        self._compressor = SegmentCompressor()
+        self._trip = None
+        self._segment = 0
+        self._segment_name = None
+        self._segment_rows = 0
+        self._segment_end = None
+        self._segment_opened = 0.0
+        self._sensor_info = None
+
+        # Optional TripStore that receives every flushed batch as well
+        self.trip_store = None
+        self.vehicle_id = None
+        self._trip_id = None
+        self._last_epoch = None
+
+        self.zone_block_rows = DEFAULT_BLOCK_ROWS
+        self._zones = None
+
+        self.sparse = False
+        self.deadbands = {}
+        self.keyframe_seconds = LOG_KEYFRAME_SECONDS
+        self._latest = {}
+        self._latest_times = {}
+        self._logged = {}
+        self._next_keyframe = 0.0
+        # Writer side: every column's last written value and sample time, so the first row of a
+        # new segment can be filled into a keyframe whatever was queued before the rotation
+        self._written_values = []
+        self._written_times = []
+        self._segment_keyframe = False
+
+        self.flush_rows = flush_rows
+        self.flush_interval_ms = flush_interval_ms
+
+        self._sink = None
+        self._pending = []
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._thread = None
+        self._running = False
 
         if not os.path.exists(self.log_dir):
             os.makedirs(self.log_dir)
 
-    def start_new_log(self, sensor_keys):
+    def set_flush_policy(self, flush_rows=None, flush_interval_ms=None):
+        with self._cond:
+            if flush_rows is not None:
+                self.flush_rows = max(1, int(flush_rows))
+            if flush_interval_ms is not None:
+                self.flush_interval_ms = max(1, int(flush_interval_ms))
+            self._cond.notify()
+
+    def set_format(self, log_format=None, compression=None):
+        """log_format: "csv" or "binary"; compression (binary only): None, "zlib" or "zstd". Applies to the next log."""
+        if log_format in LOG_FORMATS:
+            self.log_format = log_format
+        if compression is not None:
+            self.compression = None if compression == "none" else compression
+
+    def set_rotation(self, max_mb=None, max_minutes=None, compression=None):
+        """Starts a new segment every `max_mb` MB or `max_minutes` minutes. Applies to the next log."""
+        self.rotate_bytes = int(float(max_mb) * 1e6) if max_mb else None
+        self.rotate_seconds = float(max_minutes) * 60 if max_minutes else None
+        self.segment_compression = None if compression in (None, "none") else compression
+
+    def set_sparse(self, enabled, deadbands=None, keyframe_seconds=None):
+        """deadbands: {key: smallest change that gets written}; sensors not listed log any change."""
+        self.sparse = bool(enabled)
+        if deadbands is not None:
+            self.deadbands = {k: abs(float(v)) for k, v in deadbands.items()}
+        if keyframe_seconds:
+            self.keyframe_seconds = float(keyframe_seconds)
+        self._next_keyframe = 0.0
+
+    def set_trip_store(self, store, vehicle_id=None):
+        """Also writes every trip into `store` (a TripStore), or stops when None. Applies to the next log."""
+        self.trip_store = store
+        self.vehicle_id = vehicle_id
+
+    @property
+    def segmented(self):
+        return bool(self.rotate_bytes or self.rotate_seconds or self.segment_compression)
+
+    def start_new_log(self, sensor_keys, sensor_info=None):
+        """sensor_info: optional {key: (name, unit, ...)} stored in the binary log header."""
         if not sensor_keys:
             return
 
+        self.close()
         self.active_headers = sensor_keys
-        filename = f"trip_log_{int(time.time())}.csv"
-        self.current_filepath = os.path.join(self.log_dir, filename)
+        self._sample_headers = self.record_sample_times
+        self._sensor_info = sensor_info
+        self._trip = f"trip_log_{int(time.time())}"
+        self._latest = {}
+        self._latest_times = {}
+        self._logged = {}
+        self._next_keyframe = 0.0
+        self._written_values = [""] * len(sensor_keys)
+        self._written_times = [""] * len(sensor_keys)
+        self._segment_keyframe = False
+        self._segment = 0
+        self._manifest = None
+        self.manifest_path = None
 
         try:
-            with open(self.current_filepath, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Timestamp"] + sensor_keys)
+            if self.segmented:
+                self.manifest_path = os.path.join(self.log_dir, self._trip + MANIFEST_SUFFIX)
+                self._manifest = TripManifest.create(self.manifest_path, self._trip, self.log_format, sensor_keys)
+                self._open_segment()
+            else:
+                self.current_filepath = os.path.join(self.log_dir, self._trip + self._extension())
+                self._sink = self._open_sink(self.current_filepath)
         except Exception as e:
             print(f"Logging Init Error: {e}")
+            self._sink = None
+            self._manifest = None
+            return
+
+        self._zones = None
+        if self.zone_block_rows:
+            self._zones = ZoneMapBuilder(zone_path(self.manifest_path or self.current_filepath), sensor_keys,
+                                         self.zone_block_rows)
+
+        self._trip_id = None
+        self._last_epoch = None
+        if self.trip_store is not None:
+            try:
+                self._trip_id = self.trip_store.begin_trip(self._trip, sensor_keys, self.vehicle_id)
+            except Exception as e:
+                print(f"Trip Store Error: {e}")
+
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def _extension(self):
+        return BINARY_SUFFIX if self.log_format == "binary" else ".csv"
+
+    def _open_sink(self, path):
+        keys = self.active_headers
+        if self.log_format == "binary":
+            return BinaryLogWriter(path, keys, self._sensor_info, self._sample_headers, compression=self.compression)
+        header = self.TIME_COLUMNS + list(keys)
+        if self._sample_headers:
+            header += [key + self.SAMPLE_TIME_SUFFIX for key in keys]
+        return CsvSink(path, header)
 
-    def write_row(self, data_dict):
-        if not self.enabled or not self.current_filepath:
+    def _open_segment(self):
+        self._segment += 1
+        self._segment_name = segment_name(self._trip, self._segment, self._extension())
+        self.current_filepath = os.path.join(self.log_dir, self._segment_name)
+        self._sink = self._open_sink(self.current_filepath)
+        self._segment_rows = 0
+        self._segment_end = None
+        self._segment_opened = time.monotonic()
+        # Each segment starts with a keyframe so it can be read on its own (see _keyframe_first_row)
+        self._segment_keyframe = True
+        self._manifest.add_segment(self._segment_name, time.time())
+
+    def _close_segment(self):
+        self._sink.close()
+        path = self.current_filepath
+        name = self._segment_name
+        manifest = self._manifest
+        manifest.update_segment(name, rows=self._segment_rows, bytes=os.path.getsize(path), end=self._segment_end)
+        # Binary segments are already compressed per chunk
+        if self.segment_compression and self.log_format == "csv":
+            self._compressor.submit(path, self.segment_compression,
+                                    lambda src, dst: manifest.update_segment(name, compressed=os.path.basename(dst)))
+
+    def _should_rotate(self):
+        if self.rotate_bytes and self._sink.size >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.monotonic() - self._segment_opened >= self.rotate_seconds
+
+    def wait_compression(self, timeout=None):
+        """Waits for closed segments to finish compressing. False on timeout."""
+        return self._compressor.wait(timeout)
+
+    def write_row(self, data_dict, sample_times=None):
+        if not self.enabled or self._sink is None:
             return
 
-        try:
-            row_data = [time.strftime("%H:%M:%S")]
-            for key in self.active_headers:
-                row_data.append(data_dict.get(key, ""))
+        if self.sparse:
+            row = self._sparse_row(data_dict, sample_times or {})
+            if row is None:
+                return
+            values, times = row
+        else:
+            values = [data_dict.get(key, "") for key in self.active_headers]
+            times = None
+            if self._sample_headers:
+                sample_times = sample_times or {}
+                times = [sample_times.get(key, "") if key in data_dict else "" for key in self.active_headers]
+        row_data = (time.time(), time.monotonic_ns(), values, times)
+
+        with self._cond:
+            self._pending.append(row_data)
+            if len(self._pending) >= self.flush_rows:
+                self._cond.notify()
+
+    def _sparse_row(self, data_dict, sample_times):
+        """(values, times) with unchanged values left empty, or None when nothing changed."""
+        keys = self.active_headers
+        self._latest.update(data_dict)
+        self._latest_times.update(sample_times)
+
+        now = time.monotonic()
+        if now >= self._next_keyframe:
+            self._next_keyframe = now + self.keyframe_seconds
+            latest = self._latest
+            self._logged = {key: latest[key] for key in keys if key in latest}
+            values = [latest.get(key, "") for key in keys]
+            times = [self._latest_times.get(key, "") if key in latest else "" for key in keys]
+            return values, (times if self._sample_headers else None)
+
+        logged = self._logged
+        deadbands = self.deadbands
+        values = []
+        times = [] if self._sample_headers else None
+        changed = False
+        for key in keys:
+            val = data_dict.get(key)
+            if val is not None:
+                last = logged.get(key)
+                try:
+                    moved = last is None or abs(val - last) > deadbands.get(key, 0.0)
+                except TypeError:
+                    moved = val != last
+                if moved:
+                    logged[key] = val
+                    changed = True
+                else:
+                    val = None
+            values.append("" if val is None else val)
+            if times is not None:
+                times.append(sample_times.get(key, "") if val is not None else "")
+        return (values, times) if changed else None
+
+    def flush(self):
+        """Writes every buffered row and flushes the file."""
+        with self._cond:
+            rows = self._pending
+            self._pending = []
+        self._write(rows)
+
+    def close(self):
+        """Stops the writer thread after a final flush and closes the file."""
+        if self._thread is not None:
+            with self._cond:
+                self._running = False
+                self._cond.notify()
+            if self._thread is not threading.current_thread():
+                self._thread.join(timeout=5)
+            self._thread = None
+
+        self.flush()
+        with self._io_lock:
+            if self._sink is not None:
+                try:
+                    if self._manifest is not None:
+                        self._close_segment()
+                    else:
+                        self._sink.close()
+                except Exception as e:
+                    print(f"Logging Close Error: {e}")
+            self._sink = None
+            self._manifest = None
+            if self._zones is not None:
+                try:
+                    self._zones.save(complete=True)
+                except Exception as e:
+                    print(f"Zone Map Error: {e}")
+                self._zones = None
+            if self._trip_id is not None:
+                try:
+                    self.trip_store.end_trip(self._trip_id, self._last_epoch)
+                except Exception as e:
+                    print(f"Trip Store Error: {e}")
+                self._trip_id = None
+
+    def _keyframe_first_row(self, rows):
+        """Sparse logs: fills the empty cells of a new segment's first row from earlier rows."""
+        if self._segment_keyframe:
+            self._segment_keyframe = False
+            epoch, mono, values, times = rows[0]
+            values = [v if v != "" else last for v, last in zip(values, self._written_values)]
+            if times is not None:
+                times = [t if t != "" else last for t, last in zip(times, self._written_times)]
+            rows = [(epoch, mono, values, times)] + rows[1:]
+
+        written, written_times = self._written_values, self._written_times
+        for _, _, values, times in rows:
+            for i, value in enumerate(values):
+                if value != "":
+                    written[i] = value
+                    if times is not None:
+                        written_times[i] = times[i]
+        return rows
+
+    def _write(self, rows):
+        with self._io_lock:
+            if self._sink is None:
+                return
+            try:
+                if rows and self.sparse:
+                    rows = self._keyframe_first_row(rows)
+                if rows:
+                    self._sink.write_rows(rows)
+                self._sink.flush()
+                if self._manifest is not None and rows:
+                    self._segment_rows += len(rows)
+                    self._segment_end = rows[-1][0]
+                    if self._should_rotate():
+                        self._close_segment()
+                        self._open_segment()
+            except Exception as e:
+                print(f"Logging Write Error: {e}")
+
+            if rows and self._zones is not None:
+                try:
+                    # Rewritten once per completed block, not on every flush
+                    if self._zones.add_rows(rows):
+                        self._zones.save()
+                except Exception as e:
+                    print(f"Zone Map Error: {e}")
+
+            if rows and self._trip_id is not None:
+                self._last_epoch = rows[-1][0]
+                try:
+                    self.trip_store.write_rows(self._trip_id, self.active_headers, rows)
+                except Exception as e:
+                    print(f"Trip Store Error: {e}")
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval_ms / 1000.0
+                while self._running and len(self._pending) < self.flush_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                rows = self._pending
+                self._pending = []
+                running = self._running
 
-            with open(self.current_filepath, mode='a', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(row_data)
-        except Exception:
-            pass
+            if rows:
+                self._write(rows)
+            if not running:
+                return
 
     def set_directory(self, new_path):
         if os.path.isdir(new_path):
@@ -50,4 +450,4 @@ class DataLogger:
         return False
 
     def toggle_logging(self, is_enabled):
-        self.enabled = is_enabled
\ No newline at end of file
+        self.enabled = is_enabled
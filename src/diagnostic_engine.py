@@ -1,4 +1,21 @@
+import numpy as np
+
+from constants import ANALYSIS_WINDOW_SECONDS
+
+
 class DiagnosticEngine:
+    @staticmethod
+    def recent_value(series, now=None, seconds=ANALYSIS_WINDOW_SECONDS):
+        """
+        Median of a (times, values) history (e.g. SensorStore.series) over its last `seconds`,
+        so one noisy reading raises no issue. None when empty or, given `now`, out of date.
+        """
+        times, values = series
+        if not len(values) or (now is not None and times[-1] < now - seconds):
+            return None
+        i = np.searchsorted(times, times[-1] - seconds, "left")
+        return float(np.median(values[i:]))
+
     @staticmethod
     def analyze(data, thresholds):
         issues = []
@@ -1,11 +1,15 @@
 import time
 
+import numpy as np
+
 
 class DynoEngine:
     def __init__(self):
         self.reset()
 
-    def reset(self):
+    def reset(self, since=None):
+        # Sample time of the last speed sample taken by calculate_series
+        self.fed_until = since
         self.start_time = None
         self.last_time = None
         self.last_speed_ms = 0
@@ -14,8 +18,9 @@ class DynoEngine:
         self.peak_torque = 0
         self.data_points = []
 
-    def calculate_step(self, weight_kg, speed_kmh, rpm):
-        current_time = time.time()
+    def calculate_step(self, weight_kg, speed_kmh, rpm, timestamp=None):
+        # timestamp: acquisition time of the speed sample in seconds; defaults to now
+        current_time = time.time() if timestamp is None else timestamp
         speed_ms = speed_kmh / 3.6
 
         if self.last_time is None:
@@ -26,6 +31,12 @@ class DynoEngine:
         dt = current_time - self.last_time
         dv = speed_ms - self.last_speed_ms
 
+        # Switched between sample time and wall time; start again from this sample
+        if dt < 0:
+            self.last_time = current_time
+            self.last_speed_ms = speed_ms
+            return 0, 0
+
         if dt < 0.1:
             return 0, 0
 
@@ -69,4 +80,24 @@ class DynoEngine:
         self.last_time = current_time
         self.last_speed_ms = speed_ms
 
-        return hp, torque
\ No newline at end of file
+        return hp, torque
+
+    def calculate_series(self, weight_kg, speed_series, rpm_series):
+        """
+        Runs calculate_step over every speed sample newer than the last one taken, with the
+        RPM sampled at or before it. Both series are (times, values), e.g. SensorStore views,
+        so no sample is lost between UI frames. Returns [(rpm, hp, torque)].
+        """
+        times, speeds = speed_series
+        rpm_times, rpms = rpm_series
+        start = 0 if self.fed_until is None else np.searchsorted(times, self.fed_until, "right")
+        if start >= len(times) or not len(rpms):
+            return []
+        times, speeds = times[start:], speeds[start:]
+        self.fed_until = float(times[-1])
+        points = []
+        for t, speed_kmh, i in zip(times, speeds, np.searchsorted(rpm_times, times, "right") - 1):
+            rpm = float(rpms[i]) if i >= 0 else 0.0
+            hp, torque = self.calculate_step(weight_kg, float(speed_kmh), rpm, float(t))
+            points.append((rpm, hp, torque))
+        return points
\ No newline at end of file
@@ -0,0 +1,142 @@
+import time
+
+from obd.protocols import ECU
+from obd.protocols.protocol import Frame, Message
+
+PROMPT = ord(">")
+_HEX_DIGITS = b"0123456789ABCDEFabcdef"
+
+
+class TransportError(Exception):
+    pass
+
+
+class ElmTransport:
+    """
+    Minimal ELM327 request/response loop for CAN vehicles, running on the serial port python-obd
+    already opened and initialised (echo off, headers on). It writes the request and reads into a
+    pre-allocated buffer until the '>' prompt, then splits the ISO-TP frames per ECU itself,
+    skipping python-obd's generic protocol parsing and read loop.
+    """
+
+    BUFFER_SIZE = 4096
+
+    def __init__(self, port, id_bits=11, ecu_map=None, timeout=2.0):
+        self.port = port
+        self.id_bits = id_bits
+        self.header_len = 3 if id_bits == 11 else 8
+        self.ecu_map = ecu_map or {}
+        self.timeout = timeout
+        self._buffer = bytearray(self.BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+
+    @classmethod
+    def from_connection(cls, connection):
+        """Borrows the serial port of a connected python-obd OBD object; None when the link isn't CAN."""
+        interface = getattr(connection, "interface", None)
+        port = getattr(interface, "_ELM327__port", None)
+        protocol = getattr(interface, "_ELM327__protocol", None)
+        id_bits = getattr(protocol, "id_bits", None)
+        if port is None or id_bits not in (11, 29):
+            return None
+        return cls(port, id_bits, dict(getattr(protocol, "ecu_map", {})))
+
+    def request(self, command):
+        """Sends `command` (e.g. b"010C") and returns one Message per answering ECU."""
+        return self.parse(self._exchange(command))
+
+    def _exchange(self, command):
+        port = self.port
+        view = self._view
+        size = 0
+        # python-obd opened the port with a 10 s read timeout; each read here only waits for
+        # what is left of our own deadline, and python-obd gets its timeout back afterwards
+        port_timeout = getattr(port, "timeout", None)
+        try:
+            if port.in_waiting:
+                port.reset_input_buffer()
+            port.write(command + b"\r")
+
+            deadline = time.monotonic() + self.timeout
+            while True:
+                if port_timeout is not None:
+                    port.timeout = max(deadline - time.monotonic(), 0)
+                chunk = port.read(port.in_waiting or 1)
+                if chunk:
+                    end = size + len(chunk)
+                    if end > self.BUFFER_SIZE:
+                        raise TransportError("response larger than the receive buffer")
+                    view[size:end] = chunk
+                    size = end
+                    if PROMPT in chunk:
+                        break
+                if time.monotonic() > deadline:
+                    raise TransportError(f"no prompt after {command.decode(errors='ignore')}")
+        except TransportError:
+            raise
+        except Exception as e:
+            raise TransportError(str(e))
+        finally:
+            if port_timeout is not None:
+                try:
+                    port.timeout = port_timeout
+                except Exception:
+                    pass
+
+        return bytes(view[:size]).replace(b"\x00", b"").split(b"\r")
+
+    def parse(self, lines):
+        frames = {}
+        for line in lines:
+            line = line.replace(b" ", b"")
+            # Status lines (NO DATA, SEARCHING..., ?) and the prompt are not hex and are skipped
+            if len(line) <= self.header_len or line.translate(None, _HEX_DIGITS):
+                continue
+            if (len(line) - self.header_len) % 2:
+                continue
+            header = line[:self.header_len]
+            frames.setdefault(header, []).append(line)
+
+        messages = []
+        for header, lines_of_ecu in frames.items():
+            parts = [bytes.fromhex(line[self.header_len:].decode()) for line in lines_of_ecu]
+            data = _reassemble(parts)
+            if data is None:
+                continue
+            message = Message([Frame(line.decode()) for line in lines_of_ecu])
+            message.data = data
+            message.ecu = self.ecu_map.get(self._tx_id(header), ECU.UNKNOWN)
+            messages.append(message)
+        return messages
+
+    def _tx_id(self, header):
+        # Same sender ids python-obd's CAN protocol uses as ecu_map keys
+        value = int(header, 16)
+        if self.id_bits == 11:
+            return value & 0x07 if value & 0x08 else 0xF1
+        return value & 0xFF
+
+
+def _reassemble(parts):
+    """Joins the ISO-TP frames of one ECU into the message data (without PCI bytes)."""
+    first = parts[0]
+    if not first:
+        return None
+    kind = first[0] >> 4
+
+    if kind == 0:
+        length = first[0] & 0x0F
+        data = first[1:1 + length]
+        return bytearray(data) if len(data) == length else None
+
+    if kind == 1 and len(first) > 1:
+        length = ((first[0] & 0x0F) << 8) | first[1]
+        data = bytearray(first[2:])
+        for part in parts[1:]:
+            if part and part[0] >> 4 == 2:
+                data += part[1:]
+        if len(data) < length:
+            return None
+        return data[:length]
+
+    return None
@@ -0,0 +1,256 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from diagnostic_engine import DiagnosticEngine
+from log_segments import open_log, resolve_log, TripManifest, MANIFEST_SUFFIX, SEGMENT_CODECS
+from binary_log import BinaryLogReader, forward_fill, is_binary_log, BINARY_SUFFIX
+from zone_map import ZoneMap, zone_path, parse_condition, compare
+
+LOG_SUFFIXES = (".csv", BINARY_SUFFIX, MANIFEST_SUFFIX) + tuple(".csv" + ext for ext in SEGMENT_CODECS.values())
+TIME_COLUMNS = ("Timestamp", "Epoch", "Mono_ns")
+
+
+def find_logs(root):
+    """Every trip under `root` once: manifests instead of their segments, binary logs instead of their CSV copies."""
+    found = set()
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            if f.endswith(LOG_SUFFIXES):
+                found.add(resolve_log(os.path.join(dirpath, f)))
+
+    logs = []
+    for path in sorted(found):
+        if path.endswith(".csv" + MANIFEST_SUFFIX) and path[:-len(".csv" + MANIFEST_SUFFIX)] + MANIFEST_SUFFIX in found:
+            continue
+        if path.endswith(".csv") and path[:-4] + BINARY_SUFFIX in found:
+            continue
+        logs.append(path)
+    return logs
+
+
+def load_columns(path):
+    """(epochs, {key: float column with NaN for empty cells}) of any DataLogger output."""
+    if TripManifest.is_manifest(path):
+        manifest = TripManifest.load(path)
+        if manifest.data.get("format", "csv") == "binary":
+            parts = [_binary_columns(p) for p in manifest.segment_paths()]
+            keys = parts[0][1].keys() if parts else []
+            return (np.concatenate([p[0] for p in parts]) if parts else np.empty(0),
+                    {k: np.concatenate([p[1][k] for p in parts]) for k in keys})
+    elif is_binary_log(path):
+        return _binary_columns(path)
+
+    with open_log(path) as f:
+        reader = csv.reader(line.decode("utf-8", "ignore") for line in f)
+        header = [h.strip() for h in next(reader, [])]
+        keys = [h for h in header if h not in TIME_COLUMNS and not (h.endswith("_ns") and h[:-3] in header)]
+        cols = [header.index(k) for k in keys]
+        epoch_col = header.index("Epoch") if "Epoch" in header else None
+        epochs = []
+        values = [[] for _ in keys]
+        for cells in reader:
+            if not cells:
+                continue
+            epochs.append(_number(cells, epoch_col))
+            for out, c in zip(values, cols):
+                out.append(_number(cells, c))
+    return np.array(epochs, dtype="f8"), {k: np.array(v, dtype="f8") for k, v in zip(keys, values)}
+
+
+def _binary_columns(path):
+    with BinaryLogReader(path) as log:
+        cols = log.columns_for(["Epoch"] + log.sensor_keys)
+        return cols.pop("Epoch").astype("f8"), {k: v.astype("f8") for k, v in cols.items()}
+
+
+def _number(cells, col):
+    try:
+        return float(cells[col])
+    except (TypeError, ValueError, IndexError):
+        return np.nan
+
+
+def _issue_kind(issue):
+    # Messages embed live values ("... (116.0°C > 110.0°C)"); the part before them names the rule
+    return issue.split(" (")[0]
+
+
+def matches(columns, conditions):
+    """Whether some row meets every [(key, op, value)] condition, on forward-filled columns."""
+    hit = None
+    for key, op, value in conditions:
+        if key not in columns:
+            return False
+        values = forward_fill(columns[key])
+        with np.errstate(invalid="ignore"):
+            ok = ~np.isnan(values) & compare(values, op, value)
+        hit = ok if hit is None else hit & ok
+    return bool(hit is not None and hit.any())
+
+
+def analyze_log(path, thresholds=None, where=None):
+    """
+    Per-sensor statistics and DiagnosticEngine findings of one trip, as plain JSON-able values.
+    With `where` conditions, None for trips without a row meeting all of them; trips whose
+    zone map rules a condition out are not read at all.
+    """
+    thresholds = thresholds or {}
+    zones = ZoneMap.load(path) if where else None
+    if zones is not None and not zones.may_match(where):
+        return None
+    try:
+        epochs, columns = load_columns(path)
+    except Exception as e:
+        return {"file": path, "error": str(e)}
+    if where:
+        if zones is None and len(epochs):
+            # Logs from before zone maps get one now, so the next search can skip them
+            try:
+                ZoneMap.from_columns(epochs, columns, path=zone_path(path))
+            except OSError:
+                pass
+        if not matches(columns, where):
+            return None
+
+    report = {"file": path, "rows": int(len(epochs)), "start": None, "duration": None, "sensors": {}, "issues": {}}
+    known = epochs[~np.isnan(epochs)]
+    if len(known):
+        report["start"] = float(known[0])
+        report["duration"] = round(float(known[-1] - known[0]), 3)
+
+    # Sparse logs leave a cell empty while its value holds, so statistics and rules both see
+    # what the dashboard would have shown: every sensor's latest value on every row
+    filled = {key: forward_fill(values) for key, values in columns.items()}
+    for key, values in filled.items():
+        logged = values[~np.isnan(values)]
+        if len(logged):
+            report["sensors"][key] = {"min": float(logged.min()), "max": float(logged.max()),
+                                      "mean": round(float(logged.mean()), 4), "count": int(len(logged))}
+    if not len(epochs) or not columns:
+        return report
+
+    # The rules only need to run on rows where something changed; each result holds until the next change
+    keys = list(columns)
+    matrix = np.column_stack([filled[k] for k in keys])
+    same = (matrix[1:] == matrix[:-1]) | (np.isnan(matrix[1:]) & np.isnan(matrix[:-1]))
+    changed = np.concatenate(([0], np.nonzero(~same.all(axis=1))[0] + 1))
+    held = np.diff(np.append(changed, len(epochs)))
+
+    issues = report["issues"]
+    for row, rows in zip(changed.tolist(), held.tolist()):
+        snapshot = {k: v for k, v in zip(keys, matrix[row].tolist()) if v == v}
+        for issue in DiagnosticEngine.analyze(snapshot, thresholds):
+            entry = issues.get(_issue_kind(issue))
+            if entry is None:
+                t = epochs[row]
+                issues[_issue_kind(issue)] = {"rows": rows, "first": None if t != t else float(t), "example": issue}
+            else:
+                entry["rows"] += rows
+    return report
+
+
+def analyze_logs(paths, thresholds=None, workers=None, where=None):
+    """analyze_log over all paths, spread over `workers` processes (all cores by default)."""
+    job = partial(analyze_log, thresholds=thresholds, where=where)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        reports = [job(p) for p in paths]
+    else:
+        # Several logs per task keeps the pickling overhead small next to the parsing
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            reports = list(pool.map(job, paths, chunksize=chunksize))
+    return [r for r in reports if r is not None]
+
+
+def summarize(reports):
+    trips = [r for r in reports if "error" not in r]
+    issues = {}
+    for r in trips:
+        for kind in r["issues"]:
+            issues[kind] = issues.get(kind, 0) + 1
+    return {"trips": len(trips), "failed": len(reports) - len(trips), "rows": sum(r["rows"] for r in trips),
+            "trips_with_issue": dict(sorted(issues.items(), key=lambda kv: -kv[1]))}
+
+
+def write_report(reports, path):
+    """JSON (.json) with everything, or CSV with one line per trip and min/max/mean columns per sensor."""
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "summary": summarize(reports), "trips": reports}, f, indent=1)
+        return path
+
+    keys = sorted({k for r in reports for k in r.get("sensors", {})})
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File", "Start", "Duration_s", "Rows", "Issues", "Error"]
+                        + [f"{k}_{stat}" for k in keys for stat in ("min", "max", "mean")])
+        for r in reports:
+            start = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(r["start"])) if r.get("start") else ""
+            issues = "; ".join(f"{kind} ({v['rows']} rows)" for kind, v in r.get("issues", {}).items())
+            stats = []
+            for k in keys:
+                s = r.get("sensors", {}).get(k)
+                stats += [s["min"], s["max"], s["mean"]] if s else ["", "", ""]
+            writer.writerow([r["file"], start, "" if r.get("duration") is None else r["duration"],
+                             r.get("rows", ""), issues, r.get("error", "")] + stats)
+    return path
+
+
+def load_thresholds(config_path):
+    """Sensor limits saved by the dashboard in config.json."""
+    with open(config_path, encoding="utf-8") as f:
+        sensors = json.load(f).get("sensors", {})
+    return {k: v["limit"] for k, v in sensors.items() if isinstance(v, dict) and v.get("limit") not in (None, "")}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a folder of trip logs into one report.")
+    parser.add_argument("log_dir")
+    parser.add_argument("-o", "--output", default="fleet_report.csv", help="report file, .csv or .json")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--config", help="config.json whose sensor limits the rules use")
+    parser.add_argument("--limit", action="append", default=[], metavar="KEY=VALUE", help="sensor limit")
+    parser.add_argument("--where", action="append", default=[], metavar="COND",
+                        help="only trips with a row where e.g. COOLANT_TEMP>110 (repeat for AND)")
+    args = parser.parse_args(argv)
+    try:
+        where = [parse_condition(c) for c in args.where]
+    except ValueError as e:
+        print(f"Fleet Report Error: {e}")
+        return 2
+
+    thresholds = load_thresholds(args.config) if args.config else {}
+    for item in args.limit:
+        key, _, value = item.partition("=")
+        thresholds[key.strip()] = value.strip()
+
+    # The report may be written into the folder it summarizes
+    paths = [p for p in find_logs(args.log_dir) if os.path.abspath(p) != os.path.abspath(args.output)]
+    if not paths:
+        print(f"No trip logs in {args.log_dir}")
+        return 1
+
+    started = time.perf_counter()
+    reports = analyze_logs(paths, thresholds, args.workers, where)
+    write_report(reports, args.output)
+    summary = summarize(reports)
+    print(f"{summary['trips']} trips, {summary['rows']} rows in {time.perf_counter() - started:.1f} s -> {args.output}")
+    for kind, count in summary["trips_with_issue"].items():
+        print(f"{count:>6}  {kind}")
+    for r in reports:
+        if "error" in r:
+            print(f"Fleet Report Error: {r['file']}: {r['error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
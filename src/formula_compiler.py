@@ -0,0 +1,297 @@
+import ast
+
+import numpy as np
+
+
+class FormulaError(ValueError):
+    pass
+
+
+def signed(val):
+    if val > 127: return val - 256
+    return val
+
+
+FORMULA_FUNCTIONS = {"min": min, "max": max, "abs": abs, "signed": signed}
+
+# Byte variables A..Z map to the response data bytes in order
+BYTE_NAMES = [chr(c) for c in range(65, 91)]
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Load, ast.Name, ast.Constant, ast.Call,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift,
+    ast.UAdd, ast.USub, ast.Invert, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+
+def parse_formula(formula):
+    """Parses a pro-pack formula and checks it only uses arithmetic, A..Z and FORMULA_FUNCTIONS."""
+    try:
+        tree = ast.parse(str(formula).strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Syntax error in formula '{formula}': {e.msg}")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise FormulaError(f"'{type(node).__name__}' is not allowed in formula '{formula}'")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise FormulaError(f"Only numeric constants are allowed in formula '{formula}'")
+        if isinstance(node, ast.Name) and node.id not in BYTE_NAMES and node.id not in FORMULA_FUNCTIONS:
+            raise FormulaError(f"Unknown name '{node.id}' in formula '{formula}'")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS:
+                raise FormulaError(f"Only {', '.join(FORMULA_FUNCTIONS)} may be called in formula '{formula}'")
+            if node.keywords:
+                raise FormulaError(f"Keyword arguments are not allowed in formula '{formula}'")
+    return tree
+
+
+def byte_count(tree):
+    """Number of data bytes a parsed formula needs (index of its highest byte variable + 1)."""
+    used = [BYTE_NAMES.index(n.id) for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id in BYTE_NAMES]
+    return max(used) + 1 if used else 0
+
+
+class CompiledFormula:
+    """
+    A validated formula compiled once into a function taking the byte values as positional
+    arguments, so evaluating a sample is a single call instead of parse + eval.
+    """
+
+    def __init__(self, formula):
+        self.formula = formula
+        tree = parse_formula(formula)
+        self.byte_count = byte_count(tree)
+
+        args = ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=name) for name in BYTE_NAMES[:self.byte_count]],
+            vararg=ast.arg(arg="_unused"), kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[]
+        )
+        lambda_tree = ast.Expression(body=ast.Lambda(args=args, body=tree.body))
+        ast.fix_missing_locations(lambda_tree)
+
+        namespace = dict(FORMULA_FUNCTIONS)
+        namespace["__builtins__"] = {}
+        self._func = eval(compile(lambda_tree, "<formula>", "eval"), namespace)
+
+        self._tree = tree
+
+    def __call__(self, data_bytes):
+        if len(data_bytes) < self.byte_count:
+            return None
+        try:
+            return float(self._func(*data_bytes))
+        except Exception:
+            return None
+
+    def evaluate_batch(self, byte_matrix, lengths=None):
+        """
+        Evaluates the formula for every row of an N x K byte matrix with NumPy.
+        `lengths` optionally gives the valid byte count of each row (responses of varying size).
+        Returns a float64 array; rows where the scalar path would return None are NaN.
+        """
+        data = np.asarray(byte_matrix, dtype=np.int64)
+        if data.ndim != 2:
+            raise ValueError("byte_matrix must be two-dimensional (rows x bytes)")
+        rows, width = data.shape
+
+        if lengths is None:
+            lengths = np.full(rows, width, dtype=np.int64)
+        else:
+            lengths = np.minimum(np.asarray(lengths, dtype=np.int64), width)
+
+        short = lengths < self.byte_count
+        if self.byte_count > width:
+            return np.full(rows, np.nan)
+
+        try:
+            with np.errstate(all="ignore"):
+                values, invalid = _BatchEvaluator(data).eval(self._tree.body)
+                result = np.broadcast_to(np.asarray(values, dtype=np.float64), (rows,)).copy()
+                invalid = np.broadcast_to(invalid, (rows,))
+        except _NeedsScalar:
+            # Operations NumPy can't reproduce bit-for-bit run through the scalar path instead
+            result = np.array([np.nan if short[i] else _none_to_nan(self(bytes(data[i, :lengths[i]].tolist())))
+                               for i in range(rows)], dtype=np.float64)
+            return result
+
+        result[invalid | short] = np.nan
+        return result
+
+
+def _none_to_nan(value):
+    return np.nan if value is None else value
+
+
+class _NeedsScalar(Exception):
+    pass
+
+
+# Integers above this lose precision as float64, where NumPy and Python int arithmetic diverge
+_EXACT_INT_LIMIT = 2 ** 53
+
+
+class _BatchEvaluator:
+    """Walks a validated formula AST once, evaluating each node on whole columns.
+    Every node yields (values, invalid_mask); invalid rows are those where Python would raise."""
+
+    def __init__(self, data):
+        self.data = data
+        self.no_errors = np.zeros(data.shape[0], dtype=bool)
+
+    def eval(self, node):
+        method = getattr(self, "_eval_" + type(node).__name__, None)
+        if method is None:
+            raise _NeedsScalar()
+        return method(node)
+
+    def _eval_Constant(self, node):
+        return node.value, self.no_errors
+
+    def _eval_Name(self, node):
+        return self.data[:, BYTE_NAMES.index(node.id)], self.no_errors
+
+    def _eval_UnaryOp(self, node):
+        val, bad = self.eval(node.operand)
+        if isinstance(node.op, ast.USub): return -_as_number(val), bad
+        if isinstance(node.op, ast.UAdd): return _as_number(val), bad
+        if isinstance(node.op, ast.Not): return _logical_not(val), bad
+        if _is_float(val): raise _NeedsScalar()
+        return ~_as_int(val), bad
+
+    def _eval_BinOp(self, node):
+        left, bad_l = self.eval(node.left)
+        right, bad_r = self.eval(node.right)
+        left, right = _as_number(left), _as_number(right)
+        bad = bad_l | bad_r
+        op = node.op
+
+        if isinstance(op, (ast.Add, ast.Sub)):
+            _check_exact(left, right, lambda a, b: a + b)
+            return (left + right if isinstance(op, ast.Add) else left - right), bad
+        if isinstance(op, ast.Mult):
+            _check_exact(left, right, lambda a, b: a * b)
+            return left * right, bad
+        if isinstance(op, (ast.Div, ast.FloorDiv, ast.Mod)):
+            _check_exact(left, right, lambda a, b: a)
+            bad = bad | (np.asarray(right) == 0)
+            safe = np.where(np.asarray(right) == 0, 1, right)
+            if isinstance(op, ast.Div):
+                return np.true_divide(left, safe), bad
+            if isinstance(op, ast.FloorDiv):
+                return np.floor_divide(left, safe), bad
+            return np.remainder(left, safe), bad
+        if isinstance(op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+            if _is_float(left) or _is_float(right): raise _NeedsScalar()
+            left, right = _as_int(left), _as_int(right)
+            if isinstance(op, ast.BitAnd): return left & right, bad
+            if isinstance(op, ast.BitOr): return left | right, bad
+            return left ^ right, bad
+        if isinstance(op, (ast.LShift, ast.RShift)):
+            if _is_float(left) or _is_float(right): raise _NeedsScalar()
+            left, right = _as_int(left), _as_int(right)
+            bad = bad | (np.asarray(right) < 0)
+            shift = np.clip(right, 0, 62)
+            if isinstance(op, ast.LShift):
+                _check_exact(left, 2 ** np.max(shift), lambda a, b: a * b)
+                return np.left_shift(left, shift), bad
+            return np.right_shift(left, shift), bad
+        raise _NeedsScalar()
+
+    def _eval_Compare(self, node):
+        left, bad = self.eval(node.left)
+        result = True
+        for op, comparator in zip(node.ops, node.comparators):
+            right, bad_r = self.eval(comparator)
+            # Python stops at the first false link, so later errors only count where it was still true
+            bad = bad | (np.asarray(result, dtype=bool) & bad_r)
+            if isinstance(op, ast.Eq): r = left == right
+            elif isinstance(op, ast.NotEq): r = left != right
+            elif isinstance(op, ast.Lt): r = left < right
+            elif isinstance(op, ast.LtE): r = left <= right
+            elif isinstance(op, ast.Gt): r = left > right
+            else: r = left >= right
+            result = np.logical_and(result, r)
+            left = right
+        return np.asarray(result, dtype=np.int64), bad
+
+    def _eval_IfExp(self, node):
+        test, bad_t = self.eval(node.test)
+        body, bad_b = self.eval(node.body)
+        orelse, bad_o = self.eval(node.orelse)
+        cond = np.asarray(test) != 0
+        return np.where(cond, body, orelse), bad_t | np.where(cond, bad_b, bad_o)
+
+    def _eval_BoolOp(self, node):
+        values, bad = self.eval(node.values[0])
+        for value_node in node.values[1:]:
+            nxt, bad_n = self.eval(value_node)
+            truthy = np.asarray(values) != 0
+            take_next = truthy if isinstance(node.op, ast.And) else ~truthy
+            values = np.where(take_next, nxt, values)
+            bad = bad | (take_next & bad_n)
+        return values, bad
+
+    def _eval_Call(self, node):
+        args = [self.eval(a) for a in node.args]
+        name = node.func.id
+        bad = self.no_errors
+        for _, b in args:
+            bad = bad | b
+        vals = [_as_number(v) for v, _ in args]
+
+        if name == "signed" and len(vals) == 1:
+            return np.where(np.asarray(vals[0]) > 127, vals[0] - 256, vals[0]), bad
+        if name == "abs" and len(vals) == 1:
+            return np.abs(vals[0]), bad
+        if name in ("min", "max") and len(vals) >= 2:
+            reduce = np.minimum if name == "min" else np.maximum
+            result = vals[0]
+            for v in vals[1:]:
+                result = reduce(result, v)
+            return result, bad
+        raise _NeedsScalar()
+
+
+def _as_number(val):
+    if isinstance(val, np.ndarray) and val.dtype == bool:
+        return val.astype(np.int64)
+    if isinstance(val, bool):
+        return int(val)
+    return val
+
+
+def _as_int(val):
+    return np.asarray(val, dtype=np.int64) if isinstance(val, np.ndarray) else int(val)
+
+
+def _is_float(val):
+    if isinstance(val, np.ndarray):
+        return val.dtype.kind == "f"
+    return isinstance(val, float)
+
+
+def _logical_not(val):
+    return (np.asarray(val) == 0).astype(np.int64)
+
+
+def _check_exact(left, right, combine):
+    """Falls back to the scalar path if an integer operation could leave float64's exact range."""
+    if _is_float(left) and _is_float(right):
+        return
+    bound_l = float(np.max(np.abs(left))) if np.size(left) else 0.0
+    bound_r = float(np.max(np.abs(right))) if np.size(right) else 0.0
+    if abs(combine(bound_l, bound_r)) >= _EXACT_INT_LIMIT or max(bound_l, bound_r) >= _EXACT_INT_LIMIT:
+        raise _NeedsScalar()
+
+
+def compile_formula(formula):
+    return CompiledFormula(formula)
+
+
+def evaluate_batch(formula, byte_matrix, lengths=None):
+    """Vectorized counterpart of CompiledFormula.__call__ for N responses of one custom PID."""
+    return compile_formula(formula).evaluate_batch(byte_matrix, lengths)
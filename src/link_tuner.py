@@ -0,0 +1,73 @@
+# ELM327 response timeout is set in 4 ms steps (AT ST hh)
+ELM_DEFAULT_TIMEOUT = "32"  # 200 ms, the adapter's power-on value
+FAST_LINK_TIMEOUT = "19"  # 100 ms ceiling; adaptive timing (AT AT2) normally answers well below it
+
+# The response-count hint is a single hex digit appended to the request
+MAX_RESPONSE_HINT = 15
+# Consecutive hinted requests that may come back empty before fast link is given up
+FAILURE_LIMIT = 3
+
+
+class LinkTuner:
+    """
+    Bookkeeping for the ELM327 "fast link" mode.
+    Learns how many frames each request returns so it can be appended as a response-count
+    hint (e.g. "010C1"), which lets the adapter answer as soon as that many frames arrived
+    instead of waiting out its timeout. Also keeps per-request latency statistics.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.response_counts = {}
+        self.latency = {}
+        self.failures = 0
+
+    def reset(self):
+        """New connection: forgets the hints and the latency statistics."""
+        self.disable()
+        self.latency = {}
+
+    def disable(self):
+        """Fast link off; latency keeps being measured for the rest of the connection."""
+        self.enabled = False
+        self.response_counts = {}
+        self.failures = 0
+
+    def suffix_for(self, request):
+        if not self.enabled: return ""
+        count = self.response_counts.get(request)
+        return f"{count:X}" if count else ""
+
+    def record(self, request, messages, suffix, elapsed):
+        stats = self.latency.get(request)
+        if stats is None:
+            stats = self.latency[request] = {"count": 0, "total": 0.0, "last": 0.0, "max": 0.0}
+        stats["count"] += 1
+        stats["total"] += elapsed
+        stats["last"] = elapsed
+        stats["max"] = max(stats["max"], elapsed)
+
+        frames = sum(len(getattr(m, "frames", ())) for m in messages)
+        if suffix:
+            if frames == 0:
+                # Forget the hint so the request is learned again without it
+                self.response_counts.pop(request, None)
+                self.failures += 1
+            else:
+                self.failures = 0
+        elif self.enabled and 0 < frames <= MAX_RESPONSE_HINT:
+            self.response_counts[request] = frames
+
+    def misbehaving(self):
+        return self.failures >= FAILURE_LIMIT
+
+    def latency_report(self):
+        """{request: (count, average_ms, last_ms, max_ms)}"""
+        return {request: (s["count"], s["total"] / s["count"] * 1000, s["last"] * 1000, s["max"] * 1000)
+                for request, s in self.latency.items() if s["count"]}
+
+    def average_latency(self):
+        """Mean request latency in ms over all requests, or None before the first one."""
+        count = sum(s["count"] for s in self.latency.values())
+        if not count: return None
+        return sum(s["total"] for s in self.latency.values()) / count * 1000
@@ -0,0 +1,278 @@
+import bisect
+import gzip
+import io
+import json
+import os
+import queue
+import re
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MANIFEST_SUFFIX = ".manifest.json"
+# Closed segment compression -> file suffix; zstd only when the zstandard package is installed
+SEGMENT_CODECS = {"gzip": ".gz", "zstd": ".zst"}
+_SEGMENT_RE = re.compile(r"^(trip_log_\d+)\.part\d+\.")
+
+
+def available_segment_codecs():
+    return [name for name in SEGMENT_CODECS if name != "zstd" or zstandard is not None]
+
+
+def segment_name(trip, number, ext):
+    return f"{trip}.part{number:03d}{ext}"
+
+
+def compress_file(path, codec):
+    """Streams `path` into <path>.gz/.zst and removes the original. Returns the new path."""
+    if codec == "zstd" and zstandard is None:
+        codec = "gzip"
+    dst = path + SEGMENT_CODECS[codec]
+    tmp = dst + ".tmp"
+    with open(path, "rb") as src:
+        if codec == "zstd":
+            with open(tmp, "wb") as raw:
+                zstandard.ZstdCompressor(level=3).copy_stream(src, raw)
+        else:
+            with gzip.open(tmp, "wb", compresslevel=6) as out:
+                while True:
+                    block = src.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+    # The compressed file only appears once complete, so the original is never the only copy lost
+    os.replace(tmp, dst)
+    os.remove(path)
+    return dst
+
+
+def open_segment(path):
+    """Binary file object over the uncompressed text of a plain, .gz or .zst log file."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise OSError(f"{path} is zstd compressed, but the zstandard package is not installed")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True))
+    return open(path, "rb")
+
+
+def _existing(path):
+    """The segment as it is on disk now: itself, or compressed once the compressor is done."""
+    if os.path.exists(path):
+        return path
+    for ext in SEGMENT_CODECS.values():
+        if os.path.exists(path + ext):
+            return path + ext
+    return path
+
+
+class TripManifest:
+    """
+    <trip>.manifest.json: the ordered segments of one rotated trip log. Entries keep the
+    uncompressed file name; readers find the .gz/.zst that replaces it after compression.
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self.dir = os.path.dirname(path)
+        self.data = data or {"version": 1, "segments": []}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, trip, log_format, sensors):
+        manifest = cls(path, {"version": 1, "trip": trip, "format": log_format,
+                              "sensors": list(sensors), "segments": []})
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data.get("segments"), list):
+            raise ValueError(f"{path} is not a trip manifest")
+        return cls(path, data)
+
+    @staticmethod
+    def is_manifest(path):
+        return path.endswith(MANIFEST_SUFFIX)
+
+    @staticmethod
+    def for_segment(path):
+        """Manifest path of the trip a trip_log_<ts>.partNNN.* file belongs to, or None."""
+        match = _SEGMENT_RE.match(os.path.basename(path))
+        if not match:
+            return None
+        manifest = os.path.join(os.path.dirname(path), match.group(1) + MANIFEST_SUFFIX)
+        return manifest if os.path.exists(manifest) else None
+
+    @property
+    def segments(self):
+        return self.data["segments"]
+
+    def add_segment(self, filename, start):
+        with self._lock:
+            self.segments.append({"file": filename, "rows": 0, "bytes": None, "start": start,
+                                  "end": None, "compressed": None})
+            self._save()
+
+    def update_segment(self, filename, **fields):
+        with self._lock:
+            for entry in self.segments:
+                if entry["file"] == filename:
+                    entry.update(fields)
+            self._save()
+
+    def segment_paths(self):
+        return [_existing(os.path.join(self.dir, entry["file"])) for entry in self.segments]
+
+    def segment_sizes(self):
+        """Uncompressed size of each segment, None where it is not known yet (the open one)."""
+        return [entry.get("bytes") for entry in self.segments]
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+class SegmentCompressor:
+    """Compresses closed segments one at a time on a background thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def submit(self, path, codec, on_done=None):
+        with self._cond:
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self._queue.put((path, codec, on_done))
+
+    def wait(self, timeout=None):
+        """True once every submitted segment is compressed."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self):
+        while True:
+            path, codec, on_done = self._queue.get()
+            try:
+                dst = compress_file(path, codec)
+                if on_done:
+                    on_done(path, dst)
+            except Exception as e:
+                print(f"Log Compression Error: {e}")
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+
+
+class SegmentReader:
+    """
+    Read-only binary stream over the segments of one trip as if they were a single CSV:
+    the first segment's header is kept, the others' are skipped. Offsets are positions in
+    that virtual file, so TimeIndex and ReplayEngine work on it unchanged.
+    """
+
+    def __init__(self, paths, sizes=None):
+        self.paths = list(paths)
+        self._sizes = list(sizes) if sizes else [None] * len(self.paths)
+        self._bases = None
+        self._index = -1
+        self._file = None
+        self._skip = 0
+        self._open(0)
+
+    def _open(self, i):
+        if self._file is not None:
+            self._file.close()
+        self._index = i
+        self._file = open_segment(self.paths[i])
+        # Later segments repeat the CSV header; their data starts after it
+        self._skip = len(self._file.readline()) if i > 0 else 0
+
+    def _segment_size(self, i):
+        if self._sizes[i] is None:
+            with open_segment(self.paths[i]) as f:
+                size = 0
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    size += len(block)
+            self._sizes[i] = size
+        return self._sizes[i]
+
+    def _segment_bases(self):
+        if self._bases is None:
+            bases = [0]
+            for i in range(len(self.paths) - 1):
+                with open_segment(self.paths[i]) as f:
+                    header = len(f.readline()) if i > 0 else 0
+                bases.append(bases[-1] + self._segment_size(i) - header)
+            self._bases = bases
+        return self._bases
+
+    def readline(self):
+        while True:
+            line = self._file.readline()
+            if line or self._index + 1 >= len(self.paths):
+                return line
+            self._open(self._index + 1)
+
+    def __iter__(self):
+        return iter(self.readline, b"")
+
+    def tell(self):
+        return self._segment_bases()[self._index] + self._file.tell() - self._skip
+
+    def seek(self, offset):
+        bases = self._segment_bases()
+        i = max(0, bisect.bisect_right(bases, offset) - 1)
+        if i != self._index:
+            self._open(i)
+        self._file.seek(self._skip + offset - bases[i])
+        return offset
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def resolve_log(path):
+    """The manifest when `path` is one segment of a rotated trip, otherwise `path`."""
+    return TripManifest.for_segment(path) or path
+
+
+def open_log(path):
+    """
+    Binary stream over the CSV text of a trip log: a plain CSV, a compressed segment or a
+    trip manifest (all segments in order).
+    """
+    if TripManifest.is_manifest(path):
+        manifest = TripManifest.load(path)
+        if manifest.data.get("format", "csv") != "csv":
+            raise ValueError(f"{path} lists binary segments; convert it with binary_log.as_csv")
+        if not manifest.segments:
+            raise ValueError(f"{path} has no segments")
+        return SegmentReader(manifest.segment_paths(), manifest.segment_sizes())
+    return open_segment(path)
+
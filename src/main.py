@@ -1,9 +1,10 @@
 from obd_handler import OBDHandler
+from capability_cache import CapabilityCache
 from ui.main_window import DashboardApp
 
 SIMULATION_MODE = False
 
 if __name__ == "__main__":
-    handler = OBDHandler(simulation=SIMULATION_MODE)
+    handler = OBDHandler(simulation=SIMULATION_MODE, capability_cache=CapabilityCache())
     app = DashboardApp(handler)
     app.mainloop()
\ No newline at end of file
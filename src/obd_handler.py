@@ -1,21 +1,86 @@
 import obd
 from obd import OBDCommand
 from obd.utils import bytes_to_int
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+from query_planner import DEFAULT_HEADER, normalize_header, plan_queries
+from formula_compiler import compile_formula, FormulaError
+from link_tuner import LinkTuner, ELM_DEFAULT_TIMEOUT, FAST_LINK_TIMEOUT
+from elm_transport import ElmTransport, TransportError
+from pid_decoders import STANDARD_DECODERS
+from replay_engine import ReplayEngine
+from binary_log import is_binary_log, BinaryReplayEngine
+from log_segments import TripManifest, resolve_log
 import random
 import time
 import re
+import threading
+
+# ISO 15765-4 (CAN) protocol ids as reported by the ELM327; only these accept multi-PID Mode 01 requests
+CAN_PROTOCOL_IDS = ("6", "7", "8", "9")
+MAX_PIDS_PER_REQUEST = 6
+# A pro-pack PID is marked unsupported after this many empty replies in a row (or one 7F / NO DATA)
+PROBE_MISS_LIMIT = 3
+# Multi-PID requests stay on until the ECU answers one with 7F 01, or this many in a row go unanswered
+BATCH_FAILURE_LIMIT = 3
+
+
+class _CachedOBD(obd.OBD):
+    """python-obd connection that trusts a cached supported-command set instead of scanning PIDs on connect."""
+
+    def __init__(self, cached_commands, **kwargs):
+        self._cached_commands = cached_commands
+        super().__init__(**kwargs)
+
+    def _OBD__load_commands(self):
+        # Overrides the name-mangled OBD.__load_commands that OBD.__init__ runs after connecting
+        if self._cached_commands is None:
+            return super()._OBD__load_commands()
+        self.supported_commands.update(self._cached_commands)
+
+    def rescan_commands(self):
+        self._cached_commands = None
+        self.supported_commands = set(obd.commands.base_commands())
+        self._OBD__load_commands()
 
 
 class OBDHandler:
-    def __init__(self, simulation=False, log_callback=None):
+    def __init__(self, simulation=False, log_callback=None, capability_cache=None):
         self.simulation = simulation
         self.connection = None
         self.status = "Disconnected"
         self.log_callback = log_callback
         self.inter_command_delay = 0.01
+        self.lock = threading.RLock()
 
         self.pro_defs = {}
+        self.compiled_formulas = {}
         self.supported_commands = set()
+        self.batch_supported = False
+        self.batch_failures = 0
+        self.current_header = None
+
+        self.capability_cache = capability_cache
+        self.background_verify = True
+        self.vehicle_id = None
+        self.pro_probes = {}
+        self.probe_misses = {}
+
+        # Optional ELM327 adaptive timing + response-count hints, see set_fast_link()
+        self.fast_link = False
+        self.link_tuner = LinkTuner()
+        # Optional in-project ELM327 request loop (CAN only); python-obd's query stays the fallback
+        self.fast_transport = False
+        self.transport = None
+
+        # CSV log replay; query_sensor is served from the replayed row instead of the car
+        self.replay = None
+        self.replay_mode = False
+
+        # Acquisition time of each sensor's latest value, in ns: time.monotonic_ns() when the
+        # response arrived, or the log's own sample time while replaying
+        self.sample_times = {}
+        self.last_response_ns = None
 
         self.sim_start_time = time.time()
         self.sim_speed = 0
@@ -27,11 +92,81 @@ class OBDHandler:
 
     def set_pro_definitions(self, defs):
         self.pro_defs = defs
+        self.compiled_formulas = {}
+        for key, definition in defs.items():
+            if len(definition) < 8: continue
+            formula = definition[7]
+            try:
+                self.compiled_formulas[formula] = compile_formula(formula)
+            except FormulaError as e:
+                self.compiled_formulas[formula] = None
+                self.log(f"Invalid formula for {key}: {e}")
 
     def is_connected(self):
-        return self.status == "Connected" or self.status == "Connected (SIMULATION)"
+        return self.status in ("Connected", "Connected (SIMULATION)", "Connected (REPLAY)")
+
+    @property
+    def replay_active(self):
+        return self.replay is not None and self.replay.running
+
+    # --- CSV REPLAY ---
+    def start_replay(self, filepath, speed=1.0):
+        """Replays a DataLogger log as if it were a live car. Returns False if the file isn't a log."""
+        filepath = resolve_log(filepath)
+        engine = None
+        if is_binary_log(filepath) or TripManifest.is_manifest(filepath):
+            # Binary logs play from their chunks; CSV manifests fall through to ReplayEngine
+            engine = BinaryReplayEngine(filepath, speed)
+            if not engine.open():
+                engine = None
+
+        if engine is None:
+            engine = ReplayEngine(filepath, speed)
+            if not engine.open():
+                self.log(f"Replay Error: {filepath} is not a PyOBD log (no Timestamp column).")
+                return False
+
+        if self.replay is not None:
+            self.stop_replay()
+        if self.is_connected():
+            self.disconnect()
+
+        with self.lock:
+            self.replay = engine
+            self.replay_mode = True
+            self.status = "Connected (REPLAY)"
+            engine.start()
+        self.log(f"Replaying {filepath} ({len(engine.headers)} sensors)")
+        return True
+
+    def stop_replay(self):
+        with self.lock:
+            if self.replay is None: return
+            self.replay.stop()
+            self.replay = None
+            self.replay_mode = False
+            if self.status == "Connected (REPLAY)":
+                self.status = "Disconnected"
+        self.log("Replay stopped.")
+
+    def set_replay_speed(self, speed):
+        """Replay speed multiplier (1.0 = real time); None replays as fast as possible."""
+        if self.replay is not None:
+            self.replay.set_speed(speed)
+
+    def seek_replay(self, seconds):
+        """Jumps to `seconds` into the log. False while the time index is still being built."""
+        if self.replay is None: return False
+        return self.replay.seek(seconds)
+
+    def seek_replay_to(self, key, op, value):
+        """Jumps to the next row where `key op value` (e.g. "COOLANT_TEMP", ">", 110). False if none."""
+        if self.replay is None: return False
+        seconds = self.replay.find_next(key, op, value)
+        return seconds is not None and self.replay.seek(seconds)
 
     def connect(self, port_name=None):
+        self.current_header = None
         if self.simulation:
             self.log("Attempting connection (SIMULATION)...")
             self.status = "Connected (SIMULATION)"
@@ -40,12 +175,33 @@ class OBDHandler:
             return True
 
         self.log(f"Attempting connection to {port_name if port_name else 'Auto-Scan'}...")
+        portstr = port_name if port_name and port_name != "Auto" else None
 
         try:
-            if port_name and port_name != "Auto":
-                self.connection = obd.OBD(portstr=port_name, fast=False, timeout=30)
-            else:
-                self.connection = obd.OBD(fast=False, timeout=30)
+            self.connection = None
+            self.vehicle_id = None
+            self.pro_probes = {}
+            self.probe_misses = {}
+            self.link_tuner.reset()
+
+            vehicle_id, cached = None, None
+            if self.capability_cache is not None:
+                vehicle_id, cached = self.capability_cache.lookup_port(portstr)
+            if cached:
+                self.connection = self._open_cached(portstr, vehicle_id, cached)
+                if self.connection is None or not self.connection.is_connected():
+                    self.log("Cached vehicle profile failed, falling back to full detection...")
+                    if self.connection:
+                        self.connection.close()
+                    self.connection = None
+                    self.capability_cache.forget_port(portstr)
+                    cached = None
+
+            if self.connection is None:
+                if portstr:
+                    self.connection = obd.OBD(portstr=portstr, fast=False, timeout=30)
+                else:
+                    self.connection = obd.OBD(fast=False, timeout=30)
 
             if self.connection.is_connected():
                 self.status = "Connected"
@@ -54,6 +210,22 @@ class OBDHandler:
 
                 self.supported_commands = self.connection.supported_commands
                 self.log(f"Auto-Detected {len(self.supported_commands)} supported sensors.")
+
+                self.batch_supported = self.connection.protocol_id() in CAN_PROTOCOL_IDS
+                self.batch_failures = 0
+                if self.fast_link:
+                    self._apply_fast_link()
+                if self.fast_transport:
+                    self._open_transport()
+
+                if cached:
+                    self.vehicle_id = vehicle_id
+                    self.pro_probes = dict(cached.get("pro_probes", {}))
+                    if self.background_verify:
+                        threading.Thread(target=self.verify_cached_capabilities, args=(portstr,),
+                                         daemon=True).start()
+                elif self.capability_cache is not None:
+                    self._remember_vehicle(portstr)
                 return True
             else:
                 self.status = "Failed"
@@ -65,15 +237,30 @@ class OBDHandler:
             return False
 
     def disconnect(self):
+        if self.replay_mode:
+            self.stop_replay()
+            return
+
         self.log("Disconnecting...")
-        if self.connection:
-            self.connection.close()
-            self.connection = None
-        self.status = "Disconnected"
-        self.supported_commands = set()
+        with self.lock:
+            if self.capability_cache is not None and self.vehicle_id:
+                self.capability_cache.update_probes(self.vehicle_id, self.pro_probes)
+            average = self.link_tuner.average_latency()
+            if average is not None:
+                self.log(f"Average request latency: {average:.1f} ms")
+            self.link_tuner.reset()
+            self.transport = None
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+            self.status = "Disconnected"
+            self.supported_commands = set()
+            self.batch_supported = False
+            self.current_header = None
         self.log("Disconnected.")
 
     def check_supported(self, command_key):
+        if self.replay_mode: return command_key in self.replay.headers
         if self.simulation: return True
         if not self.is_connected(): return False
 
@@ -82,21 +269,220 @@ class OBDHandler:
             return cmd in self.supported_commands
 
         if command_key in self.pro_defs:
-            return True
+            # Pro-pack PIDs that never answered on this vehicle (per the capability cache) are skipped
+            return self.pro_probes.get(command_key, True)
 
         return False
 
+    # --- FAST LINK ---
+    def set_fast_link(self, enabled):
+        """Turns ELM327 adaptive timing and response-count hints on or off (applied on connect too)."""
+        with self.lock:
+            self.fast_link = enabled
+            if not self.is_connected() or self.simulation or self.connection is None: return
+            if enabled:
+                self._apply_fast_link()
+            else:
+                self._disable_fast_link("turned off")
+
+    def _apply_fast_link(self):
+        if self._send_at("ATAT2") and self._send_at(f"ATST{FAST_LINK_TIMEOUT}"):
+            self.link_tuner.enabled = True
+            self.log("Fast link enabled (adaptive timing, response-count hints).")
+        else:
+            self._disable_fast_link("adapter rejected ATAT2/ATST")
+
+    def _disable_fast_link(self, reason):
+        self.fast_link = False
+        self.link_tuner.disable()
+        self._send_at("ATAT1")
+        self._send_at(f"ATST{ELM_DEFAULT_TIMEOUT}")
+        self.log(f"Fast link disabled: {reason}.")
+
+    def _send_at(self, command):
+        """Sends an AT command straight to the ELM327; True if it answered OK."""
+        try:
+            messages = self.connection.interface.send_and_parse(command.encode())
+            return any("OK" in m.raw() for m in messages or [])
+        except Exception:
+            return False
+
+    def _send(self, cmd, force=False):
+        """
+        Sends an OBD request through the fast transport when it is open, otherwise connection.query.
+        Tracks per-request latency and, in fast link mode, appends the response-count hint.
+        """
+        request = cmd.command.decode()
+        suffix = self.link_tuner.suffix_for(request)
+
+        start = time.perf_counter()
+        response = None
+        if self.transport is not None:
+            try:
+                response = cmd(self.transport.request((request + suffix).encode()))
+            except TransportError as e:
+                self._close_transport(str(e))
+
+        if response is None:
+            if suffix:
+                cmd = cmd.clone()
+                cmd.command = (request + suffix).encode()
+                force = True
+            response = self.connection.query(cmd, force=force)
+        self.last_response_ns = time.monotonic_ns()
+        elapsed = time.perf_counter() - start
+        messages = [] if response.is_null() else response.messages
+        self.link_tuner.record(request, messages, suffix, elapsed)
+
+        if self.link_tuner.misbehaving():
+            self._disable_fast_link("adapter dropped hinted requests")
+        return response
+
+    def _open_transport(self):
+        self.transport = ElmTransport.from_connection(self.connection)
+        if self.transport is None:
+            self.log("Fast transport not available on this link, using python-obd.")
+        else:
+            self.log("Fast transport enabled.")
+
+    def _close_transport(self, reason):
+        self.transport = None
+        self.log(f"Fast transport disabled ({reason}), falling back to python-obd.")
+
+    def link_latency(self):
+        """{request: (count, average_ms, last_ms, max_ms)} measured since connecting."""
+        return self.link_tuner.latency_report()
+
+    # --- CAPABILITY CACHE ---
+    def _open_cached(self, portstr, vehicle_id, cached):
+        names = cached.get("commands", [])
+        commands = {obd.commands[name] for name in names if obd.commands.has_name(name)}
+        self.log(f"Fast connect: cached profile for {vehicle_id} (protocol {cached.get('protocol')})")
+        try:
+            return _CachedOBD(commands, portstr=portstr, protocol=cached.get("protocol"), fast=False, timeout=30)
+        except Exception as e:
+            self.log(f"Fast connect failed: {e}")
+            return None
+
+    def _read_vehicle_id(self, portstr):
+        """VIN via Mode 09, or a per-port placeholder for cars that don't report one."""
+        try:
+            response = self.connection.query(obd.commands.VIN, force=True)
+            if not response.is_null() and response.value:
+                vin = response.value
+                if isinstance(vin, (bytes, bytearray)):
+                    vin = vin.decode(errors="ignore")
+                vin = str(vin).strip().strip("\x00")
+                if vin:
+                    return vin
+        except Exception:
+            pass
+        return f"NO_VIN@{self.capability_cache.port_key(portstr)}"
+
+    def _remember_vehicle(self, portstr):
+        with self.lock:
+            self.vehicle_id = self._read_vehicle_id(portstr)
+            names = [cmd.name for cmd in self.supported_commands]
+            self.capability_cache.store(self.vehicle_id, portstr, self.connection.protocol_id(), names,
+                                        self.pro_probes)
+        self.log(f"Saved capability profile for {self.vehicle_id}.")
+
+    def _pids_match_cache(self):
+        response = self.connection.query(obd.commands.PIDS_A, force=True)
+        if response.is_null() or response.value is None:
+            return False
+        for i, bit in enumerate(response.value):
+            pid = i + 1
+            if obd.commands.has_pid(1, pid):
+                if bool(bit) != (obd.commands[1][pid] in self.supported_commands):
+                    return False
+        return True
+
+    def verify_cached_capabilities(self, portstr):
+        """Runs after a fast connect: confirms VIN and PID support, rescanning if the car changed."""
+        with self.lock:
+            if not self.is_connected() or self.connection is None: return
+            try:
+                vehicle_id = self._read_vehicle_id(portstr)
+                if vehicle_id == self.vehicle_id and self._pids_match_cache():
+                    self.log(f"Cached profile verified for {vehicle_id}.")
+                    self._reprobe_negatives()
+                    return
+
+                self.log("Vehicle or PID support differs from cache, rescanning supported PIDs...")
+                if hasattr(self.connection, "rescan_commands"):
+                    self.connection.rescan_commands()
+                self.supported_commands = self.connection.supported_commands
+                if vehicle_id != self.vehicle_id:
+                    self.pro_probes = {}
+                    self.probe_misses = {}
+                self.vehicle_id = vehicle_id
+                self._reprobe_negatives()
+
+                names = [cmd.name for cmd in self.supported_commands]
+                self.capability_cache.store(vehicle_id, portstr, self.connection.protocol_id(), names,
+                                            self.pro_probes)
+                self.log(f"Capability profile updated: {len(self.supported_commands)} supported sensors.")
+            except Exception as e:
+                self.log(f"Capability verification failed: {e}")
+
+    def _reprobe_negatives(self):
+        """Asks every pro-pack PID cached as unsupported again; a silent one needs new misses to stay off."""
+        for key in [k for k, ok in self.pro_probes.items() if ok is False and k in self.pro_defs]:
+            del self.pro_probes[key]
+            self.probe_misses.pop(key, None)
+            self._query_custom_pid(key)
+            if key in self.pro_probes:
+                self.log(f"Re-probed {key}: {'supported' if self.pro_probes[key] else 'unsupported'}.")
+
+    def _probe_missed(self, key, rejected=False):
+        """Counts an empty reply; marks the PID unsupported on a 7F / NO DATA or after PROBE_MISS_LIMIT in a row."""
+        misses = self.probe_misses.get(key, 0) + 1
+        self.probe_misses[key] = misses
+        if rejected or misses >= PROBE_MISS_LIMIT:
+            # A PID that has answered stays supported; the engine may just be off
+            self.pro_probes.setdefault(key, False)
+
     def _set_header(self, header_hex):
-        """Manually sends an AT SH command to the ELM327"""
+        """Manually sends an AT SH command to the ELM327, unless the adapter already uses that header"""
+        header_hex = normalize_header(header_hex)
         if not header_hex: return
+        if header_hex == self.current_header: return
         try:
             cmd = OBDCommand("SET_HEADER", "Set Header", f"ATSH{header_hex}".encode(), 0, lambda m: m)
             self.connection.query(cmd, force=True)
+            self.current_header = header_hex
         except Exception as e:
+            self.current_header = None
             self.log(f"Header Error: {e}")
 
+    def _header_for(self, command_key):
+        if hasattr(obd.commands, command_key):
+            return DEFAULT_HEADER
+        definition = self.pro_defs.get(command_key)
+        if definition is not None and len(definition) >= 8:
+            return normalize_header(definition[6])
+        return None
+
     def query_sensor(self, command_key):
+        # The polling engine and UI-triggered scans share one serial link
+        with self.lock:
+            return self._query_sensor(command_key)
+
+    def _query_sensor(self, command_key):
+        val = self._read_sensor(command_key)
+        if val is not None:
+            self.sample_times[command_key] = self._arrival_ns(command_key)
+        return val
+
+    def _arrival_ns(self, command_key):
+        if self.replay_mode: return self.replay.sample_time_ns(command_key)
+        if self.simulation or self.last_response_ns is None: return time.monotonic_ns()
+        return self.last_response_ns
+
+    def _read_sensor(self, command_key):
         if not self.is_connected(): return None
+        if self.replay_mode: return self.replay.get(command_key)
         if self.simulation: return self._simulate_data(command_key)
 
         if hasattr(obd.commands, command_key):
@@ -105,15 +491,23 @@ class OBDHandler:
             if cmd not in self.supported_commands:
                 return None
 
+            # Only switch back when a pro-pack PID left the adapter on another ECU
+            if self.current_header not in (None, DEFAULT_HEADER):
+                self._set_header(DEFAULT_HEADER)
+
             time.sleep(self.inter_command_delay)
             try:
-                response = self.connection.query(cmd)
+                decoder = STANDARD_DECODERS.get(command_key)
+                if decoder is not None and decoder.command is cmd:
+                    # Raw request + table decoder, no pint Quantity per sample
+                    response = self._send(decoder.raw_command)
+                    if response.is_null() or not response.messages: return None
+                    return decoder(response.messages[0].data[2:])
+
+                response = self._send(cmd)
                 if response.is_null(): return None
 
-                val = response.value.magnitude
-                if isinstance(val, float):
-                    return round(val, 2)
-                return val
+                return self._to_number(response.value)
             except:
                 return None
 
@@ -122,6 +516,152 @@ class OBDHandler:
 
         return None
 
+    def _to_number(self, value):
+        val = value.magnitude
+        if isinstance(val, float):
+            return round(val, 2)
+        return val
+
+    def query_sensors(self, command_keys):
+        """
+        Queries several sensors in one go. Queries are ordered by ECU header so each header
+        is set at most once, and standard Mode 01 PIDs are packed up to MAX_PIDS_PER_REQUEST
+        per request on CAN ECUs. Returns {key: value} for every sensor that answered.
+        """
+        with self.lock:
+            if not self.is_connected(): return {}
+            if self.replay_mode:
+                results = {}
+                for key in command_keys:
+                    val = self._query_sensor(key)
+                    if val is not None:
+                        results[key] = val
+                return results
+
+            results = {}
+            batchable = []
+            for key in plan_queries(command_keys, self._header_for, self.current_header):
+                cmd = self._batchable_command(key)
+                if cmd is not None and self.batch_supported:
+                    batchable.append((key, cmd))
+                    continue
+
+                results.update(self._query_batchable(batchable))
+                batchable = []
+                val = self._query_sensor(key)
+                if val is not None:
+                    results[key] = val
+
+            results.update(self._query_batchable(batchable))
+            return results
+
+    def _query_batchable(self, batchable):
+        results = {}
+        for i in range(0, len(batchable), MAX_PIDS_PER_REQUEST):
+            chunk = batchable[i:i + MAX_PIDS_PER_REQUEST]
+            if len(chunk) == 1 or not self.batch_supported:
+                for key, cmd in chunk:
+                    val = self._query_sensor(key)
+                    if val is not None:
+                        results[key] = val
+            else:
+                results.update(self._query_batch(chunk))
+        return results
+
+    def _batchable_command(self, command_key):
+        if self.simulation or not hasattr(obd.commands, command_key):
+            return None
+        cmd = getattr(obd.commands, command_key)
+        if cmd not in self.supported_commands:
+            return None
+        if cmd.mode != 1 or not cmd.bytes or cmd.bytes <= 2:
+            return None
+        return cmd
+
+    def _query_batch(self, chunk):
+        if self.current_header not in (None, DEFAULT_HEADER):
+            self._set_header(DEFAULT_HEADER)
+
+        request = "01" + "".join(f"{cmd.pid:02X}" for _, cmd in chunk)
+        multi_cmd = OBDCommand("MULTI_PID", "Multi PID", request.encode(), 0, lambda m: m)
+
+        time.sleep(self.inter_command_delay)
+        try:
+            response = self._send(multi_cmd, force=True)
+            messages = [] if response.is_null() else response.messages
+        except Exception:
+            messages = []
+        arrived = self.last_response_ns
+
+        values = self._split_batch_response(messages, chunk)
+        for key in values:
+            self.sample_times[key] = arrived
+
+        if values:
+            self.batch_failures = 0
+        elif any(m.data[:2] == b"\x7f\x01" for m in messages):
+            self.batch_supported = False
+            self.log("ECU rejected multi-PID request, falling back to single PID queries.")
+        else:
+            # Empty reply, bus timeout or send error: may be a glitch, so only several in a row count
+            self.batch_failures += 1
+            if self.batch_failures >= BATCH_FAILURE_LIMIT:
+                self.batch_supported = False
+                self.log(f"No answer to {BATCH_FAILURE_LIMIT} multi-PID requests in a row, "
+                         "falling back to single PID queries.")
+
+        # PIDs the ECU left out of the combined answer are retried individually
+        for key, cmd in chunk:
+            if key not in values:
+                val = self._query_sensor(key)
+                if val is not None:
+                    values[key] = val
+        return values
+
+    def _split_batch_response(self, messages, chunk):
+        by_pid = {cmd.pid: (key, cmd) for key, cmd in chunk}
+        values = {}
+
+        # Prefer the engine ECU when several modules answer the same request
+        for message in sorted(messages, key=lambda m: m.ecu != ECU.ENGINE):
+            data = bytes(message.data)
+            if len(data) < 2 or data[0] != 0x41:
+                continue
+
+            i = 1
+            while i < len(data):
+                entry = by_pid.get(data[i])
+                if entry is None:
+                    break
+                key, cmd = entry
+                length = cmd.bytes - 2
+                payload = data[i + 1:i + 1 + length]
+                if len(payload) < length:
+                    break
+
+                if key not in values:
+                    val = self._decode_payload(cmd, payload)
+                    if val is not None:
+                        values[key] = val
+                i += 1 + length
+
+        return values
+
+    def _decode_payload(self, cmd, payload):
+        """Decodes the data bytes of a single PID, with the table decoder when there is one."""
+        decoder = STANDARD_DECODERS.get(cmd.name)
+        if decoder is not None:
+            return decoder(payload)
+
+        message = Message([])
+        message.data = bytearray([0x41, cmd.pid]) + bytearray(payload)
+        try:
+            value = cmd.decode([message])
+            if value is None: return None
+            return self._to_number(value)
+        except Exception:
+            return None
+
     def _query_custom_pid(self, key):
         definition = self.pro_defs[key]
         if len(definition) < 8: return None
@@ -141,35 +681,50 @@ class OBDHandler:
 
             cmd = OBDCommand("CUSTOM_PID", "Custom PID", f"{mode}{pid}".encode(), 0, lambda m: m)
 
-            raw_response = self.connection.query(cmd, force=True)
+            raw_response = self._send(cmd, force=True)
 
-            if raw_response.is_null(): return None
-            if not raw_response.messages: return None
-            data_bytes = raw_response.messages[0].data
+            messages = [] if raw_response.is_null() else raw_response.messages
+            if any(m.data[:1] == b"\x7f" or "NO DATA" in m.raw() for m in messages):
+                self._probe_missed(key, rejected=True)
+                return None
+            if not messages or not messages[0].data:
+                self._probe_missed(key)
+                return None
+            data_bytes = messages[0].data
 
-            return self._calculate_formula(formula, data_bytes)
+            value = self._calculate_formula(formula, data_bytes)
+            if value is not None:
+                self.pro_probes[key] = True
+                self.probe_misses.pop(key, None)
+            return value
 
         except Exception as e:
             return None
 
     def _calculate_formula(self, formula, data_bytes):
-        variables = {}
-        for i, byte_val in enumerate(data_bytes):
-            char_code = 65 + i
-            if char_code > 90: break
-            variables[chr(char_code)] = byte_val
-
-        try:
-            allowed_names = {"min": min, "max": max, "abs": abs, "signed": self._signed}
-            allowed_names.update(variables)
-            result = eval(formula, {"__builtins__": {}}, allowed_names)
-            return float(result)
-        except:
-            return None
+        if formula not in self.compiled_formulas:
+            try:
+                self.compiled_formulas[formula] = compile_formula(formula)
+            except FormulaError:
+                self.compiled_formulas[formula] = None
+
+        compiled = self.compiled_formulas[formula]
+        if compiled is None: return None
+        return compiled(data_bytes)
+
+    def decode_batch(self, key, byte_matrix, lengths=None):
+        """
+        Re-decodes captured raw responses (N x K bytes) of one pro-pack PID in a single
+        vectorized pass. Returns a float array with NaN where a response can't be decoded.
+        """
+        definition = self.pro_defs.get(key)
+        if definition is None or len(definition) < 8:
+            raise KeyError(f"No pro-pack formula for {key}")
 
-    def _signed(self, val):
-        if val > 127: return val - 256
-        return val
+        formula = definition[7]
+        if self.compiled_formulas.get(formula) is None:
+            self.compiled_formulas[formula] = compile_formula(formula)
+        return self.compiled_formulas[formula].evaluate_batch(byte_matrix, lengths)
 
     # --- UDS DIAGNOSTICS LOGIC ---
     def _decode_uds_dtc(self, byte1, byte2, byte3):
@@ -222,6 +777,10 @@ class OBDHandler:
         return codes
 
     def get_dtc(self):
+        with self.lock:
+            return self._get_dtc()
+
+    def _get_dtc(self):
         if not self.is_connected(): return {}
         self.log("Starting Deep DTC Scan...")
 
@@ -237,6 +796,8 @@ class OBDHandler:
 
         if self.simulation:
             return {"ENGINE - CONFIRMED": [("P0300", "Random Misfire")]}
+        if self.replay_mode:
+            return {}
 
         try:
             self.log("Scanning Engine (Standard)...")
@@ -297,6 +858,10 @@ class OBDHandler:
         return snapshot
 
     def clear_dtc(self):
+        with self.lock:
+            return self._clear_dtc()
+
+    def _clear_dtc(self):
         self.log("Attempting to Clear DTCs...")
         if self.simulation:
             time.sleep(1)
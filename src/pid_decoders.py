@@ -0,0 +1,67 @@
+import obd
+from obd import OBDCommand
+
+from constants import STANDARD_SENSORS
+
+
+def _round(value):
+    # Same rounding query_sensor applies to python-obd magnitudes
+    return round(value, 2) if isinstance(value, float) else value
+
+
+# Decoding of every STANDARD_SENSORS PID as (data bytes, function of the raw unsigned value).
+# The arithmetic mirrors python-obd's decoders (including which results stay int) so values
+# are identical, just without building a pint Quantity per sample. Units are the ones
+# STANDARD_SENSORS declares.
+DECODER_FORMULAS = {
+    "RPM": (2, lambda v: v * 0.25),
+    "SPEED": (1, lambda v: float(v)),
+    "COOLANT_TEMP": (1, lambda v: v - 40),
+    "CONTROL_MODULE_VOLTAGE": (2, lambda v: v * 0.001),
+    "ENGINE_LOAD": (1, lambda v: v * 100.0 / 255.0),
+    "THROTTLE_POS": (1, lambda v: v * 100.0 / 255.0),
+    "INTAKE_TEMP": (1, lambda v: v - 40),
+    "MAF": (2, lambda v: v * 0.01),
+    "FUEL_LEVEL": (1, lambda v: v * 100.0 / 255.0),
+    "BAROMETRIC_PRESSURE": (1, lambda v: v),
+    "TIMING_ADVANCE": (1, lambda v: (v - 128) / 2.0),
+    "RUN_TIME": (2, lambda v: float(v)),
+}
+
+
+def _no_decode(messages):
+    return messages
+
+
+class PIDDecoder:
+    """Table-driven decoder for one Mode 01 PID. Single-byte PIDs are a precomputed 256-entry lookup."""
+
+    def __init__(self, key, size, formula):
+        command = obd.commands[key]
+        self.command = command
+        self.key = key
+        self.pid = command.pid
+        self.size = size
+        self.formula = formula
+        self.table = tuple(_round(formula(v)) for v in range(256)) if size == 1 else None
+        # Same request, ECU filter and length handling as the python-obd command, minus its decoder
+        self.raw_command = OBDCommand(command.name, command.desc, command.command, command.bytes,
+                                      _no_decode, command.ecu, command.fast)
+
+    def __call__(self, payload):
+        """`payload` is the data after the 41 <PID> echo. Returns None if it is too short."""
+        if len(payload) < self.size:
+            return None
+        if self.table is not None:
+            return self.table[payload[0]]
+        return _round(self.formula(int.from_bytes(payload[:self.size], "big")))
+
+
+STANDARD_DECODERS = {key: PIDDecoder(key, *DECODER_FORMULAS[key]) for key in STANDARD_SENSORS}
+
+
+def decode_standard(key, payload):
+    decoder = STANDARD_DECODERS.get(key)
+    if decoder is None:
+        return None
+    return decoder(payload)
@@ -0,0 +1,95 @@
+import time
+
+from constants import DEFAULT_POLL_RATE_HZ
+
+
+class PollScheduler:
+    """
+    Earliest-deadline-first scheduler for sensor polling.
+    Every sensor has a target rate (Hz); its deadline is the moment its value becomes stale.
+    """
+
+    # A sensor counts as missing its rate when it refreshes this much slower than requested
+    OVERLOAD_TOLERANCE = 1.5
+    # Smoothing factor for the achieved polling interval
+    EWMA_ALPHA = 0.2
+
+    def __init__(self):
+        self._entries = {}
+
+    def configure(self, rates, now=None):
+        """Sets the polled sensors as {key: rate_hz}. Sensors already scheduled keep their deadline."""
+        if now is None:
+            now = time.monotonic()
+
+        entries = {}
+        for key, rate in rates.items():
+            if not rate or rate <= 0:
+                rate = DEFAULT_POLL_RATE_HZ
+            period = 1.0 / rate
+
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"period": period, "deadline": now, "last_poll": None, "interval": None}
+            else:
+                entry["deadline"] = min(entry["deadline"], now + period)
+                entry["period"] = period
+            entries[key] = entry
+
+        self._entries = entries
+
+    def keys(self):
+        return list(self._entries.keys())
+
+    def due(self, now=None, limit=None):
+        """Sensors whose deadline has passed, most overdue first."""
+        if now is None:
+            now = time.monotonic()
+        due = [(e["deadline"], key) for key, e in self._entries.items() if e["deadline"] <= now]
+        due.sort()
+        if limit is not None:
+            due = due[:limit]
+        return [key for _, key in due]
+
+    def next_deadline(self):
+        if not self._entries:
+            return None
+        return min(e["deadline"] for e in self._entries.values())
+
+    def mark_polled(self, key, now=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        if now is None:
+            now = time.monotonic()
+
+        if entry["last_poll"] is not None:
+            interval = now - entry["last_poll"]
+            if entry["interval"] is None:
+                entry["interval"] = interval
+            else:
+                entry["interval"] += self.EWMA_ALPHA * (interval - entry["interval"])
+        entry["last_poll"] = now
+
+        # Keep the sensor's phase while it is on time; once it falls more than a period behind,
+        # restart from now instead of building up a backlog of overdue polls
+        next_deadline = entry["deadline"] + entry["period"]
+        if next_deadline <= now:
+            next_deadline = now + entry["period"]
+        entry["deadline"] = next_deadline
+
+    def rate_report(self):
+        """{key: (target_hz, achieved_hz)}; achieved is None until a sensor was polled twice."""
+        report = {}
+        for key, e in self._entries.items():
+            achieved = 1.0 / e["interval"] if e["interval"] else None
+            report[key] = (1.0 / e["period"], achieved)
+        return report
+
+    def lagging(self):
+        """Sensors the bus cannot refresh at their requested rate."""
+        lagging = {}
+        for key, (target, achieved) in self.rate_report().items():
+            if achieved is not None and achieved * self.OVERLOAD_TOLERANCE < target:
+                lagging[key] = (target, achieved)
+        return lagging
@@ -0,0 +1,160 @@
+import threading
+import time
+
+from constants import SENSOR_POLL_RATES, DEFAULT_POLL_RATE_HZ, GRAPH_POLL_RATE_HZ
+from poll_scheduler import PollScheduler
+
+
+class PollingEngine:
+    """
+    Owns the OBDHandler polling loop on a background thread.
+    Sensors are picked earliest-deadline-first by a PollScheduler and every value read
+    is pushed into a SensorStore; the UI only reads from the store.
+    """
+
+    # Most sensors handed to OBDHandler.query_sensors in one go (one full multi-PID batch)
+    MAX_SENSORS_PER_POLL = 6
+    # How often the bus overload warning may be repeated (seconds)
+    LAG_REPORT_INTERVAL = 10.0
+
+    def __init__(self, obd_handler, store, on_cycle=None, cycle_interval=0.05):
+        self.obd = obd_handler
+        self.store = store
+        self.on_cycle = on_cycle
+        self.cycle_interval = cycle_interval
+        self.scheduler = PollScheduler()
+
+        self.running = False
+        self.thread = None
+        self._lock = threading.Lock()
+        self._rates = {}
+        self._rates_dirty = False
+
+        self._pending_snapshot = {}
+        self._pending_times = {}
+        self._last_cycle = time.monotonic()
+        self._last_lag_report = 0
+
+        self.cycle_count = 0
+        self.sample_count = 0
+
+    def start(self):
+        if self.running: return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+
+    def rate_for(self, key, priority=()):
+        rate = SENSOR_POLL_RATES.get(key)
+
+        definition = self.obd.pro_defs.get(key)
+        if definition is not None and len(definition) > 8:
+            try:
+                rate = float(definition[8])
+            except (TypeError, ValueError):
+                pass
+
+        if rate is None:
+            rate = DEFAULT_POLL_RATE_HZ
+        if key in priority:
+            rate = max(rate, GRAPH_POLL_RATE_HZ)
+        return rate
+
+    def set_sensors(self, sensors, priority=()):
+        """Called from the UI thread with the sensors that are shown or logged."""
+        rates = {key: self.rate_for(key, priority) for key in sensors}
+        with self._lock:
+            if rates != self._rates:
+                self._rates = rates
+                self._rates_dirty = True
+
+    def _apply_rates(self):
+        with self._lock:
+            if not self._rates_dirty:
+                return
+            rates = dict(self._rates)
+            self._rates_dirty = False
+        self.scheduler.configure(rates)
+
+    def poll_once(self, now=None):
+        """Queries every sensor that is due. Returns {key: value} of the answers."""
+        self._apply_rates()
+        if now is None:
+            now = time.monotonic()
+
+        due = self.scheduler.due(now, limit=self.MAX_SENSORS_PER_POLL)
+        if not due:
+            return {}
+
+        data_snapshot = self.obd.query_sensors(due)
+
+        done = max(now, time.monotonic())
+        for cmd in due:
+            self.scheduler.mark_polled(cmd, done)
+
+        # Values are stamped with the time their response arrived, not the time they are stored
+        sample_times = self.obd.sample_times
+        times = {}
+        for cmd, val in data_snapshot.items():
+            ns = sample_times.get(cmd) or time.monotonic_ns()
+            times[cmd] = ns
+            self.store.update(cmd, val, ns / 1e9)
+        self.sample_count += len(data_snapshot)
+
+        self._pending_snapshot.update(data_snapshot)
+        self._pending_times.update(times)
+        return data_snapshot
+
+    def flush_cycle(self):
+        """Hands the values gathered since the last cycle and their sample times (ns) to on_cycle (the trip logger)."""
+        snapshot = self._pending_snapshot
+        times = self._pending_times
+        self._pending_snapshot = {}
+        self._pending_times = {}
+        self._last_cycle = time.monotonic()
+        self.cycle_count += 1
+
+        if self.on_cycle and snapshot:
+            try:
+                self.on_cycle(snapshot, times)
+            except Exception as e:
+                print(f"Polling Callback Error: {e}")
+
+    def report_lagging(self):
+        lagging = self.scheduler.lagging()
+        if not lagging:
+            return
+        now = time.monotonic()
+        if now - self._last_lag_report < self.LAG_REPORT_INTERVAL:
+            return
+        self._last_lag_report = now
+
+        details = ", ".join(f"{k} {achieved:.1f}/{target:g} Hz" for k, (target, achieved) in lagging.items())
+        self.obd.log(f"Bus cannot keep up with requested rates: {details}")
+
+    def _run(self):
+        while self.running:
+            if not self.obd.is_connected():
+                self._pending_snapshot = {}
+                self._pending_times = {}
+                time.sleep(0.1)
+                continue
+
+            self.poll_once()
+
+            now = time.monotonic()
+            if now - self._last_cycle >= self.cycle_interval:
+                self.flush_cycle()
+                self.report_lagging()
+
+            next_deadline = self.scheduler.next_deadline()
+            if next_deadline is None:
+                time.sleep(self.cycle_interval)
+            elif next_deadline > now:
+                time.sleep(min(next_deadline - now, self.cycle_interval))
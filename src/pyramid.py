@@ -0,0 +1,326 @@
+import threading
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+# Samples per bucket at each level; level 0 holds the raw samples
+LEVEL_FACTORS = (1, 10, 100, 1000)
+FAN_OUT = 10
+
+_EMPTY = np.empty(0)
+_EMPTY.flags.writeable = False
+
+
+def _group_edges(n, groups):
+    """Start indexes of `groups` nearly equal groups of n items."""
+    return np.unique(np.linspace(0, n, groups + 1).astype(np.intp)[:-1])
+
+
+class _Column:
+    """Append-only numpy array that grows by doubling."""
+
+    def __init__(self, dtype="f8"):
+        self.data = np.empty(256, dtype=dtype)
+        self.n = 0
+
+    def _reserve(self, n):
+        if n > len(self.data):
+            grown = np.empty(max(n, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.n] = self.data[:self.n]
+            self.data = grown
+
+    def append(self, value):
+        self._reserve(self.n + 1)
+        self.data[self.n] = value
+        self.n += 1
+
+    def extend(self, values):
+        self._reserve(self.n + len(values))
+        self.data[self.n:self.n + len(values)] = values
+        self.n += len(values)
+
+    def view(self):
+        return self.data[:self.n]
+
+    def drop(self, n):
+        """Removes the first n entries."""
+        self.data[:self.n - n] = self.data[n:self.n]
+        self.n -= n
+
+
+class _Samples:
+    """Unbounded raw (time, value) samples with RingBuffer's interface, for whole loaded logs."""
+
+    dropped = 0
+
+    def __init__(self):
+        self.t = _Column()
+        self.v = _Column()
+
+    def __len__(self):
+        return self.t.n
+
+    @property
+    def last_time(self):
+        return self.t.data[self.t.n - 1] if self.t.n else None
+
+    def append(self, t, value):
+        self.t.append(t)
+        self.v.append(value)
+
+    def extend(self, times, values):
+        self.t.extend(times)
+        self.v.extend(values)
+
+    def view(self):
+        t, v = self.t.view(), self.v.view()
+        t.flags.writeable = False
+        v.flags.writeable = False
+        return t, v
+
+
+class _Level:
+    """Completed buckets of one level: start time, min, max, sum and sample count."""
+
+    def __init__(self):
+        self.t = _Column()
+        self.lo = _Column()
+        self.hi = _Column()
+        self.sum = _Column()
+        self.count = _Column()
+
+    def __len__(self):
+        return self.t.n
+
+    def columns(self):
+        return self.t, self.lo, self.hi, self.sum, self.count
+
+    def extend(self, t, lo, hi, total, count):
+        for col, values in zip(self.columns(), (t, lo, hi, total, count)):
+            col.extend(values)
+
+
+class SeriesPyramid:
+    """
+    One sensor's samples with min/max/mean summaries at 10x, 100x and 1000x fewer points.
+    Every level only holds whole buckets; query() stitches the newest, not yet complete
+    stretch from the finer levels, so live data shows up at every zoom level at once.
+
+    With max_samples the raw samples live in a RingBuffer of that size, the sensor's fixed
+    history, and each summary level keeps at most about that many entries, dropping its
+    oldest once summarized: a long session costs bounded memory and older stretches are
+    drawn from the coarser levels.
+    """
+
+    def __init__(self, max_samples=None):
+        self.max_samples = max_samples
+        self.raw = RingBuffer(max(max_samples, FAN_OUT)) if max_samples else _Samples()
+        self.levels = [_Level() for _ in LEVEL_FACTORS[1:]]
+        # Entries dropped from the front of each summary level (the raw ring counts its own)
+        self.base = [0] * len(LEVEL_FACTORS)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def append(self, t, value):
+        if len(self.raw) and t < self.raw.last_time:
+            # Time went back (replay seek): start over rather than break the time order
+            self.__init__(self.max_samples)
+        self.raw.append(t, value)
+        # Nine appends out of ten complete no bucket
+        if len(self.raw) - self._summarized(0) >= FAN_OUT:
+            self._cascade()
+
+    def extend(self, times, values):
+        """Bulk load (sorted by time); builds the levels with numpy instead of per sample."""
+        if self.max_samples:
+            for t, value in zip(times, values):
+                self.append(t, value)
+            return
+        self.raw.extend(times, values)
+        self._cascade()
+
+    def _base(self, k):
+        return self.raw.dropped if k == 0 else self.base[k]
+
+    def _arrays(self, k):
+        """(t, lo, hi, sum, count) views of level k; level 0 is the raw samples."""
+        if k == 0:
+            t, v = self.raw.view()
+            return t, v, v, v, None
+        level = self.levels[k - 1]
+        return level.t.view(), level.lo.view(), level.hi.view(), level.sum.view(), level.count.view()
+
+    def _summarized(self, k):
+        """How many of level k's current entries the level above already covers."""
+        if k == len(self.levels):
+            return len(self._arrays(k)[0])
+        return (self.base[k + 1] + len(self.levels[k])) * FAN_OUT - self._base(k)
+
+    def _cascade(self):
+        # Summarize every FAN_OUT finer entries not yet covered by the level above
+        for k, level in enumerate(self.levels):
+            t, lo, hi, total, count = self._arrays(k)
+            done = self._summarized(k)
+            ready = (len(t) - done) // FAN_OUT * FAN_OUT
+            if ready <= 0:
+                break
+            end = done + ready
+            level.extend(t[done:end:FAN_OUT],
+                         lo[done:end].reshape(-1, FAN_OUT).min(axis=1),
+                         hi[done:end].reshape(-1, FAN_OUT).max(axis=1),
+                         total[done:end].reshape(-1, FAN_OUT).sum(axis=1),
+                         np.full(ready // FAN_OUT, FAN_OUT) if count is None
+                         else count[done:end].reshape(-1, FAN_OUT).sum(axis=1))
+        if self.max_samples:
+            self._trim()
+
+    def _trim(self):
+        # Drop in chunks of a quarter so the shifting copies stay amortized
+        limit = self.max_samples
+        for k in range(1, len(LEVEL_FACTORS)):
+            columns = self.levels[k - 1].columns()
+            n = columns[0].n
+            if n <= limit + limit // 4:
+                continue
+            drop = min(n - limit, self._summarized(k))
+            if drop > 0:
+                for col in columns:
+                    col.drop(drop)
+                self.base[k] += drop
+
+    def _range(self, start, end, max_points):
+        """(t, lo, hi, sum, count) over [start, end] from the coarsest level that still has enough points."""
+        pick = None
+        for k in range(len(LEVEL_FACTORS)):
+            t = self._arrays(k)[0]
+            if not len(t):
+                continue
+            pick = k
+            covers = self._base(k) == 0 or t[0] <= start
+            # Finest level that reaches back to `start` without far more points than pixels
+            if covers and np.searchsorted(t, end, "right") - np.searchsorted(t, start, "left") <= 2 * max_points:
+                break
+        if pick is None:
+            return (np.empty(0),) * 5
+        if pick == 0:
+            t, v, _, _, _ = self._arrays(0)
+            i0 = np.searchsorted(t, start, "left")
+            i1 = np.searchsorted(t, end, "right")
+            v = v[i0:i1]
+            return t[i0:i1], v, v, v, np.ones(i1 - i0)
+
+        t = self._arrays(pick)[0]
+        b0 = max(np.searchsorted(t, start, "right") - 1, 0)
+        b1 = np.searchsorted(t, end, "right")
+        parts = [tuple(a[b0:b1] for a in self._arrays(pick))]
+        if b1 == len(t):
+            # Entries after the last whole bucket come from the finer levels
+            covered = (self.base[pick] + len(t)) * FAN_OUT
+            for k in range(pick - 1, -1, -1):
+                arrays = self._arrays(k)
+                i0 = covered - self._base(k)
+                i1 = i0 + np.searchsorted(arrays[0][i0:], end, "right")
+                t, lo, hi, total, count = (a[i0:i1] if a is not None else None for a in arrays)
+                parts.append((t, lo, hi, total, np.ones(len(t)) if count is None else count))
+                covered = (self._base(k) + len(arrays[0])) * FAN_OUT
+        return tuple(np.concatenate(cols) for cols in zip(*parts))
+
+    def query(self, start, end, max_points):
+        """
+        Min-max decimated (x, y) of the samples between `start` and `end`, about 2 * max_points
+        points at most: each group of samples is drawn as its minimum and maximum, so single
+        sample spikes survive at any zoom level.
+        """
+        t, lo, hi, _, _ = self._range(start, end, max_points)
+        if lo is hi and len(t) <= 2 * max_points:
+            return t, lo
+        if len(t) > max_points:
+            edges = _group_edges(len(t), max_points)
+            t, lo, hi = t[edges], np.minimum.reduceat(lo, edges), np.maximum.reduceat(hi, edges)
+        y = np.empty(2 * len(t))
+        y[0::2] = lo
+        y[1::2] = hi
+        return np.repeat(t, 2), y
+
+    def query_mean(self, start, end, max_points):
+        """(x, mean) with at most max_points points between `start` and `end`."""
+        t, _, _, total, count = self._range(start, end, max_points)
+        if len(t) <= max_points:
+            return t, total / count
+        edges = _group_edges(len(t), max_points)
+        return t[edges], np.add.reduceat(total, edges) / np.add.reduceat(count, edges)
+
+    @property
+    def span(self):
+        """(first, last) sample time, or None when empty."""
+        if not len(self.raw):
+            return None
+        firsts = [t[0] for t in (self._arrays(k)[0] for k in range(len(LEVEL_FACTORS))) if len(t)]
+        return float(min(firsts)), float(self.raw.last_time)
+
+
+class PyramidSet:
+    """Thread-safe {sensor: SeriesPyramid}, fed live by SensorStore or built from a whole log."""
+
+    def __init__(self, max_samples=None):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def append(self, key, t, value):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = SeriesPyramid(self.max_samples)
+            series.append(t, value)
+
+    @classmethod
+    def from_columns(cls, epochs, columns):
+        """From loaded log columns ({key: float array, NaN = not logged}); empty cells are skipped."""
+        pyramids = cls()
+        for key, values in columns.items():
+            logged = ~np.isnan(values) & ~np.isnan(epochs)
+            series = SeriesPyramid()
+            series.extend(epochs[logged], values[logged])
+            pyramids._series[key] = series
+        return pyramids
+
+    def keys(self):
+        with self._lock:
+            return list(self._series)
+
+    def span(self, key=None):
+        """(first, last) time of one sensor, or of all sensors together."""
+        with self._lock:
+            spans = [s.span for k, s in self._series.items() if (key is None or k == key) and s.span]
+        if not spans:
+            return None
+        return min(s[0] for s in spans), max(s[1] for s in spans)
+
+    def query(self, key, start, end, max_points):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return np.empty(0), np.empty(0)
+            x, y = series.query(start, end, max_points)
+            # Copies, so the graph can keep them while the polling thread appends
+            return x.copy(), y.copy()
+
+    def samples(self, key, since=None):
+        """
+        (times, values) read-only views of the raw samples still kept, oldest first, optionally
+        only those at or after `since`. No copy: see RingBuffer for how long a view holds.
+        """
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                return _EMPTY, _EMPTY
+            t, v = series.raw.view()
+            i = 0 if since is None else np.searchsorted(t, since, "left")
+            return t[i:], v[i:]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
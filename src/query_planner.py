@@ -0,0 +1,53 @@
+DEFAULT_HEADER = "7E0"
+
+
+def normalize_header(header_hex):
+    if not header_hex:
+        return None
+    return str(header_hex).strip().upper() or None
+
+
+def plan_queries(keys, header_of, current_header):
+    """
+    Orders one polling cycle so that queries sharing an ECU header run back to back.
+
+    header_of(key) returns the header a query needs, or None when any header will do.
+    Standard PIDs should report DEFAULT_HEADER. The adapter's power-on header (None) is
+    treated as compatible with DEFAULT_HEADER so standard PIDs never force an ATSH.
+
+    Order: header-agnostic queries, then the group matching the current header, then the
+    other custom headers, and the DEFAULT_HEADER group last so the adapter ends the cycle
+    where standard PIDs need it.
+    """
+    current = normalize_header(current_header) or DEFAULT_HEADER
+
+    anywhere = []
+    groups = {}
+    for key in keys:
+        header = normalize_header(header_of(key))
+        if header is None:
+            anywhere.append(key)
+        else:
+            groups.setdefault(header, []).append(key)
+
+    ordered = list(anywhere)
+    if current in groups:
+        ordered.extend(groups.pop(current))
+
+    default_group = groups.pop(DEFAULT_HEADER, [])
+    for header in sorted(groups):
+        ordered.extend(groups[header])
+    ordered.extend(default_group)
+    return ordered
+
+
+def count_header_switches(keys, header_of, current_header):
+    """Number of ATSH commands needed to run `keys` in the given order."""
+    current = normalize_header(current_header) or DEFAULT_HEADER
+    switches = 0
+    for key in keys:
+        header = normalize_header(header_of(key))
+        if header is not None and header != current:
+            switches += 1
+            current = header
+    return switches
@@ -0,0 +1,456 @@
+import os
+import struct
+import threading
+import time
+from array import array
+
+from log_segments import open_log
+from zone_map import ZoneMap, compare
+from constants import LOG_KEYFRAME_SECONDS
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = b"PYOBDIX1"
+# csv size, csv mtime, first row time, last row time, entry count
+INDEX_HEADER = struct.Struct("<8sQdddQ")
+# One index entry per second of log time
+INDEX_STEP = 1.0
+
+SECONDS_PER_DAY = 86400
+# Playback speeds offered in the UI; None replays as fast as the file can be read
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "Max": None}
+
+
+# DataLogger row stamps; never replayed as sensors
+TIME_COLUMNS = ("Timestamp", "Epoch", "Mono_ns")
+# DataLogger per-sensor acquisition time columns (<KEY>_ns, monotonic ns)
+SAMPLE_TIME_SUFFIX = "_ns"
+
+
+def parse_time(text):
+    """Seconds for a DataLogger timestamp: HH:MM:SS clock time or epoch seconds."""
+    if ":" in text:
+        h, m, s = text.split(":")
+        return int(h) * 3600 + int(m) * 60 + float(s)
+    return float(text)
+
+
+class TimeIndex:
+    """
+    Sidecar index (<log>.csv.idx) mapping each second of log time to the byte offset of the
+    first row at or after it, so seeking is one array lookup instead of a scan.
+    """
+
+    def __init__(self, offsets, first_time, last_time):
+        self.offsets = offsets
+        self.first_time = first_time
+        self.last_time = last_time
+
+    @property
+    def duration(self):
+        return self.last_time - self.first_time
+
+    def offset_for(self, seconds):
+        """Byte offset of the first row `seconds` after the start of the log."""
+        i = int(seconds // INDEX_STEP)
+        i = min(max(i, 0), len(self.offsets) - 1)
+        return self.offsets[i]
+
+    def bucket_span(self, offset):
+        """(start, end) byte offsets of the one-second bucket containing `offset`, or None."""
+        offsets = self.offsets
+        lo, hi = 0, len(offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if offsets[mid] <= offset: lo = mid + 1
+            else: hi = mid
+        if lo == 0 or lo >= len(offsets):
+            return None
+        return offsets[lo - 1], offsets[lo]
+
+    @staticmethod
+    def path_for(csv_path):
+        return csv_path + INDEX_SUFFIX
+
+    @classmethod
+    def load(cls, csv_path):
+        """Returns the sidecar index if it exists and still matches the CSV, else None."""
+        try:
+            stat = os.stat(csv_path)
+            with open(cls.path_for(csv_path), "rb") as f:
+                magic, size, mtime, first, last, count = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                if magic != INDEX_MAGIC or size != stat.st_size or mtime != stat.st_mtime:
+                    return None
+                offsets = array("Q")
+                offsets.frombytes(f.read(count * offsets.itemsize))
+                if len(offsets) != count:
+                    return None
+            return cls(offsets, first, last)
+        except (OSError, struct.error):
+            return None
+
+    @classmethod
+    def build(cls, csv_path, time_col=0, stop_event=None):
+        """One streaming pass over the CSV. Writes the sidecar when the directory allows it."""
+        stat = os.stat(csv_path)
+        offsets = array("Q")
+        first = last = None
+        day_offset = 0.0
+
+        with open_log(csv_path) as f:
+            offset = len(f.readline())
+            for line in f:
+                row_offset = offset
+                offset += len(line)
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                try:
+                    raw = parse_time(line.split(b",", time_col + 1)[time_col].decode())
+                except (ValueError, IndexError, UnicodeDecodeError):
+                    continue
+
+                t = raw + day_offset
+                if last is not None and t < last - SECONDS_PER_DAY / 2:
+                    day_offset += SECONDS_PER_DAY
+                    t += SECONDS_PER_DAY
+                if first is None:
+                    first = t
+                last = t
+
+                bucket = int((t - first) // INDEX_STEP)
+                while len(offsets) <= bucket:
+                    offsets.append(row_offset)
+            offsets.append(offset)
+
+        if first is None:
+            return None
+
+        index = cls(offsets, first, last)
+        try:
+            with open(cls.path_for(csv_path), "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime, first, last, len(offsets)))
+                f.write(offsets.tobytes())
+        except OSError:
+            pass
+        return index
+
+
+class ReplayEngine:
+    """
+    Streams a DataLogger CSV (plain, compressed or a rotated trip's manifest) row by row on a background thread, paced against the wall
+    clock at the chosen speed. Only the current values are kept in memory; empty cells
+    keep the sensor's previous value. Seeking uses the sidecar TimeIndex, which is loaded
+    or built in the background while playback already runs.
+
+    Logs with an Epoch column are paced on it instead of the whole-second Timestamp, and
+    <KEY>_ns columns give each value its own acquisition time (sample_time_ns). Seeking
+    starts one keyframe interval early and plays that stretch instantly, so sparse logs
+    have every sensor filled in by the time the target is reached.
+
+    find_next searches forward for a sensor condition, reading only the blocks the trip's
+    zone map (zone_map) cannot rule out.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.headers = []
+        self.time_col = 0
+        self.index = None
+        self.zones = None
+        self.seek_lookback = LOG_KEYFRAME_SECONDS
+
+        self.running = False
+        self.finished = False
+        self.thread = None
+        self.index_thread = None
+
+        self._file = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._values = {}
+        self._sample_times = {}
+        self._sample_cols = {}
+        self._mono_col = None
+        self._generation = 0
+        self._first_time = None
+        self._position = None
+        self._clock_log = None
+        self._clock_wall = None
+        self._day_offset = 0.0
+        self._clock_time = False
+
+    def open(self):
+        """Validates the CSV header. Returns False if this is not a DataLogger log."""
+        try:
+            f = open_log(self.path)
+        except (OSError, ValueError):
+            return False
+        try:
+            header = f.readline().decode("utf-8-sig").strip().split(",")
+        except (UnicodeDecodeError, OSError, EOFError):
+            f.close()
+            return False
+
+        header = [h.strip() for h in header]
+        if "Timestamp" not in header or len(header) < 2:
+            f.close()
+            return False
+
+        self.time_col = header.index("Epoch" if "Epoch" in header else "Timestamp")
+        self._mono_col = header.index("Mono_ns") if "Mono_ns" in header else None
+        sample_cols = {h[:-len(SAMPLE_TIME_SUFFIX)]: i for i, h in enumerate(header)
+                       if h.endswith(SAMPLE_TIME_SUFFIX) and h[:-len(SAMPLE_TIME_SUFFIX)] in header}
+        self.headers = [h for h in header if h not in TIME_COLUMNS and h[:-len(SAMPLE_TIME_SUFFIX)] not in sample_cols]
+        self._sample_cols = sample_cols if self._mono_col is not None else {}
+        self._columns = [h if h in self.headers else None for h in header]
+        self._header = header
+        self._file = f
+        return True
+
+    def start(self):
+        if self.running or not self._is_open(): return
+        self.running = True
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.index_thread = threading.Thread(target=self._load_index, daemon=True)
+        self.index_thread.start()
+
+    def stop(self):
+        self.running = False
+        self._stop.set()
+        self._wake.set()
+        for thread in (self.thread, self.index_thread):
+            if thread and thread is not threading.current_thread():
+                thread.join(timeout=2)
+        self.thread = None
+        self.index_thread = None
+        with self._lock:
+            self._close()
+
+    # --- Playback control ---
+    def set_speed(self, speed):
+        """Playback speed multiplier; None plays as fast as possible."""
+        with self._lock:
+            self._rebase_clock()
+            self.speed = speed
+        self._wake.set()
+
+    def seek(self, seconds):
+        """Jumps to `seconds` after the start of the log. False until the time index is ready."""
+        index = self.index
+        if index is None or not self._is_open():
+            return False
+
+        with self._lock:
+            seconds = max(0.0, min(seconds, index.duration))
+            lookback = max(0.0, seconds - self.seek_lookback)
+            self._seek_to(index.offset_for(lookback))
+            target = index.first_time + seconds
+            start = index.first_time + lookback
+            self._day_offset = (start // SECONDS_PER_DAY) * SECONDS_PER_DAY
+            self._generation += 1
+            if self._first_time is None:
+                self._first_time = index.first_time
+            self._position = start
+            # Rows before the target are already due, so the lookback plays without waiting
+            self._clock_log = target
+            self._clock_wall = time.monotonic()
+            self._values = {}
+            self._sample_times = {}
+            self.finished = False
+        self._wake.set()
+        return True
+
+    def find_next(self, key, op, value, after=None):
+        """
+        Seconds since the start of the log of the first row after `after` (default: the
+        current position) where `key op value` was logged, or None. Needs an Epoch column.
+        """
+        index = self.index
+        if index is None or key not in self.headers or self._header[self.time_col] != "Epoch":
+            return None
+        start = index.first_time + (self.position if after is None else after)
+        col = self._header.index(key)
+        zones = self.zones
+        ranges = zones.time_ranges(key, op, value) if zones is not None else [(index.first_time, None)]
+
+        with open_log(self.path) as f:
+            for lo, hi in ranges:
+                if hi is not None and hi <= start:
+                    continue
+                lo = start if lo is None else max(lo, start)
+                f.seek(index.offset_for(lo - index.first_time))
+                for line in f:
+                    cells = line.decode("utf-8", "ignore").rstrip("\r\n").split(",")
+                    try:
+                        t = float(cells[self.time_col])
+                        if t <= start:
+                            continue
+                        if hi is not None and t > hi:
+                            break
+                        if cells[col] and compare(float(cells[col]), op, value):
+                            return t - index.first_time
+                    except (ValueError, IndexError):
+                        continue
+        return None
+
+    @property
+    def position(self):
+        """Seconds since the start of the log of the row last applied."""
+        if self._position is None or self._first_time is None: return 0.0
+        return self._position - self._first_time
+
+    @property
+    def duration(self):
+        return self.index.duration if self.index else None
+
+    # --- Data access ---
+    def get(self, key):
+        return self._values.get(key)
+
+    def snapshot(self):
+        return dict(self._values)
+
+    def sample_time_ns(self, key):
+        """Log time in ns at which the current value of `key` was sampled, or None."""
+        return self._sample_times.get(key)
+
+    # --- Internals ---
+    # Source hooks (called with _lock held where it matters); binary_log.BinaryReplayEngine
+    # replaces them to read typed chunks instead of CSV lines
+    def _is_open(self):
+        return self._file is not None
+
+    def _seek_to(self, offset):
+        self._file.seek(offset)
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _rebase_clock(self):
+        if self._position is not None:
+            self._clock_log = self._position
+            self._clock_wall = time.monotonic()
+
+    def _load_index(self):
+        index = TimeIndex.load(self.path)
+        if index is None:
+            try:
+                index = TimeIndex.build(self.path, self.time_col, self._stop)
+            except OSError:
+                index = None
+        self.zones = ZoneMap.load(self.path)
+        self.index = index
+
+    def _unwrap(self, raw):
+        # HH:MM:SS logs restart at midnight; keep the time running forward
+        if not self._clock_time:
+            return raw
+        t = raw + self._day_offset
+        if self._position is not None and t < self._position - SECONDS_PER_DAY / 2:
+            self._day_offset += SECONDS_PER_DAY
+            t += SECONDS_PER_DAY
+        return t
+
+    def _row_time(self, raw_text, offset):
+        raw = parse_time(raw_text)
+        t = self._unwrap(raw)
+        index = self.index
+        # Rows within one whole second are spread over it by their position in the bucket
+        if self._clock_time and index is not None and raw == int(raw):
+            span = index.bucket_span(offset)
+            if span and span[1] > span[0]:
+                t += (offset - span[0]) / (span[1] - span[0])
+        return t
+
+    def _read_row(self):
+        with self._lock:
+            if self._file is None:
+                return None
+            offset = self._file.tell()
+            line = self._file.readline()
+            if not line:
+                return None
+
+            cells = line.decode("utf-8", "ignore").rstrip("\r\n").split(",")
+            if len(cells) <= self.time_col:
+                return False
+            raw_time = cells[self.time_col].strip()
+            self._clock_time = ":" in raw_time
+            try:
+                t = self._row_time(raw_time, offset)
+            except ValueError:
+                return False
+            return self._generation, t, cells
+
+    def _apply(self, generation, t, cells):
+        values = {}
+        for name, cell in zip(self._columns, cells):
+            if name is None or not cell:
+                continue
+            try:
+                values[name] = float(cell)
+            except ValueError:
+                continue
+
+        row_ns = int(t * 1e9)
+        times = dict.fromkeys(values, row_ns)
+        if self._sample_cols:
+            # Acquisition times are monotonic; shift them onto the row's epoch
+            try:
+                row_mono = int(cells[self._mono_col])
+                for name, col in self._sample_cols.items():
+                    if name in values and col < len(cells) and cells[col]:
+                        times[name] = row_ns + int(cells[col]) - row_mono
+            except (ValueError, IndexError):
+                pass
+
+        with self._lock:
+            # Rows read before a seek are dropped
+            if generation != self._generation:
+                return
+            self._values.update(values)
+            self._sample_times.update(times)
+            self._position = t
+
+    def _wait_until(self, t, generation):
+        """Sleeps until the replay clock reaches log time `t`. False if a seek or stop came first."""
+        while self.running and generation == self._generation:
+            self._wake.clear()
+            with self._lock:
+                if self._clock_log is None:
+                    self._clock_log = t
+                    self._clock_wall = time.monotonic()
+                speed = self.speed
+                if not speed:
+                    return True
+                due = self._clock_wall + (t - self._clock_log) / speed
+            delay = due - time.monotonic()
+            if delay <= 0:
+                return True
+            # Woken early by set_speed/seek/stop, the due time is recomputed
+            self._wake.wait(min(delay, 0.25))
+        return False
+
+    def _run(self):
+        while self.running:
+            row = self._read_row()
+            if row is None:
+                # End of file; keep the last values and pick up rows appended later
+                self.finished = True
+                self._wake.clear()
+                self._wake.wait(0.2)
+                continue
+            if row is False:
+                continue
+
+            generation, t, cells = row
+            if self._first_time is None:
+                self._first_time = t
+            if self._wait_until(t, generation):
+                self._apply(generation, t, cells)
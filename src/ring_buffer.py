@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size (time, value) history in preallocated float64 arrays. Every sample is
+    written twice, at i and i + capacity, so the last `capacity` samples are always one
+    contiguous slice: view() hands out ordered arrays without copying.
+
+    Views are read-only. An append reuses the slot of the oldest sample, so a view's
+    oldest entries are the first to change; read its newest ones or copy it to keep it.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._t = np.zeros(2 * self.capacity)
+        self._v = np.zeros(2 * self.capacity)
+        self._next = 0
+        self._count = 0
+        # Samples overwritten since the last clear()
+        self.dropped = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def nbytes(self):
+        return self._t.nbytes + self._v.nbytes
+
+    @property
+    def last_time(self):
+        return self._t[self._next - 1] if self._count else None
+
+    def append(self, t, value):
+        if self._count and t < self._t[self._next - 1]:
+            # Time went back (replay seek); since() needs the times in order
+            self.clear()
+        i = self._next
+        cap = self.capacity
+        self._t[i] = self._t[i + cap] = t
+        self._v[i] = self._v[i + cap] = value
+        self._next = i + 1 if i + 1 < cap else 0
+        if self._count < cap:
+            self._count += 1
+        else:
+            self.dropped += 1
+
+    def extend(self, times, values):
+        """Appends samples sorted by time; only the newest `capacity` of them are kept."""
+        for t, value in zip(times, values):
+            self.append(t, value)
+
+    def view(self):
+        """(times, values) oldest first."""
+        end = self._next + self.capacity if self._count == self.capacity else self._next
+        start = end - self._count
+        t = self._t[start:end]
+        v = self._v[start:end]
+        t.flags.writeable = False
+        v.flags.writeable = False
+        return t, v
+
+    def since(self, t0):
+        """(times, values) of the samples at or after time `t0`."""
+        t, v = self.view()
+        i = np.searchsorted(t, t0, "left")
+        return t[i:], v[i:]
+
+    def latest(self, n):
+        """The newest `n` values, oldest first."""
+        return self.view()[1][-n:] if n else self.view()[1][:0]
+
+    def clear(self):
+        self._next = 0
+        self._count = 0
+        self.dropped = 0
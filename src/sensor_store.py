@@ -0,0 +1,85 @@
+import threading
+import time
+
+from constants import HISTORY_MINUTES, MAX_SAMPLE_RATE_HZ
+from pyramid import PyramidSet
+
+
+class SensorStore:
+    """
+    Thread-safe latest-value / history store shared by the polling engine and the UI.
+
+    Numeric samples go to `pyramids` (see pyramid), which the Live Graph draws from. Each
+    sensor's last `history_len` samples (by default HISTORY_MINUTES at the highest polling
+    rate) and their timestamps sit in a preallocated RingBuffer, the pyramid's raw level,
+    next to bounded min/max summaries of older ones, so memory per sensor is fixed however
+    long the session runs.
+    """
+
+    def __init__(self, history_len=None, retention_seconds=HISTORY_MINUTES * 60):
+        self.history_len = int(history_len or retention_seconds * MAX_SAMPLE_RATE_HZ)
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._timestamps = {}
+        self._versions = {}
+        self._version = 0
+        self.pyramids = PyramidSet(self.history_len)
+
+    def update(self, key, value, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._version += 1
+            self._latest[key] = value
+            self._timestamps[key] = timestamp
+            self._versions[key] = self._version
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            # DTC strings and the like only have a latest value
+            return
+        self.pyramids.append(key, timestamp, value)
+
+    def update_many(self, values, timestamp=None):
+        if timestamp is None:
+            timestamp = time.time()
+        for key, value in values.items():
+            self.update(key, value, timestamp)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._latest.get(key, default)
+
+    def get_timestamp(self, key):
+        """Sample time of the latest value in seconds (monotonic clock when stamped by PollingEngine)."""
+        with self._lock:
+            return self._timestamps.get(key)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._latest)
+
+    def history(self, key):
+        """The sensor's last `history_len` values, oldest first (a read-only view; see RingBuffer)."""
+        return self.series(key)[1]
+
+    def series(self, key, since=None):
+        """(timestamps, values) views of the last `history_len` samples, optionally only those at or after `since`."""
+        return self.pyramids.samples(key, since)
+
+    @property
+    def version(self):
+        return self._version
+
+    def changed_since(self, version):
+        """Returns (current_version, {key: value}) for every key updated after `version`."""
+        with self._lock:
+            changes = {k: self._latest[k] for k, v in self._versions.items() if v > version}
+            return self._version, changes
+
+    def clear(self):
+        with self._lock:
+            self._latest.clear()
+            self._timestamps.clear()
+            self._versions.clear()
+        self.pyramids.clear()
@@ -0,0 +1,277 @@
+import bisect
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from log_segments import open_log, resolve_log, TripManifest
+from binary_log import BinaryLogReader, is_binary_log
+from zone_map import OPERATORS, parse_condition, compare
+
+DEFAULT_DB_NAME = "trips.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trips (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    vehicle TEXT,
+    started REAL,
+    ended REAL,
+    sensors TEXT
+);
+CREATE TABLE IF NOT EXISTS sensors (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    trip INTEGER NOT NULL,
+    sensor INTEGER NOT NULL,
+    t REAL NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS samples_trip_sensor_time ON samples (trip, sensor, t);
+"""
+
+
+def group_windows(moments, gap=2.0):
+    """Merges find() results closer than `gap` seconds into (trip, start, end, count) windows."""
+    windows = []
+    for trip, t, _ in moments:
+        if windows and windows[-1][0] == trip and t - windows[-1][2] <= gap:
+            trip_, start, _, count = windows[-1]
+            windows[-1] = (trip_, start, t, count + 1)
+        else:
+            windows.append((trip, t, t, 1))
+    return windows
+
+
+class TripStore:
+    """
+    SQLite trip database, one row per (trip, sensor, time, value) sample. WAL mode lets the
+    UI and the CLI read while DataLogger's writer thread appends; every flush is a single
+    executemany in one transaction. The (trip, sensor, time) index makes time windows and
+    per-sensor lookups range scans instead of table scans.
+    """
+
+    def __init__(self, path=DEFAULT_DB_NAME):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sensor_ids = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        for sensor_id, key in self._db.execute("SELECT id, key FROM sensors"):
+            self._sensor_ids[key] = sensor_id
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _sensor_id(self, key):
+        sensor_id = self._sensor_ids.get(key)
+        if sensor_id is None:
+            self._db.execute("INSERT OR IGNORE INTO sensors (key) VALUES (?)", (key,))
+            sensor_id = self._db.execute("SELECT id FROM sensors WHERE key = ?", (key,)).fetchone()[0]
+            self._sensor_ids[key] = sensor_id
+        return sensor_id
+
+    # --- Writing ---
+    def begin_trip(self, name, sensor_keys, vehicle=None, started=None):
+        with self._lock, self._db:
+            cur = self._db.execute("INSERT INTO trips (name, vehicle, started, sensors) VALUES (?, ?, ?, ?)",
+                                   (name, vehicle, started or time.time(), json.dumps(list(sensor_keys))))
+            for key in sensor_keys:
+                self._sensor_id(key)
+            return cur.lastrowid
+
+    def end_trip(self, trip_id, ended=None):
+        with self._lock, self._db:
+            self._db.execute("UPDATE trips SET ended = ? WHERE id = ?", (ended or time.time(), trip_id))
+
+    def write_rows(self, trip_id, sensor_keys, rows):
+        """rows: DataLogger's (epoch, mono_ns, values, sample_times). Empty cells are skipped."""
+        with self._lock, self._db:
+            ids = [self._sensor_id(key) for key in sensor_keys]
+        samples = []
+        for epoch, mono, values, times in rows:
+            for i, value in enumerate(values):
+                if value == "" or value is None:
+                    continue
+                t = epoch
+                # Exact acquisition time when it was recorded
+                if times and times[i] != "" and mono:
+                    t = epoch + (int(times[i]) - mono) / 1e9
+                try:
+                    samples.append((trip_id, ids[i], t, float(value)))
+                except (TypeError, ValueError):
+                    continue
+        if samples:
+            with self._lock, self._db:
+                self._db.executemany("INSERT INTO samples (trip, sensor, t, value) VALUES (?, ?, ?, ?)", samples)
+        return len(samples)
+
+    # --- Queries ---
+    def trips(self):
+        with self._lock:
+            rows = self._db.execute("SELECT id, name, vehicle, started, ended, sensors FROM trips ORDER BY id").fetchall()
+        return [{"id": r[0], "name": r[1], "vehicle": r[2], "started": r[3], "ended": r[4],
+                 "sensors": json.loads(r[5] or "[]")} for r in rows]
+
+    def window(self, trip_id, keys, start=None, end=None):
+        """{key: [(t, value), ...]} for one trip between epoch `start` and `end`."""
+        out = {}
+        with self._lock:
+            for key in keys:
+                sensor_id = self._sensor_ids.get(key)
+                if sensor_id is None:
+                    out[key] = []
+                    continue
+                out[key] = self._db.execute(
+                    "SELECT t, value FROM samples WHERE trip = ? AND sensor = ? AND t >= ? AND t <= ? ORDER BY t",
+                    (trip_id, sensor_id, -1e18 if start is None else start, 1e18 if end is None else end)).fetchall()
+        return out
+
+    def find(self, conditions, trips=None):
+        """
+        Moments where every condition holds, as [(trip, t, {key: value})].
+        conditions: [(key, op, value)]. The first condition picks candidate samples; the
+        others use each sensor's latest value at that time (logs may be sparse).
+        """
+        if not conditions:
+            return []
+        for _, op, _ in conditions:
+            if op not in OPERATORS:
+                raise ValueError(f"Unsupported operator: {op}")
+
+        first_key, first_op, first_value = conditions[0]
+        trip_ids = trips if trips is not None else [t["id"] for t in self.trips()]
+        results = []
+        with self._lock:
+            ids = {key: self._sensor_ids.get(key) for key, _, _ in conditions}
+            if any(sensor_id is None for sensor_id in ids.values()):
+                return []
+            for trip_id in trip_ids:
+                candidates = self._db.execute(
+                    f"SELECT t, value FROM samples WHERE trip = ? AND sensor = ? AND value {OPERATORS[first_op]} ? "
+                    "ORDER BY t", (trip_id, ids[first_key], first_value)).fetchall()
+                if not candidates:
+                    continue
+                series = {}
+                for key, _, _ in conditions[1:]:
+                    rows = self._db.execute("SELECT t, value FROM samples WHERE trip = ? AND sensor = ? ORDER BY t",
+                                            (trip_id, ids[key])).fetchall()
+                    series[key] = ([r[0] for r in rows], [r[1] for r in rows])
+
+                for t, value in candidates:
+                    values = {first_key: value}
+                    for key, op, limit in conditions[1:]:
+                        times, vals = series[key]
+                        i = bisect.bisect_right(times, t) - 1
+                        if i < 0 or not compare(vals[i], op, limit):
+                            break
+                        values[key] = vals[i]
+                    else:
+                        results.append((trip_id, t, values))
+        return results
+
+    # --- Import of existing logs ---
+    def import_log(self, path, vehicle=None):
+        """Loads a DataLogger CSV, compressed segment, trip manifest or binary log. Returns the trip id."""
+        path = resolve_log(path)
+        name = os.path.basename(path)
+        if TripManifest.is_manifest(path):
+            name = name[:-len(".manifest.json")]
+
+        if is_binary_log(path):
+            with BinaryLogReader(path) as log:
+                keys = log.sensor_keys
+                cols = log.columns_for(["Epoch"] + keys)
+                trip_id = self.begin_trip(name, keys, vehicle, float(cols["Epoch"][0]) if len(cols["Epoch"]) else None)
+                epochs = cols["Epoch"].tolist()
+                values = [["" if v != v else v for v in cols[k].tolist()] for k in keys]
+                rows = [(epochs[i], 0, [col[i] for col in values], None) for i in range(len(epochs))]
+                self.write_rows(trip_id, keys, rows)
+                self.end_trip(trip_id, epochs[-1] if epochs else None)
+                return trip_id
+
+        with open_log(path) as f:
+            reader = csv.reader(line.decode("utf-8", "ignore") for line in f)
+            header = [h.strip() for h in next(reader, [])]
+            if "Epoch" not in header:
+                raise ValueError(f"{path} has no Epoch column; convert old logs with binary_log first")
+            epoch_col = header.index("Epoch")
+            # <KEY>_ns sample time columns are not sensors
+            keys = [h for h in header if h not in ("Timestamp", "Epoch", "Mono_ns")
+                    and not (h.endswith("_ns") and h[:-3] in header)]
+            cols = [header.index(k) for k in keys]
+            trip_id = None
+            batch = []
+            last = None
+            for cells in reader:
+                try:
+                    epoch = float(cells[epoch_col])
+                except (ValueError, IndexError):
+                    continue
+                if trip_id is None:
+                    trip_id = self.begin_trip(name, keys, vehicle, epoch)
+                batch.append((epoch, 0, [cells[c] if c < len(cells) else "" for c in cols], None))
+                last = epoch
+                if len(batch) >= 5000:
+                    self.write_rows(trip_id, keys, batch)
+                    batch = []
+            if trip_id is None:
+                trip_id = self.begin_trip(name, keys, vehicle)
+            self.write_rows(trip_id, keys, batch)
+            self.end_trip(trip_id, last)
+            return trip_id
+
+
+def _clock(epoch):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def main(argv=None):
+    """
+    python trip_store.py <db> trips
+    python trip_store.py <db> find COOLANT_TEMP>110 SPEED>80
+    python trip_store.py <db> window <trip id> <KEY> [<KEY> ...]
+    python trip_store.py <db> import <log> [<log> ...]
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2 or argv[1] not in ("trips", "find", "window", "import"):
+        print(main.__doc__)
+        return 2
+
+    store = TripStore(argv[0])
+    command, args = argv[1], argv[2:]
+    try:
+        if command == "trips":
+            for trip in store.trips():
+                print(f"{trip['id']:>5}  {trip['name']:<32} {_clock(trip['started']) if trip['started'] else '-':<20} "
+                      f"{len(trip['sensors'])} sensors")
+        elif command == "find":
+            moments = store.find([parse_condition(a) for a in args])
+            for trip, start, end, count in group_windows(moments):
+                print(f"trip {trip:>5}  {_clock(start)}  {end - start:7.1f} s  {count} samples")
+        elif command == "window":
+            data = store.window(int(args[0]), args[1:])
+            for key, samples in data.items():
+                for t, value in samples:
+                    print(f"{key},{t:.3f},{value:g}")
+        else:
+            for path in args:
+                print(f"{path}: trip {store.import_log(path)}")
+    except (ValueError, IndexError, OSError, sqlite3.Error) as e:
+        print(f"Trip Store Error: {e}")
+        return 1
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
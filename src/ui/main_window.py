@@ -5,7 +5,7 @@ import os
 import threading
 import sys
 import time
-from collections import deque, defaultdict
+from collections import deque
 import serial.tools.list_ports
 import matplotlib.pyplot as plt
 from cryptography.fernet import Fernet
@@ -13,8 +13,12 @@ from cryptography.fernet import Fernet
 from data_logger import DataLogger
 from config_manager import ConfigManager
 from diagnostic_engine import DiagnosticEngine
-from constants import STANDARD_SENSORS, PRO_PACK_DIR
+from trip_store import TripStore, DEFAULT_DB_NAME, group_windows
+from sensor_store import SensorStore
+from polling_engine import PollingEngine
+from constants import STANDARD_SENSORS, PRO_PACK_DIR, HISTORY_MINUTES, UI_FPS
 from ui.theme import ThemeManager
+from ui.refresh import FrameClock, WidgetState
 
 from ui.tabs.dashboard_tab import DashboardTab
 from ui.tabs.graph_tab import GraphTab
@@ -37,15 +41,31 @@ class DashboardApp(ctk.CTk):
         self.obd.log_callback = self.append_debug_log
 
         self.config = ConfigManager.load_config()
+        self.obd.fast_link = self.config.get("fast_link", False)
+        self.obd.fast_transport = self.config.get("fast_transport", False)
+        self.logger.set_flush_policy(self.config.get("log_flush_rows"), self.config.get("log_flush_ms"))
+        self.logger.record_sample_times = self.config.get("log_sample_times", False)
+        self.logger.set_format(self.config.get("log_format"), self.config.get("log_compression"))
+        self.logger.set_rotation(self.config.get("log_rotate_mb"), self.config.get("log_rotate_minutes"),
+                                 self.config.get("log_segment_compression"))
         self.sensor_state = {}
         self.available_sensors = {}
         self.sensor_sources = {}
         self.dashboard_dirty = False
+        # Set by traces on the show/log/graph variables; update_loop pushes the poll list only then
+        self.poll_list_dirty = True
         self.running = True
 
         self.log_buffer = deque(maxlen=500)
         self.txt_debug = None
-        self.sensor_history = defaultdict(lambda: deque([0] * 60, maxlen=60))
+        self.store = SensorStore(retention_seconds=self.config.get("history_minutes", HISTORY_MINUTES) * 60)
+        self.poller = PollingEngine(self.obd, self.store, on_cycle=self.logger.write_row)
+        self._ui_version = 0
+        # Frame rate of update_loop, independent of the polling rate. Values of gauges that
+        # were off screen wait in _ui_pending (newest only) until they are shown.
+        self.frame_clock = FrameClock(self.config.get("ui_fps", UI_FPS))
+        self._ui_pending = {}
+        self.widget_state = WidgetState()
 
         self.title("PyOBD Professional - Ultimate Edition")
         self.geometry("1100x800")
@@ -71,6 +91,8 @@ class DashboardApp(ctk.CTk):
         self.var_port = ctk.StringVar(value="Auto")
         self.var_graph_left = ctk.StringVar(value="RPM")
         self.var_graph_right = ctk.StringVar(value="SPEED")
+        for var in (self.var_graph_left, self.var_graph_right):
+            var.trace_add("write", self.mark_poll_list_dirty)
 
         self.reload_sensor_definitions()
 
@@ -90,7 +112,18 @@ class DashboardApp(ctk.CTk):
             if hasattr(self, 'lbl_path'):
                 self.lbl_path.configure(text=f"Save Path: {self.logger.log_dir}")
 
+        # "trip_db": true keeps trips.db in the log folder, a string is the database path
+        self.trip_store = None
+        trip_db = self.config.get("trip_db")
+        if trip_db:
+            db_path = trip_db if isinstance(trip_db, str) else os.path.join(self.logger.log_dir, DEFAULT_DB_NAME)
+            try:
+                self.trip_store = TripStore(db_path)
+            except Exception as e:
+                print(f"Trip Store Error: {e}")
+
         self.ui_dashboard.rebuild_grid()
+        self.poller.start()
         self.update_loop()
 
     def change_theme(self, new_theme):
@@ -118,17 +151,7 @@ class DashboardApp(ctk.CTk):
                 self.ui_dashboard.btn_next.configure(fg_color=ThemeManager.get("CARD_BG"))
                 self.ui_dashboard.lbl_page.configure(text_color=ThemeManager.get("TEXT_MAIN"))
 
-        for cmd, state in self.sensor_state.items():
-            if state["card_widget"]:
-                state["card_widget"].configure(fg_color=ThemeManager.get("CARD_BG"))
-
-            gauge = state.get("widget_progress_bar")
-            if gauge and hasattr(gauge, 'redraw_colors'):
-                gauge.redraw_colors()
-
-            title_lbl = state.get("widget_title_label")
-            if title_lbl:
-                title_lbl.configure(text_color=ThemeManager.get("TEXT_MAIN"))
+            self.ui_dashboard.redraw_colors()
 
         self.config["theme"] = new_theme
         ConfigManager.save_config(self.config)
@@ -137,6 +160,8 @@ class DashboardApp(ctk.CTk):
         self.available_sensors = STANDARD_SENSORS.copy()
         self.sensor_sources = {k: "Standard" for k in STANDARD_SENSORS}
 
+        pro_definitions = {}
+
         enabled_packs = self.config.get("enabled_packs", [])
         cipher = Fernet(_get_render_context())
 
@@ -165,12 +190,13 @@ class DashboardApp(ctk.CTk):
 
                                 for key, val in pro_data.items():
                                     self.available_sensors[key] = tuple(val[:5])
+                                    pro_definitions[key] = tuple(val)
                                     self.sensor_sources[key] = rel
                                 print(f"Loaded Pack: {rel}")
                             except Exception as e:
                                 print(f"Error loading {rel}: {e}")
 
-        self.obd.set_pro_definitions(self.available_sensors)
+        self.obd.set_pro_definitions(pro_definitions)
         self._init_sensor_state()
 
     def _init_sensor_state(self):
@@ -194,6 +220,7 @@ class DashboardApp(ctk.CTk):
                 is_show = old_state[cmd]["show_var"].get()
                 is_log = old_state[cmd]["log_var"].get()
                 limit_val = old_state[cmd]["limit_var"].get()
+                deadband = old_state[cmd].get("deadband")
                 card = old_state[cmd].get("card_widget", None)
                 val_lbl = old_state[cmd].get("widget_value_label", None)
                 bar = old_state[cmd].get("widget_progress_bar", None)
@@ -203,6 +230,7 @@ class DashboardApp(ctk.CTk):
                 is_show = saved.get("show", def_show)
                 is_log = saved.get("log", def_log)
                 limit_val = str(saved.get("limit", def_limit))
+                deadband = saved.get("deadband")
                 card, val_lbl, bar, title = None, None, None, None
 
             self.sensor_state[cmd] = {
@@ -211,11 +239,16 @@ class DashboardApp(ctk.CTk):
                 "show_var": ctk.BooleanVar(value=is_show),
                 "log_var": ctk.BooleanVar(value=is_log),
                 "limit_var": ctk.StringVar(value=limit_val),
+                # Sparse logging: smallest change written to the trip log (config.json only)
+                "deadband": deadband,
                 "card_widget": card,
                 "widget_value_label": val_lbl,
                 "widget_progress_bar": bar,
                 "widget_title_label": title
             }
+            self.sensor_state[cmd]["show_var"].trace_add("write", self.mark_poll_list_dirty)
+            self.sensor_state[cmd]["log_var"].trace_add("write", self.mark_poll_list_dirty)
+        self.poll_list_dirty = True
 
     def refresh_dev_mode_visibility(self):
         is_dev = self.var_dev_mode.get()
@@ -264,11 +297,13 @@ class DashboardApp(ctk.CTk):
     def mark_dashboard_dirty(self):
         self.dashboard_dirty = True
 
+    def mark_poll_list_dirty(self, *_):
+        self.poll_list_dirty = True
+
     def update_graph_dropdowns(self):
         if hasattr(self, 'ui_graph'):
             options = sorted(list(self.available_sensors.keys()))
-            self.ui_graph.app.menu_left.configure(values=options)
-            self.ui_graph.app.menu_right.configure(values=options)
+            self.ui_graph.set_sensor_options(options)
 
     def on_connect_click(self):
         port_selection = self.var_port.get()
@@ -284,6 +319,7 @@ class DashboardApp(ctk.CTk):
     def start_csv_replay(self, filepath):
         if self.obd.is_connected() or getattr(self.obd, 'replay_active', False):
             self.obd.disconnect()
+            self.logger.close()
             if hasattr(self.obd, 'stop_replay'):
                 self.obd.stop_replay()
 
@@ -300,12 +336,23 @@ class DashboardApp(ctk.CTk):
         connected = False
         if self.obd.is_connected():
             self.obd.disconnect()
+            self.logger.close()
             connected = False
         else:
             self.obd.simulation = is_demo
             connected = self.obd.connect(target_port)
         self.after(0, lambda: self.post_connection_update(connected))
 
+    def collect_deadbands(self):
+        deadbands = {}
+        for cmd, state in self.sensor_state.items():
+            try:
+                if state.get("deadband") is not None:
+                    deadbands[cmd] = float(state["deadband"])
+            except (TypeError, ValueError):
+                self.append_debug_log(f"Ignoring invalid deadband for {cmd}: {state['deadband']}")
+        return deadbands
+
     def post_connection_update(self, connected):
         if hasattr(self.ui_dashboard.app, 'btn_connect'):
             self.ui_dashboard.app.btn_connect.configure(state="normal")
@@ -340,8 +387,16 @@ class DashboardApp(ctk.CTk):
                 self.mark_dashboard_dirty()
                 self.ui_dashboard.rebuild_grid()
 
+                self.store.clear()
+                self._ui_version = 0
+                self._ui_pending.clear()
+                self.push_poll_list()
+
                 log_sensors = [k for k, v in self.sensor_state.items() if v["log_var"].get()]
-                self.logger.start_new_log(log_sensors)
+                self.logger.set_sparse(self.config.get("log_sparse", False), self.collect_deadbands(),
+                                       self.config.get("log_keyframe_seconds"))
+                self.logger.set_trip_store(self.trip_store, getattr(self.obd, 'vehicle_id', None))
+                self.logger.start_new_log(log_sensors, self.available_sensors)
 
                 self.append_debug_log(f"Connected. Car supports {count_supported} PIDs.")
                 self.append_debug_log(f"Smart Filter enabled {count_enabled} relevant sensors.")
@@ -385,8 +440,11 @@ class DashboardApp(ctk.CTk):
 
         snapshot = {}
         thresholds = {}
+        now = time.monotonic()
         for cmd, state in self.sensor_state.items():
-            snapshot[cmd] = self.obd.query_sensor(cmd)
+            value = DiagnosticEngine.recent_value(self.store.series(cmd), now)
+            # Sensors the poller has not read lately are asked once
+            snapshot[cmd] = self.obd.query_sensor(cmd) if value is None else value
             thresholds[cmd] = state["limit_var"].get()
 
         issues = DiagnosticEngine.analyze(snapshot, thresholds)
@@ -399,6 +457,35 @@ class DashboardApp(ctk.CTk):
                 for issue in issues:
                     self.ui_diagnostics.app.txt_dtc.insert("end", f"• {issue}\n")
 
+    def search_trip_history(self):
+        """Lists stored trip windows where a sensor went over its limit."""
+        if not hasattr(self.ui_diagnostics.app, 'txt_dtc'):
+            return
+        txt = self.ui_diagnostics.app.txt_dtc
+        txt.delete("1.0", "end")
+        if self.trip_store is None:
+            txt.insert("end", "Trip history is off. Set \"trip_db\": true in config.json to record trips.")
+            return
+
+        found = 0
+        for cmd, state in self.sensor_state.items():
+            try:
+                limit = float(state["limit_var"].get())
+            except ValueError:
+                continue
+            if limit <= 0:
+                continue
+            windows = group_windows(self.trip_store.find([(cmd, ">", limit)]))
+            if not windows:
+                continue
+            found += len(windows)
+            txt.insert("end", f"{state['name']} above {limit:g}:\n", "bold")
+            for trip, start, end, count in windows[-10:]:
+                when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start))
+                txt.insert("end", f"• Trip {trip}  {when}  for {end - start:.0f} s\n")
+        if not found:
+            txt.insert("end", "✅ No stored trip went over a sensor limit.")
+
     def scan_codes(self):
         if not hasattr(self.ui_diagnostics.app, 'txt_dtc'): return
 
@@ -493,16 +580,26 @@ class DashboardApp(ctk.CTk):
 
     def on_close(self):
         self.running = False
-        data_to_save = {
+        self.poller.stop()
+        self.logger.close()
+        # Give the last segment a moment to compress; an uncompressed segment is still readable
+        self.logger.wait_compression(timeout=5)
+        if self.trip_store is not None:
+            self.trip_store.close()
+        # Keep settings that are only edited in config.json (fast_link, log_flush_rows, ...)
+        data_to_save = dict(self.config)
+        data_to_save.update({
             "log_dir": self.logger.log_dir,
             "enabled_packs": self.config.get("enabled_packs", []),
             "developer_mode": self.var_dev_mode.get(),
             "theme": self.config.get("theme", "Cyber"),
             "sensors": {}
-        }
+        })
         for cmd, state in self.sensor_state.items():
             data_to_save["sensors"][cmd] = {"show": state["show_var"].get(), "log": state["log_var"].get(),
                                             "limit": state["limit_var"].get()}
+            if state.get("deadband") is not None:
+                data_to_save["sensors"][cmd]["deadband"] = state["deadband"]
         ConfigManager.save_config(data_to_save)
 
         try:
@@ -512,6 +609,12 @@ class DashboardApp(ctk.CTk):
         self.destroy()
         os._exit(0)
 
+    def push_poll_list(self):
+        self.poll_list_dirty = False
+        active = [cmd for cmd, state in self.sensor_state.items()
+                  if state["show_var"].get() or state["log_var"].get()]
+        self.poller.set_sensors(active, priority=tuple(self.ui_graph.series_keys()))
+
     def update_loop(self):
         if not self.running: return
 
@@ -520,62 +623,39 @@ class DashboardApp(ctk.CTk):
             self.dashboard_dirty = False
 
         if self.obd.is_connected():
-            data_snapshot = {}
-            current_speed = 0
-
-            from constants import HIGH_PRIORITY_SENSORS
-            fast_queue = set()
-            slow_queue = []
-            graph_left = self.var_graph_left.get()
-            graph_right = self.var_graph_right.get()
-
-            for cmd, state in self.sensor_state.items():
-                if state["show_var"].get() or state["log_var"].get():
-                    if cmd in HIGH_PRIORITY_SENSORS or cmd == graph_left or cmd == graph_right:
-                        fast_queue.add(cmd)
-                    else:
-                        slow_queue.append(cmd)
-
-            sensors_to_query = list(fast_queue)
-
-            if not hasattr(self, '_slow_sensor_index'):
-                self._slow_sensor_index = 0
-
-            if slow_queue:
-                if self._slow_sensor_index >= len(slow_queue):
-                    self._slow_sensor_index = 0
-                sensors_to_query.append(slow_queue[self._slow_sensor_index])
-                self._slow_sensor_index += 1
-
-            for cmd in sensors_to_query:
-                val = self.obd.query_sensor(cmd)
-
-                if val is not None:
-                    data_snapshot[cmd] = val
-                    self.sensor_history[cmd].append(val)
-                    if cmd == "SPEED": current_speed = val
-
-                    state = self.sensor_state.get(cmd)
-                    if state and state["show_var"].get():
-                        gauge = state.get("widget_progress_bar")
-                        if gauge and hasattr(gauge, 'update_value'):
-                            if gauge.winfo_ismapped():
-                                gauge.update_value(val)
-
-            if self.tabview.get() == "Live Graph":
+            if self.poll_list_dirty:
+                self.push_poll_list()
+            # Every sensor's values since the last frame collapse into its latest one
+            self._ui_version, changes = self.store.changed_since(self._ui_version)
+            self._ui_pending.update(changes)
+
+            for cmd, val in list(self._ui_pending.items()):
+                state = self.sensor_state.get(cmd)
+                if not state or not state["show_var"].get():
+                    del self._ui_pending[cmd]
+                    continue
+                gauge = state.get("widget_progress_bar")
+                if not gauge or not hasattr(gauge, 'update_value'):
+                    # Not on the current page; rebuild_grid shows the store's latest value
+                    del self._ui_pending[cmd]
+                elif gauge.winfo_ismapped():
+                    gauge.update_value(val)
+                    del self._ui_pending[cmd]
+
+            current_speed = self.store.get("SPEED", 0)
+
+            if self.tabview.get() == "Live Graph" and changes:
                 self.ui_graph.update()
 
             if self.tabview.get() == "Dyno" and hasattr(self, 'ui_dyno') and self.ui_dyno.is_recording:
-                current_rpm = data_snapshot.get("RPM", 0)
-                self.ui_dyno.update_dyno(current_speed, current_rpm)
+                if "SPEED" in changes or "RPM" in changes:
+                    self.ui_dyno.update_dyno(self.store)
 
             if hasattr(self.ui_diagnostics.app, 'btn_clear'):
                 if current_speed > 0:
-                    self.ui_diagnostics.app.btn_clear.configure(state="disabled", text="MOVING...")
+                    self.widget_state.configure(self.ui_diagnostics.app.btn_clear, state="disabled", text="MOVING...")
                 else:
-                    self.ui_diagnostics.app.btn_clear.configure(state="normal", text="CLEAR CODES")
-
-            self.logger.write_row(data_snapshot)
+                    self.widget_state.configure(self.ui_diagnostics.app.btn_clear, state="normal", text="CLEAR CODES")
 
         if self.running:
-            self.after(50, self.update_loop)
\ No newline at end of file
+            self.after(self.frame_clock.next_delay(), self.update_loop)
@@ -0,0 +1,53 @@
+import time
+
+_UNSET = object()
+
+
+class FrameClock:
+    """
+    Fixed-rate frame timing for an after() loop: next_delay() is the wait until the next
+    frame boundary, so the time a frame takes does not slow the rate down. Frames that
+    were missed entirely are skipped instead of run back to back.
+    """
+
+    def __init__(self, fps, clock=time.monotonic):
+        self.interval = 1.0 / max(1.0, float(fps))
+        self._clock = clock
+        self._next = None
+
+    def next_delay(self):
+        """Milliseconds until the next frame."""
+        now = self._clock()
+        if self._next is None:
+            self._next = now
+        self._next += self.interval
+        if self._next < now:
+            self._next = now + self.interval - (now - self._next) % self.interval
+        return max(1, int(round((self._next - now) * 1000)))
+
+
+class WidgetState:
+    """
+    Remembers the options last configured on each widget, so configure() only reaches Tk
+    for options whose value differs from what is already displayed.
+    """
+
+    def __init__(self):
+        self._last = {}
+
+    def configure(self, widget, **options):
+        """True when a Tk call was made."""
+        last = self._last.setdefault(widget, {})
+        changed = {k: v for k, v in options.items() if last.get(k, _UNSET) != v}
+        if not changed:
+            return False
+        widget.configure(**changed)
+        last.update(changed)
+        return True
+
+    def forget(self, widget=None):
+        """Drops what is known about one widget (or all), e.g. after it was configured elsewhere."""
+        if widget is None:
+            self._last.clear()
+        else:
+            self._last.pop(widget, None)
@@ -3,6 +3,73 @@ import math
 from ui.tooltip import ToolTip
 from ui.theme import ThemeManager
 from ui.widgets.analog_gauge import AnalogGauge
+from ui.widgets.gauge_page import GaugePage
+
+
+def _card_title(state):
+    display_name = state['name']
+    if len(display_name) > 18:
+        display_name = display_name[:15] + "..."
+    if state['unit']:
+        display_name += f" ({state['unit']})"
+    return display_name
+
+
+class GaugeCard:
+    """One dashboard card (title + AnalogGauge) that can be rebound to any sensor."""
+
+    def __init__(self, parent):
+        self.container = ctk.CTkFrame(parent, fg_color=ThemeManager.get("CARD_BG"))
+        self.lbl_title = ctk.CTkLabel(
+            self.container,
+            text="",
+            font=("Arial", 14, "bold"),
+            text_color=ThemeManager.get("TEXT_MAIN")
+        )
+        self.lbl_title.pack(pady=(10, 0))
+
+        self.gauge = AnalogGauge(self.container, width=180, height=180, min_val=0, max_val=100)
+        self.gauge.pack(pady=5)
+
+        self.tooltip = ToolTip(self.container, text="", delay=1000)
+        self.cmd = None
+        self._binding = None
+        self._cell = None
+
+    def bind(self, cmd, title, description, limit, unit, value=None):
+        binding = (cmd, title, limit, unit)
+        if binding == self._binding:
+            return
+        self._binding = binding
+
+        self.lbl_title.configure(text=title)
+        self.tooltip.text = description
+        self.gauge.set_range(0, limit, unit)
+        if cmd != self.cmd:
+            # Show the sensor's latest value right away instead of the previous sensor's
+            self.cmd = cmd
+            self.gauge.update_value(value if isinstance(value, (int, float)) else 0)
+        else:
+            self.gauge.update_value(self.gauge.current_value)
+
+    def redraw_colors(self):
+        self.container.configure(fg_color=ThemeManager.get("CARD_BG"))
+        self.lbl_title.configure(text_color=ThemeManager.get("TEXT_MAIN"))
+        self.gauge.redraw_colors()
+
+    def show(self, row, col):
+        if self._cell != (row, col):
+            self._cell = (row, col)
+            self.container.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+
+    def hide(self):
+        if self._cell is not None:
+            self._cell = None
+            self.container.grid_remove()
+        # A hidden card misses updates; the next bind() starts from the latest value
+        self.cmd = None
+        self._binding = None
+
 
 class DashboardTab:
     def __init__(self, parent_frame, app_instance):
@@ -60,14 +127,25 @@ class DashboardTab:
         self.dash_scroll = ctk.CTkScrollableFrame(self.frame, fg_color=ThemeManager.get("BACKGROUND"))
         self.dash_scroll.pack(fill="both", expand=True, padx=0, pady=0)
 
-    def rebuild_grid(self):
-        for widget in self.dash_scroll.winfo_children():
-            widget.destroy()
+        # "gauge_renderer": "canvas" (default) draws a page of gauges on one canvas; "widgets"
+        # uses a frame and canvas per gauge. Either is built on demand, one page at most.
+        self.page = None
+        if self.app.config.get("gauge_renderer", "canvas") == "canvas":
+            self.page = GaugePage(self.dash_scroll)
+        self.cards = []
+        self._columns_configured = False
 
+    def rebuild_grid(self):
+        """
+        Shows the current page. Gauges are pooled: page flips and sensor toggles rebind and
+        re-grid (or, on the single canvas page, show and hide) the existing ones instead of
+        destroying and rebuilding every gauge canvas.
+        """
         for cmd, state in self.app.sensor_state.items():
             state["card_widget"] = None
             state["widget_progress_bar"] = None
             state["widget_value_label"] = None
+            state["widget_title_label"] = None
 
         active_sensors = [k for k, v in self.app.sensor_state.items() if v["show_var"].get()]
 
@@ -84,54 +162,51 @@ class DashboardTab:
         end_idx = start_idx + self.items_per_page
         page_sensors = active_sensors[start_idx:end_idx]
 
+        if self.page is not None:
+            for slot, cmd in zip(self.page.layout(len(page_sensors)), page_sensors):
+                state = self.app.sensor_state[cmd]
+                slot.bind(cmd, *self._binding(state), value=self.app.store.get(cmd))
+                state["widget_progress_bar"] = slot
+            return
+
+        while len(self.cards) < len(page_sensors):
+            self.cards.append(GaugeCard(self.dash_scroll))
+
         cols = 3
         for i, cmd in enumerate(page_sensors):
-            row = i // cols;
-            col = i % cols
             state = self.app.sensor_state[cmd]
-
-            try:
-                limit = float(state['limit_var'].get())
-            except:
-                limit = 100
-
-            container = ctk.CTkFrame(self.dash_scroll, fg_color=ThemeManager.get("CARD_BG"))
-
-            display_name = state['name']
-            if len(display_name) > 18:
-                display_name = display_name[:15] + "..."
-            if state['unit']:
-                display_name += f" ({state['unit']})"
-
-            lbl_title = ctk.CTkLabel(
-                container,
-                text=display_name,
-                font=("Arial", 14, "bold"),
-                text_color=ThemeManager.get("TEXT_MAIN")
-            )
-            lbl_title.pack(pady=(10, 0))
-
-            gauge = AnalogGauge(
-                container,
-                width=180,
-                height=180,
-                min_val=0,
-                max_val=limit,
-                unit=state['unit']
-            )
-            gauge.pack(pady=5)
-
-            state["card_widget"] = container
-            state["widget_progress_bar"] = gauge
-
-            tooltip_text = state.get("description", state['name'])
-            ToolTip(container, text=tooltip_text, delay=1000)
-
-            container.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
-
-        self.dash_scroll.grid_columnconfigure(0, weight=1)
-        self.dash_scroll.grid_columnconfigure(1, weight=1)
-        self.dash_scroll.grid_columnconfigure(2, weight=1)
+            card = self.cards[i]
+            card.bind(cmd, *self._binding(state), value=self.app.store.get(cmd))
+            card.show(i // cols, i % cols)
+
+            state["card_widget"] = card.container
+            state["widget_progress_bar"] = card.gauge
+            state["widget_title_label"] = card.lbl_title
+
+        for card in self.cards[len(page_sensors):]:
+            card.hide()
+
+        if not self._columns_configured:
+            self.dash_scroll.grid_columnconfigure(0, weight=1)
+            self.dash_scroll.grid_columnconfigure(1, weight=1)
+            self.dash_scroll.grid_columnconfigure(2, weight=1)
+            self._columns_configured = True
+
+    @staticmethod
+    def _binding(state):
+        """(title, description, limit, unit) a card or canvas gauge shows for a sensor."""
+        try:
+            limit = float(state['limit_var'].get())
+        except:
+            limit = 100
+        return _card_title(state), state.get("description", state['name']), limit, state['unit']
+
+    def redraw_colors(self):
+        # Every pooled gauge, including the ones not on the current page
+        if self.page is not None:
+            self.page.redraw_colors()
+        for card in self.cards:
+            card.redraw_colors()
 
     def next_page(self):
         if self.current_page < self.total_pages - 1:
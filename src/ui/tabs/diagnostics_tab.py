@@ -20,6 +20,9 @@ class DiagnosticsTab:
         self.app.btn_clear = ctk.CTkButton(btn_frame, text="CLEAR CODES", fg_color="red", width=150,
                                            command=self.app.confirm_clear_codes)
         self.app.btn_clear.pack(side="left", padx=10)
+        self.app.btn_history = ctk.CTkButton(btn_frame, text="TRIP HISTORY", fg_color="teal", width=150,
+                                             command=self.app.search_trip_history)
+        self.app.btn_history.pack(side="left", padx=10)
         self.app.txt_dtc = ctk.CTkTextbox(self.frame, width=700, height=350)
         self.app.txt_dtc.pack(pady=10)
         self.app.txt_dtc.insert("1.0",
@@ -129,7 +129,8 @@ class DynoTab:
             except ValueError:
                 weight = 1600
 
-            self.dyno.reset()
+            # Only samples from now on count toward the run
+            self.dyno.reset(since=self.app.store.get_timestamp("SPEED"))
             self.x_rpm.clear();
             self.y_hp.clear();
             self.y_tq.clear()
@@ -137,17 +138,21 @@ class DynoTab:
             self.current_weight = weight
             self.btn_record.configure(text="STOP", fg_color=ThemeManager.get("WARNING"))
 
-    def update_dyno(self, speed_kmh, rpm):
+    def update_dyno(self, store):
         if self.is_recording:
-            hp, torque = self.dyno.calculate_step(self.current_weight, speed_kmh, rpm)
+            points = self.dyno.calculate_series(self.current_weight, store.series("SPEED"), store.series("RPM"))
             self.lbl_hp.configure(text=f"{int(self.dyno.peak_hp)} HP")
             self.lbl_tq.configure(text=f"{int(self.dyno.peak_torque)} Nm")
 
-            if rpm > 1000 and hp > 0:
-                self.x_rpm.append(rpm)
-                self.y_hp.append(hp)
-                self.y_tq.append(torque)
+            added = False
+            for rpm, hp, torque in points:
+                if rpm > 1000 and hp > 0:
+                    self.x_rpm.append(rpm)
+                    self.y_hp.append(hp)
+                    self.y_tq.append(torque)
+                    added = True
 
+            if added:
                 self.line_hp.set_data(self.x_rpm, self.y_hp)
                 self.line_tq.set_data(self.x_rpm, self.y_tq)
 
@@ -162,9 +167,11 @@ class DynoTab:
 
                 self.canvas.draw_idle()
 
-        self._update_drag_strip(speed_kmh)
+        self._update_drag_strip(store.get("SPEED", 0), store.get_timestamp("SPEED"))
 
-    def _update_drag_strip(self, speed):
+    def _update_drag_strip(self, speed, sample_time=None):
+        # Drag times come from the sample clock when it is known, so UI lag does not count
+        now = time.time() if sample_time is None else sample_time
         if not self.drag_running:
             if speed == 0:
                 self.drag_armed = True
@@ -172,13 +179,13 @@ class DynoTab:
             elif self.drag_armed and speed > 0:
                 self.drag_armed = False
                 self.drag_running = True
-                self.drag_start_time = time.time()
+                self.drag_start_time = now
                 self.lbl_drag_status.configure(text="GO! GO! GO!", text_color=ThemeManager.get("ACCENT"))
             else:
                 self.lbl_drag_status.configure(text="STOP CAR TO ARM", text_color="gray")
 
         elif self.drag_running:
-            elapsed = time.time() - self.drag_start_time
+            elapsed = now - self.drag_start_time
             self.lbl_timer.configure(text=f"{elapsed:.2f} s")
 
             if speed >= 100:
@@ -1,9 +1,31 @@
+import os
+import threading
+from tkinter import filedialog
+
 import customtkinter as ctk
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
+from constants import GRAPH_WINDOWS
+from fleet_report import load_columns
+from pyramid import PyramidSet
+from zone_map import ZoneMap
+
+# Right axis series is red; left axis series take the other colors in order
+RIGHT_COLOR = "#e74c3c"
+LEFT_COLORS = ["#3498db", "#2ecc71", "#f1c40f", "#9b59b6", "#1abc9c", "#e67e22", "#ecf0f1"]
+
 
 class GraphTab:
+    """
+    Live Graph. Axes, grid and labels are drawn once into a cached background; a frame only
+    restores it and blits the line artists, so frame cost hardly grows with more series.
+    The full redraw happens only when the axis limits change: the y range grows when a
+    value leaves it, and the x axis (seconds relative to the newest sample, or to the start
+    of a loaded log) is fixed per window.
+    """
+
     def __init__(self, parent_frame, app_instance):
         self.frame = parent_frame
         self.app = app_instance
@@ -11,62 +33,253 @@ class GraphTab:
         controls = ctk.CTkFrame(self.frame)
         controls.pack(fill="x", padx=10, pady=5)
 
-        ctk.CTkLabel(controls, text="Left Axis (Blue):", text_color="#3498db", font=("Arial", 12, "bold")).pack(
+        ctk.CTkLabel(controls, text="Left Axis (Blue):", text_color=LEFT_COLORS[0], font=("Arial", 12, "bold")).pack(
             side="left", padx=5)
-        self.app.menu_left = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_left, values=["RPM"])
+        self.app.menu_left = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_left, values=["RPM"],
+                                               command=lambda _: self.reset_scale())
         self.app.menu_left.pack(side="left", padx=5)
 
-        ctk.CTkLabel(controls, text="Right Axis (Red):", text_color="#e74c3c", font=("Arial", 12, "bold")).pack(
+        ctk.CTkLabel(controls, text="Right Axis (Red):", text_color=RIGHT_COLOR, font=("Arial", 12, "bold")).pack(
             side="left", padx=5)
-        self.app.menu_right = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_right, values=["SPEED"])
+        self.app.menu_right = ctk.CTkOptionMenu(controls, variable=self.app.var_graph_right, values=["SPEED"],
+                                                command=lambda _: self.reset_scale())
         self.app.menu_right.pack(side="left", padx=5)
 
+        # More series on the left axis
+        self.extra = []
+        self.var_add = ctk.StringVar(value="+ Series")
+        self.menu_add = ctk.CTkOptionMenu(controls, variable=self.var_add, values=["RPM"], width=110,
+                                          command=self.add_series)
+        self.menu_add.pack(side="left", padx=5)
+        ctk.CTkButton(controls, text="Clear", width=60, fg_color="#4A4A4A", hover_color="#333333",
+                      command=self.clear_series).pack(side="left", padx=5)
+
+        # Whole-trip views come from the min/max pyramids, so any window draws about one point per pixel
+        self.var_window = ctk.StringVar(value="1 min")
+        ctk.CTkOptionMenu(controls, variable=self.var_window, values=list(GRAPH_WINDOWS), width=90,
+                          command=lambda _: self.reset_scale()).pack(side="left", padx=5)
+        self.loaded = None
+        # Zone map of the loaded log; its block min/max set the y range (see _zone_ranges)
+        self.loaded_zones = None
+        self._zone_cache = {}
+        self.btn_log = ctk.CTkButton(controls, text="Open Log...", width=110, command=self.toggle_log)
+        self.btn_log.pack(side="right", padx=5)
+
         self.fig, self.ax1 = plt.subplots(figsize=(6, 4), dpi=100)
         self.fig.patch.set_facecolor('#2b2b2b')
         self.ax1.set_facecolor('#2b2b2b')
-        self.ax1.tick_params(axis='y', labelcolor='#3498db', colors='white')
+        self.ax1.tick_params(axis='y', labelcolor=LEFT_COLORS[0], colors='white')
         self.ax1.tick_params(axis='x', colors='white')
         self.ax1.grid(True, color='#404040', linestyle='--', alpha=0.5)
+        self.ax1.set_xlabel("Time (s)", color='white', fontsize=9)
 
         self.ax2 = self.ax1.twinx()
-        self.ax2.tick_params(axis='y', labelcolor='#e74c3c', colors='white')
+        self.ax2.tick_params(axis='y', labelcolor=RIGHT_COLOR, colors='white')
         self.ax2.spines['bottom'].set_color('white');
         self.ax2.spines['top'].set_color('white')
         self.ax2.spines['left'].set_color('white');
         self.ax2.spines['right'].set_color('white')
 
-        self.line_rpm, = self.ax1.plot([], [], color='#3498db', linewidth=2)
-        self.line_speed, = self.ax2.plot([], [], color='#e74c3c', linewidth=2)
+        # (key, axis) -> animated Line2D; animated artists stay out of the cached background
+        self.lines = {}
+        self._ylim = {}
+        self._xlim = None
+        self._labels = None
+        self._background = None
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
 
-    def update(self):
-        left_key = self.app.var_graph_left.get()
-        right_key = self.app.var_graph_right.get()
+    # --- Series ---
+    def series(self):
+        """[(key, axis)] to plot: the left menu and the added series on ax1, the right menu on ax2."""
+        left = [self.app.var_graph_left.get()] + [k for k in self.extra if k != self.app.var_graph_left.get()]
+        return [(k, self.ax1) for k in left] + [(self.app.var_graph_right.get(), self.ax2)]
+
+    def series_keys(self):
+        return list(dict.fromkeys(k for k, _ in self.series()))
+
+    def set_sensor_options(self, options):
+        self.app.menu_left.configure(values=options)
+        self.app.menu_right.configure(values=options)
+        self.menu_add.configure(values=options)
+
+    def add_series(self, key):
+        self.var_add.set("+ Series")
+        if key not in self.extra and len(self.extra) < len(LEFT_COLORS) - 1:
+            self.extra.append(key)
+            # Graphed sensors are polled faster
+            self.app.mark_poll_list_dirty()
+            self.reset_scale()
+
+    def clear_series(self):
+        self.extra = []
+        self.app.mark_poll_list_dirty()
+        self.reset_scale()
 
-        data_left = self.app.sensor_history[left_key]
-        data_right = self.app.sensor_history[right_key]
-        x_data = list(range(len(data_left)))
+    def reset_scale(self):
+        """Forgets the axis limits, e.g. after the series or the window changed."""
+        self._ylim = {}
+        self._xlim = None
+        self.update()
+
+    def _sync_lines(self, wanted):
+        for item in [item for item in self.lines if item not in wanted]:
+            self.lines.pop(item).remove()
+        colors = iter(LEFT_COLORS)
+        for item in wanted:
+            key, ax = item
+            color = RIGHT_COLOR if ax is self.ax2 else next(colors)
+            line = self.lines.get(item)
+            if line is None:
+                line, = ax.plot([], [], color=color, linewidth=2, animated=True)
+                self.lines[item] = line
+            else:
+                line.set_color(color)
+
+    def _name(self, key):
+        state = self.app.sensor_state.get(key)
+        return state["name"] if state else key
+
+    # --- Log view ---
+    def toggle_log(self):
+        """Shows a whole trip log instead of the live data, or goes back to live."""
+        if self.loaded is not None:
+            self.loaded = None
+            self.loaded_zones = None
+            self.btn_log.configure(text="Open Log...")
+            self.reset_scale()
+            return
+        path = filedialog.askopenfilename(filetypes=[("Trip logs", "*.csv *.gz *.zst *.obdb *.json"),
+                                                     ("All files", "*.*")])
+        if not path:
+            return
+        self.btn_log.configure(text="Loading...", state="disabled")
+        threading.Thread(target=self._load_log, args=(path,), daemon=True).start()
+
+    def _load_log(self, path):
+        try:
+            epochs, columns = load_columns(path)
+            if len(epochs) and np.isnan(epochs).all():
+                # Logs from before the Epoch column: one row per step
+                epochs = np.arange(len(epochs), dtype="f8")
+                zones = None
+            else:
+                zones = ZoneMap.load(path)
+                if zones is None or not zones.complete:
+                    # No sidecar, or one from a trip that was not closed: index the loaded columns
+                    zones = ZoneMap.from_columns(epochs, columns)
+            pyramids = PyramidSet.from_columns(epochs, columns)
+            error = None
+        except Exception as e:
+            pyramids, zones, error = None, None, e
+        self.frame.after(0, lambda: self._log_loaded(path, pyramids, zones, error))
+
+    def _log_loaded(self, path, pyramids, zones, error):
+        self.btn_log.configure(state="normal")
+        if error is not None:
+            print(f"Graph Log Error: {error}")
+            self.btn_log.configure(text="Open Log...")
+            return
+        self.loaded = pyramids
+        self.loaded_zones = zones
+        self._zone_cache = {}
+        self.btn_log.configure(text=f"Live ({os.path.basename(path)})")
+        self.reset_scale()
+
+    # --- Drawing ---
+    def _time_range(self, source):
+        """(start, end, origin, xlim): data window in sample time and the axis in seconds from origin."""
+        span = source.span()
+        window = GRAPH_WINDOWS.get(self.var_window.get())
+        if span is None:
+            return 0.0, 0.0, 0.0, (-(window or 60), 0)
+        start, end = span
+        if self.loaded is not None:
+            # A loaded log is shown from its start
+            end = end if window is None else min(end, start + window)
+            return start, end, start, (0, window or max(end - start, 1.0))
+        if window is not None:
+            return max(start, end - window), end, end, (-window, 0)
+        # Whole live trip: the axis grows in steps instead of on every frame
+        length = max(end - start, 1.0)
+        xlim = self._xlim if self._xlim and -self._xlim[0] >= length else (-length * 1.25, 0)
+        return start, end, end, xlim
+
+    def _zone_ranges(self, keys, start, end):
+        """[(min, max)] of each key over the loaded log's blocks in [start, end], or None when one is not indexed."""
+        ranges = []
+        for key in keys:
+            if (key, start, end) not in self._zone_cache:
+                self._zone_cache[(key, start, end)] = self.loaded_zones.value_range(key, start, end)
+            ranges.append(self._zone_cache[(key, start, end)])
+        return None if not ranges or None in ranges else ranges
+
+    def _y_limits(self, ax, ranges):
+        """The axis' current limits, or new ones when a value left them (None when unchanged)."""
+        lo = min(r[0] for r in ranges)
+        hi = max(r[1] for r in ranges)
+        current = self._ylim.get(ax)
+        if current and current[0] <= lo and hi <= current[1]:
+            return None
+        return (min(0.0, lo * 1.2), hi * 1.2 if hi > 0 else 100)
+
+    def update(self):
+        wanted = self.series()
+        self._sync_lines(wanted)
+        source = self.loaded if self.loaded is not None else self.app.store.pyramids
+        start, end, origin, xlim = self._time_range(source)
+        pixels = max(self.canvas.get_tk_widget().winfo_width(), 100)
 
-        self.line_rpm.set_data(x_data, data_left)
-        self.line_speed.set_data(x_data, data_right)
+        data = {self.ax1: [], self.ax2: []}
+        for (key, ax), line in self.lines.items():
+            x, y = source.query(key, start, end, pixels)
+            line.set_data(x - origin, y)
+            if len(y):
+                data[ax].append((y.min(), y.max()))
+        if self.loaded_zones is not None:
+            # A loaded log's whole window is known up front: scale to it once, not as points come in
+            for ax in data:
+                ranges = self._zone_ranges([k for k, a in self.lines if a is ax], start, end)
+                if ranges:
+                    data[ax] = ranges
 
-        if data_left:
-            max_l = max(data_left) if max(data_left) > 0 else 100
-            self.ax1.set_ylim(0, max_l * 1.2)
-            self.ax1.set_xlim(0, len(data_left))
+        redraw = self._background is None
+        if xlim != self._xlim:
+            self._xlim = xlim
+            self.ax1.set_xlim(*xlim)
+            redraw = True
+        for ax, values in data.items():
+            limits = self._y_limits(ax, values) if values else None
+            if limits is not None:
+                self._ylim[ax] = limits
+                ax.set_ylim(*limits)
+                redraw = True
 
-        if data_right:
-            max_r = max(data_right) if max(data_right) > 0 else 100
-            self.ax2.set_ylim(0, max_r * 1.2)
-            self.ax2.set_xlim(0, len(data_right))
+        labels = tuple(", ".join(self._name(k) for k, a in wanted if a is ax) for ax in (self.ax1, self.ax2))
+        if labels != self._labels:
+            self._labels = labels
+            self.ax1.set_ylabel(labels[0], color=LEFT_COLORS[0], fontsize=10, fontweight='bold')
+            self.ax2.set_ylabel(labels[1], color=RIGHT_COLOR, fontsize=10, fontweight='bold')
+            redraw = True
 
-        name_left = self.app.sensor_state[left_key]["name"] if left_key in self.app.sensor_state else left_key
-        name_right = self.app.sensor_state[right_key]["name"] if right_key in self.app.sensor_state else right_key
+        if redraw:
+            # Full render; _on_draw caches the new background and blits the lines
+            self.canvas.draw()
+        else:
+            self._blit()
 
-        self.ax1.set_ylabel(name_left, color='#3498db', fontsize=10, fontweight='bold')
-        self.ax2.set_ylabel(name_right, color='#e74c3c', fontsize=10, fontweight='bold')
+    def _on_draw(self, event):
+        # Also runs after window resizes, which invalidate the cached background
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._blit()
 
-        self.canvas.draw_idle()
\ No newline at end of file
+    def _blit(self):
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        for line in self.lines.values():
+            line.axes.draw_artist(line)
+        self.canvas.blit(self.fig.bbox)
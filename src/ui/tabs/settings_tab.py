@@ -4,6 +4,7 @@ import json
 from tkinter import filedialog
 from config_manager import ConfigManager
 from constants import PRO_PACK_DIR
+from replay_engine import REPLAY_SPEEDS
 from ui.theme import ThemeManager
 
 class SettingsTab:
@@ -78,16 +79,26 @@ class SettingsTab:
         ctk.CTkButton(frame_log, text="▶ Replay CSV Log", fg_color="#005b96",
                       command=self.start_replay_dialog).pack(side="left", padx=20)
 
+        self.var_replay_speed = ctk.StringVar(value="1x")
+        ctk.CTkLabel(frame_log, text="Speed:").pack(side="left")
+        ctk.CTkOptionMenu(frame_log, variable=self.var_replay_speed, values=list(REPLAY_SPEEDS), width=70,
+                          command=self.change_replay_speed).pack(side="left", padx=5)
+
         ctk.CTkSwitch(frame_log, text="Developer Mode", variable=self.app.var_dev_mode,
                       command=self.app.refresh_dev_mode_visibility).pack(side="right", padx=20)
 
     def start_replay_dialog(self):
         filepath = filedialog.askopenfilename(
-            title="Select CSV Log for Replay",
-            filetypes=[("CSV Files", "*.csv")]
+            title="Select Log for Replay",
+            filetypes=[("Trip Logs", "*.csv *.obdb *.gz *.zst *.manifest.json"), ("CSV Files", "*.csv"),
+                       ("Binary Logs", "*.obdb"), ("Rotated Trips", "*.manifest.json")]
         )
         if filepath and hasattr(self.app, "start_csv_replay"):
             self.app.start_csv_replay(filepath)
+            self.change_replay_speed(self.var_replay_speed.get())
+
+    def change_replay_speed(self, choice):
+        self.app.obd.set_replay_speed(REPLAY_SPEEDS.get(choice, 1.0))
 
     def refresh_settings_list(self, choice=None):
         for widget in self.settings_scroll.winfo_children():
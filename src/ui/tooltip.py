@@ -2,16 +2,18 @@ import tkinter as tk
 
 
 class ToolTip:
-    def __init__(self, widget, text, delay=1000):
+    def __init__(self, widget, text, delay=1000, tag=None):
         self.widget = widget
         self.text = text
         self.delay = delay
         self.tip_window = None
         self.id = None
 
-        self.widget.bind("<Enter>", self.schedule)
-        self.widget.bind("<Leave>", self.unschedule)
-        self.widget.bind("<ButtonPress>", self.unschedule)
+        # With a tag, the tooltip belongs to those items of a canvas rather than the whole widget
+        bind = self.widget.bind if tag is None else (lambda seq, func: self.widget.tag_bind(tag, seq, func))
+        bind("<Enter>", self.schedule)
+        bind("<Leave>", self.unschedule)
+        bind("<ButtonPress>", self.unschedule)
 
     def schedule(self, event=None):
         self.unschedule()
@@ -29,6 +29,8 @@ class AnalogGauge(ctk.CTkFrame):
         self.active_arc = self.canvas.create_arc(0, 0, 0, 0, style="arc", width=12)
         self.text_val = self.canvas.create_text(0, 0, text="--", font=("Arial", 24, "bold"))
         self.text_unit = self.canvas.create_text(0, 0, text=unit, font=("Arial", 10))
+        # (extent, color, text) on screen; update_value skips the canvas when unchanged
+        self._shown = None
 
         self.redraw_colors()
         self.update_value(self.min_val)
@@ -53,10 +55,19 @@ class AnalogGauge(ctk.CTkFrame):
             self.canvas.itemconfigure(self.bg_arc, start=self.arc_start, extent=self.arc_extent)
             self.canvas.itemconfigure(self.active_arc, start=self.arc_start)
 
+            self._shown = None
             self.update_value(self.current_value)
         except Exception:
             pass
 
+    def set_range(self, min_val, max_val, unit):
+        """Rebinds a pooled gauge to another sensor's scale and unit."""
+        self.min_val = min_val
+        self.max_val = max_val
+        if unit != self.unit:
+            self.unit = unit
+            self.canvas.itemconfigure(self.text_unit, text=unit)
+
     def update_value(self, value):
         try:
             self.current_value = value
@@ -73,13 +84,15 @@ class AnalogGauge(ctk.CTkFrame):
             if pct > 0.90:
                 color = ThemeManager.get("WARNING")
 
-            self.canvas.itemconfigure(self.active_arc, extent=angle, outline=color)
-
             if isinstance(value, float) and abs(value) < 10:
                 text_str = f"{value:.1f}"
             else:
                 text_str = str(int(value))
 
+            if (angle, color, text_str) == self._shown:
+                return
+            self._shown = (angle, color, text_str)
+            self.canvas.itemconfigure(self.active_arc, extent=angle, outline=color)
             self.canvas.itemconfigure(self.text_val, text=text_str, fill=color)
         except Exception:
             pass
\ No newline at end of file
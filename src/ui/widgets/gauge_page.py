@@ -0,0 +1,191 @@
+import math
+import tkinter as tk
+from ui.theme import ThemeManager
+from ui.tooltip import ToolTip
+
+# Same look as a dashboard card holding an AnalogGauge(width=180)
+CELL_WIDTH = 220
+CELL_HEIGHT = 250
+GAUGE_SIZE = 180
+GAUGE_PADDING = 15
+ARC_START = 135
+ARC_EXTENT = 270
+ARC_RADIUS = (GAUGE_SIZE - 2 * GAUGE_PADDING) / 2
+# Smallest extent change (degrees) that moves the arc's end by a pixel
+MIN_ARC_STEP = math.degrees(1 / ARC_RADIUS)
+
+
+def format_value(value):
+    if isinstance(value, float) and abs(value) < 10:
+        return f"{value:.1f}"
+    return str(int(value))
+
+
+class GaugeSlot:
+    """
+    One gauge drawn on a GaugePage. Offers AnalogGauge's update_value / set_range /
+    redraw_colors, but only touches the canvas when the arc would move by a pixel or
+    the displayed digits or color change.
+    """
+
+    def __init__(self, page, index):
+        self.page = page
+        self.tag = f"gauge{index}"
+        self.min_val = 0
+        self.max_val = 100
+        self.unit = ""
+        self.current_value = 0
+        self.visible = False
+        self._binding = None
+        self._extent = None
+        self._text = None
+        self._color = None
+
+        c = page.canvas
+        tags = (self.tag,)
+        self.card = c.create_rectangle(0, 0, 0, 0, width=0, tags=tags)
+        self.gauge_bg = c.create_rectangle(0, 0, 0, 0, width=0, tags=tags)
+        self.title = c.create_text(0, 0, text="", font=("Arial", 14, "bold"), tags=tags)
+        self.bg_arc = c.create_arc(0, 0, 0, 0, style="arc", width=12, start=ARC_START, extent=ARC_EXTENT, tags=tags)
+        self.active_arc = c.create_arc(0, 0, 0, 0, style="arc", width=12, start=ARC_START, extent=0, tags=tags)
+        self.text_val = c.create_text(0, 0, text="--", font=("Arial", 24, "bold"), tags=tags)
+        self.text_unit = c.create_text(0, 0, text="", font=("Arial", 10), tags=tags)
+        c.itemconfigure(self.tag, state="hidden")
+
+        self.tooltip = ToolTip(c, text="", delay=1000, tag=self.tag)
+        self.redraw_colors()
+
+    def place(self, x, y, width):
+        """Moves the static parts; only runs on layout changes."""
+        c = self.page.canvas
+        cx = x + width / 2
+        left = cx - GAUGE_SIZE / 2
+        top = y + 50
+        p = GAUGE_PADDING
+        c.coords(self.card, x + 10, y + 10, x + width - 10, y + CELL_HEIGHT - 10)
+        c.coords(self.gauge_bg, left, top, left + GAUGE_SIZE, top + GAUGE_SIZE)
+        c.coords(self.title, cx, y + 32)
+        c.coords(self.bg_arc, left + p, top + p, left + GAUGE_SIZE - p, top + GAUGE_SIZE - p)
+        c.coords(self.active_arc, left + p, top + p, left + GAUGE_SIZE - p, top + GAUGE_SIZE - p)
+        c.coords(self.text_val, cx, top + GAUGE_SIZE / 2)
+        c.coords(self.text_unit, cx, top + GAUGE_SIZE / 2 + 25)
+
+    def show(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.page.canvas.itemconfigure(self.tag, state="normal" if visible else "hidden")
+        if not visible:
+            # A hidden gauge misses updates; the next bind() starts from the latest value
+            self._binding = None
+
+    def winfo_ismapped(self):
+        return self.visible and self.page.canvas.winfo_ismapped()
+
+    def bind(self, cmd, title, description, limit, unit, value=None):
+        binding = (cmd, title, limit, unit)
+        if binding == self._binding:
+            return
+        same_sensor = self._binding is not None and self._binding[0] == cmd
+        self._binding = binding
+        self.page.canvas.itemconfigure(self.title, text=title)
+        self.tooltip.text = description
+        self.set_range(0, limit, unit)
+        if same_sensor:
+            self.update_value(self.current_value)
+        else:
+            self.update_value(value if isinstance(value, (int, float)) else 0)
+
+    def set_range(self, min_val, max_val, unit):
+        self.min_val = min_val
+        self.max_val = max_val
+        self._extent = None
+        if unit != self.unit:
+            self.unit = unit
+            self.page.canvas.itemconfigure(self.text_unit, text=unit)
+
+    def redraw_colors(self):
+        c = self.page.canvas
+        c.itemconfigure(self.card, fill=ThemeManager.get("CARD_BG"))
+        c.itemconfigure(self.gauge_bg, fill=ThemeManager.get("GAUGE_BG"))
+        c.itemconfigure(self.title, fill=ThemeManager.get("TEXT_MAIN"))
+        c.itemconfigure(self.bg_arc, outline=ThemeManager.get("ACCENT_DIM"))
+        c.itemconfigure(self.text_unit, fill=ThemeManager.get("TEXT_DIM"))
+        self._extent = self._text = self._color = None
+        self.update_value(self.current_value)
+
+    def update_value(self, value):
+        try:
+            self.current_value = value
+
+            if self.max_val <= self.min_val: self.max_val = self.min_val + 1
+
+            if value < self.min_val: value = self.min_val
+            if value > self.max_val: value = self.max_val
+
+            pct = (value - self.min_val) / (self.max_val - self.min_val)
+            extent = -1 * (pct * ARC_EXTENT)
+            color = ThemeManager.get("WARNING") if pct > 0.90 else ThemeManager.get("ACCENT")
+            text = format_value(value)
+
+            c = self.page.canvas
+            if color != self._color:
+                self._color = color
+                c.itemconfigure(self.active_arc, outline=color)
+                c.itemconfigure(self.text_val, fill=color)
+            if self._extent is None or abs(extent - self._extent) >= MIN_ARC_STEP:
+                self._extent = extent
+                c.itemconfigure(self.active_arc, extent=extent)
+            if text != self._text:
+                self._text = text
+                c.itemconfigure(self.text_val, text=text)
+        except Exception:
+            pass
+
+
+class GaugePage:
+    """
+    A whole dashboard page of gauges on one tk.Canvas instead of a frame and canvas per
+    gauge. Cards, titles, scales and units are drawn once per layout; a value update only
+    reconfigures the active arc and the value text of its GaugeSlot.
+    """
+
+    def __init__(self, parent, cols=3):
+        self.cols = cols
+        self.canvas = tk.Canvas(parent, height=CELL_HEIGHT, bg=ThemeManager.get("BACKGROUND"),
+                                highlightthickness=0)
+        self.canvas.pack(fill="x", expand=True)
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.slots = []
+        self.count = 0
+        self._width = None
+
+    def layout(self, count):
+        """Shows the first `count` slots (creating them as needed) and hides the rest."""
+        while len(self.slots) < count:
+            self.slots.append(GaugeSlot(self, len(self.slots)))
+            self._place(len(self.slots) - 1)
+        if count != self.count:
+            self.count = count
+            rows = max(1, math.ceil(count / self.cols))
+            self.canvas.configure(height=rows * CELL_HEIGHT)
+        for i, slot in enumerate(self.slots):
+            slot.show(i < count)
+        return self.slots[:count]
+
+    def _cell_width(self):
+        return max((self._width or 0) / self.cols, CELL_WIDTH)
+
+    def _place(self, i):
+        width = self._cell_width()
+        self.slots[i].place((i % self.cols) * width, (i // self.cols) * CELL_HEIGHT, width)
+
+    def _on_resize(self, event):
+        if event.width != self._width:
+            self._width = event.width
+            for i in range(len(self.slots)):
+                self._place(i)
+
+    def redraw_colors(self):
+        self.canvas.configure(bg=ThemeManager.get("BACKGROUND"))
+        for slot in self.slots:
+            slot.redraw_colors()
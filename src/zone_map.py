@@ -0,0 +1,259 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from log_segments import resolve_log, MANIFEST_SUFFIX, SEGMENT_CODECS
+
+ZONE_SUFFIX = ".zones.json"
+DEFAULT_BLOCK_ROWS = 1000
+# Plain, binary (binary_log.BINARY_SUFFIX) and compressed segment extensions
+_LOG_EXTENSIONS = (".csv", ".obdb") + tuple(SEGMENT_CODECS.values())
+# Comparison operators accepted in conditions; SQL text in trip_store is only built from these
+OPERATORS = {">": ">", ">=": ">=", "<": "<", "<=": "<=", "=": "=", "==": "=", "!=": "!="}
+
+
+def parse_condition(text):
+    """"COOLANT_TEMP>110" -> ("COOLANT_TEMP", ">", 110.0)."""
+    for op in (">=", "<=", "==", "!=", ">", "<", "="):
+        if op in text:
+            key, value = text.split(op, 1)
+            return key.strip(), op, float(value)
+    raise ValueError(f"Not a condition: {text}")
+
+
+def compare(value, op, limit):
+    if op == ">": return value > limit
+    if op == ">=": return value >= limit
+    if op == "<": return value < limit
+    if op == "<=": return value <= limit
+    if op == "!=": return value != limit
+    return value == limit
+
+
+def zone_path(log_path):
+    """trip_log_<ts>.zones.json for a trip's log, segment, manifest or CSV copy of a binary log."""
+    path = resolve_log(log_path)
+    if path.endswith(MANIFEST_SUFFIX):
+        path = path[:-len(MANIFEST_SUFFIX)]
+    stem, ext = os.path.splitext(path)
+    while ext in _LOG_EXTENSIONS:
+        path = stem
+        stem, ext = os.path.splitext(path)
+    return path + ZONE_SUFFIX
+
+
+def block_may_match(lo, hi, op, value):
+    """Whether a block whose values span [lo, hi] can hold a value satisfying `op value`."""
+    if op == ">": return hi > value
+    if op == ">=": return hi >= value
+    if op == "<": return lo < value
+    if op == "<=": return lo <= value
+    if op == "!=": return not lo == hi == value
+    return lo <= value <= hi
+
+
+def _save(path, data):
+    # Readers never see a half-written sidecar
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class ZoneMapBuilder:
+    """
+    Collects per-block min/max/count of each sensor while DataLogger writes a trip. Blocks
+    cover `block_rows` log rows; empty and non-numeric cells are not counted.
+    """
+
+    def __init__(self, path, sensor_keys, block_rows=DEFAULT_BLOCK_ROWS):
+        self.path = path
+        self.keys = list(sensor_keys)
+        self.block_rows = block_rows
+        self.blocks = []
+        self.rows = 0
+        self._reset()
+
+    def _reset(self):
+        n = len(self.keys)
+        self._lo = [None] * n
+        self._hi = [None] * n
+        self._count = [0] * n
+        self._block_rows = 0
+        self._start = None
+        self._end = None
+
+    def add_rows(self, rows):
+        """rows: DataLogger's (epoch, mono_ns, values, sample_times). True when a block was completed."""
+        completed = False
+        lo, hi, count = self._lo, self._hi, self._count
+        for epoch, _, values, _ in rows:
+            if self._start is None:
+                self._start = epoch
+            self._end = epoch
+            for i, value in enumerate(values):
+                if value == "" or value is None:
+                    continue
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    continue
+                if count[i] == 0:
+                    lo[i] = hi[i] = value
+                elif value < lo[i]:
+                    lo[i] = value
+                elif value > hi[i]:
+                    hi[i] = value
+                count[i] += 1
+            self._block_rows += 1
+            self.rows += 1
+            if self._block_rows >= self.block_rows:
+                self._close_block()
+                lo, hi, count = self._lo, self._hi, self._count
+                completed = True
+        return completed
+
+    def _close_block(self):
+        if self._block_rows:
+            self.blocks.append({"row": self.rows - self._block_rows, "rows": self._block_rows,
+                                "start": self._start, "end": self._end,
+                                "min": self._lo, "max": self._hi, "count": self._count})
+        self._reset()
+
+    def save(self, complete=False):
+        """Writes the completed blocks; `complete` also closes the partial last block (end of trip)."""
+        if complete:
+            self._close_block()
+        _save(self.path, {"version": 1, "block_rows": self.block_rows, "keys": self.keys, "rows": self.rows,
+                          "complete": complete, "blocks": self.blocks})
+
+
+class ZoneMap:
+    """
+    Loaded <trip>.zones.json. Answers "which parts of this trip can have KEY op VALUE"
+    from the block min/max alone, so readers only parse the blocks that can match. A trip
+    that was not closed cleanly has rows after the last block; those are reported as a
+    candidate range ending at None.
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.keys = data["keys"]
+        self.block_rows = data["block_rows"]
+        self.rows = data["rows"]
+        self.complete = data.get("complete", False)
+        self.blocks = data["blocks"]
+        self._col = {key: i for i, key in enumerate(self.keys)}
+
+    @classmethod
+    def load(cls, log_path):
+        """The zone map of a trip log, or None when there is none (or it is unreadable)."""
+        path = log_path if log_path.endswith(ZONE_SUFFIX) else zone_path(log_path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def from_columns(cls, epochs, columns, block_rows=DEFAULT_BLOCK_ROWS, path=None):
+        """Zone map of already loaded columns ({key: float array, NaN = empty}); saved when `path` is given."""
+        keys = list(columns)
+        blocks = []
+        for row in range(0, len(epochs), block_rows):
+            end = min(row + block_rows, len(epochs))
+            block = {"row": row, "rows": end - row, "start": float(epochs[row]), "end": float(epochs[end - 1]),
+                     "min": [], "max": [], "count": []}
+            for key in keys:
+                values = columns[key][row:end]
+                values = values[~np.isnan(values)]
+                block["count"].append(int(len(values)))
+                block["min"].append(float(values.min()) if len(values) else None)
+                block["max"].append(float(values.max()) if len(values) else None)
+            blocks.append(block)
+        data = {"version": 1, "block_rows": block_rows, "keys": keys, "rows": int(len(epochs)),
+                "complete": True, "blocks": blocks}
+        if path:
+            _save(path, data)
+        return cls(path, data)
+
+    def candidate_blocks(self, key, op, value):
+        """Indexes of the blocks that may hold a `key op value` sample."""
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {op}")
+        col = self._col.get(key)
+        if col is None:
+            return []
+        return [i for i, b in enumerate(self.blocks)
+                if b["count"][col] and block_may_match(b["min"][col], b["max"][col], op, value)]
+
+    def may_match(self, conditions):
+        """False when some condition [(key, op, value)] can be ruled out for the whole trip."""
+        if not self.complete:
+            return True
+        return all(self.candidate_blocks(key, op, value) for key, op, value in conditions)
+
+    def time_ranges(self, key, op, value):
+        """Merged [(start_epoch, end_epoch)] of the candidate blocks; end None = unindexed tail."""
+        ranges = []
+        for i in self.candidate_blocks(key, op, value):
+            b = self.blocks[i]
+            if ranges and ranges[-1][2] == i - 1:
+                ranges[-1] = (ranges[-1][0], b["end"], i)
+            else:
+                ranges.append((b["start"], b["end"], i))
+        ranges = [(start, end) for start, end, _ in ranges]
+        if not self.complete:
+            ranges.append((self.blocks[-1]["end"] if self.blocks else None, None))
+        return ranges
+
+    def value_range(self, key, start=None, end=None):
+        """(min, max) of `key` over the blocks overlapping [start, end] epochs, or None."""
+        col = self._col.get(key)
+        if col is None:
+            return None
+        lo = hi = None
+        for b in self.blocks:
+            if not b["count"][col] or (start is not None and b["end"] < start) or (end is not None and b["start"] > end):
+                continue
+            lo = b["min"][col] if lo is None else min(lo, b["min"][col])
+            hi = b["max"][col] if hi is None else max(hi, b["max"][col])
+        return None if lo is None else (lo, hi)
+
+
+def _clock(epoch):
+    return "end of log" if epoch is None else time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(epoch))
+
+
+def main(argv=None):
+    """
+    python zone_map.py <log dir> COOLANT_TEMP>110 [SPEED>80 ...]
+    Lists the trips and time ranges that may match every condition, from the sidecars only.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(main.__doc__)
+        return 2
+    try:
+        conditions = [parse_condition(a) for a in argv[1:]]
+    except ValueError as e:
+        print(f"Zone Map Error: {e}")
+        return 1
+
+    for name in sorted(os.listdir(argv[0])):
+        if not name.endswith(ZONE_SUFFIX):
+            continue
+        zones = ZoneMap.load(os.path.join(argv[0], name))
+        if zones is None or not zones.may_match(conditions):
+            continue
+        key, op, value = conditions[0]
+        for start, end in zones.time_ranges(key, op, value):
+            print(f"{name[:-len(ZONE_SUFFIX)]}  {_clock(start)} - {_clock(end)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# src/ modules import each other by flat name (e.g. "from constants import ..."), as they do when run via src/main.py
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+
+for path in (ROOT_DIR, SRC_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import MagicMock
+import obd
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+from src.obd_handler import OBDHandler
+
+
+def make_response(*payloads):
+    response = MagicMock()
+    response.is_null.return_value = not payloads
+    messages = []
+    for data in payloads:
+        msg = Message([])
+        msg.data = bytearray(data)
+        msg.ecu = ECU.ENGINE
+        messages.append(msg)
+    response.messages = messages
+    return response
+
+
+class TestBatchedQuery(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=False)
+        self.handler.inter_command_delay = 0
+        self.handler.status = "Connected"
+        self.handler.batch_supported = True
+        self.handler.supported_commands = {
+            obd.commands.RPM, obd.commands.SPEED, obd.commands.THROTTLE_POS,
+            obd.commands.ENGINE_LOAD, obd.commands.CONTROL_MODULE_VOLTAGE
+        }
+        self.conn = MagicMock()
+        self.handler.connection = self.conn
+        self.sent = []
+
+    def _answer(self, table):
+        def query(cmd, force=False):
+            self.sent.append(cmd.command)
+            return table.get(cmd.command, make_response())
+        self.conn.query.side_effect = query
+
+    def test_five_pids_in_one_request(self):
+        self._answer({
+            b"010C0D110442": make_response(
+                [0x41, 0x0C, 0x1A, 0xF8, 0x0D, 0x32, 0x11, 0x80, 0x04, 0x40, 0x42, 0x36, 0xB0]
+            )
+        })
+
+        values = self.handler.query_sensors(
+            ["RPM", "SPEED", "THROTTLE_POS", "ENGINE_LOAD", "CONTROL_MODULE_VOLTAGE"])
+
+        self.assertEqual(self.sent, [b"010C0D110442"])
+        self.assertEqual(values["RPM"], 1726.0)
+        self.assertEqual(values["SPEED"], 50.0)
+        self.assertEqual(values["THROTTLE_POS"], 50.2)
+        self.assertEqual(values["ENGINE_LOAD"], 25.1)
+        self.assertEqual(values["CONTROL_MODULE_VOLTAGE"], 14.0)
+        self.assertTrue(self.handler.batch_supported)
+
+    def test_requests_are_split_at_six_pids(self):
+        self.handler.supported_commands.update({obd.commands.MAF, obd.commands.INTAKE_TEMP})
+        self._answer({})
+
+        self.handler.query_sensors(["RPM", "SPEED", "THROTTLE_POS", "ENGINE_LOAD",
+                                    "CONTROL_MODULE_VOLTAGE", "MAF", "INTAKE_TEMP"])
+
+        self.assertEqual(self.sent[0], b"010C0D11044210")
+
+    def test_missing_pid_is_retried_alone(self):
+        self._answer({
+            b"010C0D": make_response([0x41, 0x0C, 0x1A, 0xF8]),
+            b"010D": make_response([0x41, 0x0D, 0x2A]),
+        })
+
+        values = self.handler.query_sensors(["RPM", "SPEED"])
+
+        self.assertEqual(values, {"RPM": 1726.0, "SPEED": 42.0})
+        self.assertTrue(self.handler.batch_supported)
+
+    def test_fallback_when_ecu_rejects_batching(self):
+        self._answer({
+            b"010C0D": make_response([0x7F, 0x01, 0x12]),
+            b"010C": make_response([0x41, 0x0C, 0x0C, 0x80]),
+        })
+
+        values = self.handler.query_sensors(["RPM", "SPEED"])
+        self.assertFalse(self.handler.batch_supported)
+        self.assertEqual(values, {"RPM": 800.0})
+
+        self.sent.clear()
+        self.handler.query_sensors(["RPM", "SPEED"])
+        self.assertEqual(self.sent, [b"010C", b"010D"])
+
+
+    def test_one_unanswered_batch_keeps_batching(self):
+        self._answer({
+            b"010C": make_response([0x41, 0x0C, 0x0C, 0x80]),
+            b"010D": make_response([0x41, 0x0D, 0x2A]),
+        })
+
+        # A bus glitch: no answer to the combined request, each PID is asked alone instead
+        values = self.handler.query_sensors(["RPM", "SPEED"])
+        self.assertEqual(values, {"RPM": 800.0, "SPEED": 42.0})
+        self.assertTrue(self.handler.batch_supported)
+
+        self._answer({b"010C0D": make_response([0x41, 0x0C, 0x1A, 0xF8, 0x0D, 0x32])})
+        self.sent.clear()
+        self.assertEqual(self.handler.query_sensors(["RPM", "SPEED"]), {"RPM": 1726.0, "SPEED": 50.0})
+        self.assertEqual(self.sent, [b"010C0D"])
+        self.assertEqual(self.handler.batch_failures, 0)
+
+    def test_repeated_unanswered_batches_fall_back(self):
+        self._answer({})
+        for _ in range(3):
+            self.assertTrue(self.handler.batch_supported)
+            self.handler.query_sensors(["RPM", "SPEED"])
+        self.assertFalse(self.handler.batch_supported)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import csv
+import math
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import binary_log
+from src.binary_log import (BinaryLogWriter, BinaryLogReader, BinaryReplayEngine, binary_to_csv, csv_to_binary,
+                            is_binary_log, as_csv, forward_fill)
+from src.data_logger import DataLogger
+from src.obd_handler import OBDHandler
+
+KEYS = ["RPM", "SPEED"]
+
+
+def make_rows(n, start=1.7e9):
+    return [(start + i * 0.05, 1_000_000 + i * 50_000_000,
+             [800 + i, "" if i % 3 else i], None) for i in range(n)]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestBinaryLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "trip.obdb")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def write(self, rows, **kwargs):
+        writer = BinaryLogWriter(self.path, KEYS, {"RPM": ("Engine RPM", "")}, **kwargs)
+        writer.write_rows(rows)
+        writer.close()
+
+    def test_round_trip_in_chunks(self):
+        self.write(make_rows(25), chunk_rows=10)
+        with BinaryLogReader(self.path) as log:
+            self.assertEqual(len(log.chunks), 3)
+            self.assertEqual(log.row_count, 25)
+            self.assertEqual(log.sensor_keys, KEYS)
+            self.assertEqual(log.sensor_info["RPM"], ("Engine RPM", ""))
+
+            rpm = log.column("RPM")
+            self.assertEqual(rpm.dtype.name, "float32")
+            self.assertEqual(rpm.tolist(), [800.0 + i for i in range(25)])
+            speed = log.column("SPEED")
+            self.assertEqual(speed[3], 3.0)
+            self.assertTrue(math.isnan(speed[4]))
+            self.assertEqual(log.column("Mono_ns")[2], 101_000_000)
+            self.assertAlmostEqual(log.column("Epoch")[24], 1.7e9 + 24 * 0.05, places=5)
+
+    def test_uncompressed_chunks_are_views(self):
+        self.write(make_rows(5))
+        with BinaryLogReader(self.path) as log:
+            chunk = log.chunk(0)
+            self.assertFalse(chunk["RPM"].flags.owndata)
+            self.assertFalse(chunk["RPM"].flags.writeable)
+            del chunk
+
+    def test_compressed(self):
+        self.write(make_rows(2000), chunk_rows=500, compression="zlib")
+        with BinaryLogReader(self.path) as log:
+            self.assertEqual(log.row_count, 2000)
+            self.assertEqual(log.column("RPM")[-1], 2799.0)
+        raw_path = self.path
+        self.path = os.path.join(self.dir, "raw.obdb")
+        self.write(make_rows(2000), chunk_rows=500)
+        self.assertLess(os.path.getsize(raw_path), os.path.getsize(self.path))
+
+    def test_zstd_without_package_falls_back_to_zlib(self):
+        with mock.patch("src.binary_log.zstandard", None):
+            self.write(make_rows(10), compression="zstd")
+        with BinaryLogReader(self.path) as log:
+            self.assertEqual(log.header["compression"], "zlib")
+            self.assertEqual(log.column("RPM")[-1], 809.0)
+
+    def test_truncated_chunk_ignored(self):
+        self.write(make_rows(30), chunk_rows=10)
+        with open(self.path, "r+b") as f:
+            f.truncate(os.path.getsize(self.path) - 8)
+        with BinaryLogReader(self.path) as log:
+            self.assertEqual(log.row_count, 20)
+
+    def test_rejects_other_files(self):
+        other = os.path.join(self.dir, "log.csv")
+        with open(other, "w") as f:
+            f.write("Timestamp,RPM\n")
+        self.assertFalse(is_binary_log(other))
+        with self.assertRaises(ValueError):
+            BinaryLogReader(other)
+
+    def test_csv_round_trip(self):
+        src = os.path.join(self.dir, "trip.csv")
+        with open(src, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Epoch", "Mono_ns", "RPM", "SPEED", "RPM_ns", "SPEED_ns"])
+            for i in range(10):
+                epoch = 1.7e9 + i
+                writer.writerow([time.strftime("%H:%M:%S", time.localtime(epoch)), f"{epoch:.6f}",
+                                 i * 1000, 800 + i, "" if i % 2 else 14.02, i * 1000 - 5, ""])
+
+        binary = csv_to_binary(src, self.path)
+        self.assertTrue(is_binary_log(binary))
+        with BinaryLogReader(binary) as log:
+            self.assertTrue(log.sample_times)
+            self.assertEqual(log.column("RPM_ns")[3], 2995)
+
+        with open(src, newline="") as f:
+            original = list(csv.reader(f))
+        with open(binary_to_csv(binary, os.path.join(self.dir, "back.csv")), newline="") as f:
+            converted = list(csv.reader(f))
+        self.assertEqual(converted, original)
+
+    def test_legacy_csv(self):
+        src = os.path.join(self.dir, "trip_log_1700000000.csv")
+        with open(src, "w") as f:
+            f.write("Timestamp,RPM\n23:59:59,800\n00:00:00,900\n")
+        with BinaryLogReader(csv_to_binary(src)) as log:
+            epochs = log.column("Epoch")
+            self.assertEqual(epochs[1] - epochs[0], 1.0)
+            self.assertEqual(time.strftime("%H:%M:%S", time.localtime(epochs[0])), "23:59:59")
+            self.assertFalse(log.sample_times)
+
+    def test_forward_fill_across_chunks(self):
+        nan = np.nan
+        self.assertEqual(forward_fill(np.array([nan, 1.0, nan, nan, 2.0, nan]))[1:].tolist(),
+                         [1.0, 1.0, 1.0, 2.0, 2.0])
+
+        # SPEED is only written on every third row
+        self.write(make_rows(7), chunk_rows=2)
+        with BinaryLogReader(self.path) as log:
+            self.assertEqual(log.columns_for(["SPEED"], fill=True)["SPEED"].tolist(),
+                             [0.0, 0.0, 0.0, 3.0, 3.0, 3.0, 6.0])
+        with open(binary_to_csv(self.path, fill=True), newline="") as f:
+            self.assertEqual([r[4] for r in list(csv.reader(f))[1:]], ["0", "0", "0", "3", "3", "3", "6"])
+
+    def test_as_csv_reuses_conversion(self):
+        self.write(make_rows(5))
+        first = as_csv(self.path)
+        mtime = os.path.getmtime(first)
+        time.sleep(0.01)
+        self.assertEqual(as_csv(self.path), first)
+        self.assertEqual(os.path.getmtime(first), mtime)
+
+
+class TestBinaryReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "trip.obdb")
+        writer = BinaryLogWriter(self.path, KEYS, chunk_rows=500, compression="zlib")
+        writer.write_rows(make_rows(3000))
+        writer.close()
+        self.engine = None
+
+    def tearDown(self):
+        if self.engine:
+            self.engine.stop()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def start(self, speed):
+        self.engine = BinaryReplayEngine(self.path, speed)
+        self.assertTrue(self.engine.open())
+        self.engine.start()
+        return self.engine
+
+    def test_plays_chunks_without_converting(self):
+        engine = self.start(None)
+        self.assertEqual(engine.headers, KEYS)
+        self.assertTrue(wait_for(lambda: engine.finished))
+        self.assertEqual(engine.get("RPM"), 3799.0)
+        # Empty SPEED cells keep the previous value
+        self.assertEqual(engine.get("SPEED"), 2997.0)
+        self.assertAlmostEqual(engine.position, 2999 * 0.05, places=3)
+        self.assertEqual(os.listdir(self.dir), ["trip.obdb"])
+
+    def test_seek_and_find_next(self):
+        engine = self.start(1.0)
+        self.assertTrue(wait_for(lambda: engine.index is not None))
+        self.assertAlmostEqual(engine.duration, 2999 * 0.05, places=3)
+        self.assertAlmostEqual(engine.find_next("RPM", ">", 3500, after=0), 2701 * 0.05, places=3)
+        self.assertIsNone(engine.find_next("RPM", ">", 5000, after=0))
+
+        self.assertTrue(engine.seek(100))
+        self.assertTrue(wait_for(lambda: engine.get("RPM") == 2800.0))
+        self.assertEqual(engine.get("SPEED"), 1998.0)
+
+    def test_handler_replays_binary_log(self):
+        handler = OBDHandler()
+        try:
+            self.assertTrue(handler.start_replay(self.path, speed=None))
+            self.assertIsInstance(handler.replay, binary_log.BinaryReplayEngine)
+            self.assertTrue(wait_for(lambda: handler.query_sensor("RPM") == 3799.0))
+        finally:
+            handler.stop_replay()
+
+
+class TestBinaryDataLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.logger = DataLogger()
+        self.logger.set_directory(self.dir)
+        self.logger.set_format("binary", "zlib")
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_logger_writes_binary(self):
+        self.logger.record_sample_times = True
+        self.logger.start_new_log(KEYS, {"SPEED": ("Vehicle Speed", "km/h", True, True, 160)})
+        for i in range(100):
+            self.logger.write_row({"RPM": 800 + i, "SPEED": i}, {"RPM": i, "SPEED": i})
+        self.logger.close()
+
+        path = self.logger.current_filepath
+        self.assertTrue(path.endswith(".obdb"))
+        with BinaryLogReader(path) as log:
+            self.assertEqual(log.row_count, 100)
+            self.assertEqual(log.sensor_info["SPEED"], ("Vehicle Speed", "km/h"))
+            self.assertEqual(log.column("SPEED")[99], 99.0)
+            self.assertEqual(log.column("RPM_ns")[50], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
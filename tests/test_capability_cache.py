@@ -0,0 +1,199 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import obd
+
+from src.capability_cache import CapabilityCache
+from src.obd_handler import OBDHandler, _CachedOBD
+
+
+def make_connection(vin=b"WBA00000000000001", protocol="6"):
+    conn = MagicMock()
+    conn.is_connected.return_value = True
+    conn.port_name = "COM3"
+    conn.protocol_name.return_value = "ISO 15765-4"
+    conn.protocol_id.return_value = protocol
+
+    rpm, speed = MagicMock(), MagicMock()
+    rpm.name, speed.name = "RPM", "SPEED"
+    conn.supported_commands = {rpm, speed}
+
+    response = MagicMock()
+    response.is_null.return_value = False
+    response.value = vin
+    conn.query.return_value = response
+    return conn
+
+
+class TestCapabilityCache(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(self.path)
+        self.cache = CapabilityCache(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_store_and_reload(self):
+        self.cache.store("VIN1", "COM3", "6", ["SPEED", "RPM"], {"BMW_OIL_TEMP": True})
+        reloaded = CapabilityCache(self.path)
+
+        vehicle_id, entry = reloaded.lookup_port("COM3")
+        self.assertEqual(vehicle_id, "VIN1")
+        self.assertEqual(entry["protocol"], "6")
+        self.assertEqual(entry["commands"], ["RPM", "SPEED"])
+        self.assertEqual(entry["pro_probes"], {"BMW_OIL_TEMP": True})
+        self.assertEqual(reloaded.lookup_port("COM4"), (None, None))
+
+    @patch('src.obd_handler.obd')
+    def test_first_connect_saves_profile(self, mock_obd_lib):
+        mock_obd_lib.OBD.return_value = make_connection()
+        handler = OBDHandler(capability_cache=self.cache)
+
+        self.assertTrue(handler.connect("COM3"))
+        self.assertEqual(handler.vehicle_id, "WBA00000000000001")
+        vehicle_id, entry = self.cache.lookup_port("COM3")
+        self.assertEqual(vehicle_id, "WBA00000000000001")
+        self.assertEqual(entry["commands"], ["RPM", "SPEED"])
+        self.assertEqual(entry["protocol"], "6")
+
+    @patch('src.obd_handler._CachedOBD')
+    @patch('src.obd_handler.obd')
+    def test_cached_connect_skips_detection(self, mock_obd_lib, mock_cached_obd):
+        self.cache.store("VIN1", "COM3", "6", ["RPM"], {"BMW_OIL_TEMP": False})
+        mock_cached_obd.return_value = make_connection(vin=b"VIN1")
+
+        handler = OBDHandler(capability_cache=self.cache)
+        handler.background_verify = False
+        handler.set_pro_definitions({"BMW_OIL_TEMP": ("Oil", "C", "2C", "A-40", "7E0")})
+
+        self.assertTrue(handler.connect("COM3"))
+        mock_obd_lib.OBD.assert_not_called()
+        self.assertEqual(mock_cached_obd.call_args.kwargs["protocol"], "6")
+        self.assertEqual(handler.vehicle_id, "VIN1")
+        # The pro PID that never answered on this car is skipped
+        self.assertFalse(handler.check_supported("BMW_OIL_TEMP"))
+
+    @patch('src.obd_handler._CachedOBD')
+    @patch('src.obd_handler.obd')
+    def test_cached_connect_failure_falls_back(self, mock_obd_lib, mock_cached_obd):
+        self.cache.store("VIN1", "COM3", "6", ["RPM"])
+        stale = make_connection()
+        stale.is_connected.return_value = False
+        mock_cached_obd.return_value = stale
+        mock_obd_lib.OBD.return_value = make_connection(vin=b"VIN2", protocol="7")
+
+        handler = OBDHandler(capability_cache=self.cache)
+        self.assertTrue(handler.connect("COM3"))
+        mock_obd_lib.OBD.assert_called_once()
+        vehicle_id, entry = self.cache.lookup_port("COM3")
+        self.assertEqual(vehicle_id, "VIN2")
+        self.assertEqual(entry["protocol"], "7")
+
+    def test_cached_obd_loads_commands_without_scanning(self):
+        conn = _CachedOBD.__new__(_CachedOBD)
+        conn._cached_commands = {obd.commands.RPM, obd.commands.SPEED}
+        conn.supported_commands = set(obd.commands.base_commands())
+        conn._OBD__load_commands()
+
+        self.assertIn(obd.commands.RPM, conn.supported_commands)
+        self.assertIn(obd.commands.SPEED, conn.supported_commands)
+        self.assertNotIn(obd.commands.COOLANT_TEMP, conn.supported_commands)
+
+
+OIL_DEF = ["Oil", "C", True, True, 150, "221234", "7E0", "A-40"]
+
+
+def reply(data, raw="7E8 03 62 12 34"):
+    response = MagicMock()
+    response.is_null.return_value = False
+    message = MagicMock()
+    message.data = bytearray(data)
+    message.raw.return_value = raw
+    response.messages = [message]
+    return response
+
+
+def no_reply():
+    response = MagicMock()
+    response.is_null.return_value = True
+    response.messages = []
+    return response
+
+
+class TestProProbes(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        os.remove(self.path)
+        self.cache = CapabilityCache(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def make_handler(self):
+        handler = OBDHandler(capability_cache=self.cache)
+        handler.inter_command_delay = 0
+        handler.connection = make_connection()
+        handler.status = "Connected"
+        handler.set_pro_definitions({"OIL": OIL_DEF})
+        return handler
+
+    def test_single_timeout_does_not_hide_pid(self):
+        handler = self.make_handler()
+        handler.connection.query.return_value = no_reply()
+        for _ in range(2):
+            self.assertIsNone(handler.query_sensor("OIL"))
+        self.assertTrue(handler.check_supported("OIL"))
+        self.assertNotIn("OIL", handler.pro_probes)
+        handler.query_sensor("OIL")
+        self.assertFalse(handler.check_supported("OIL"))
+
+    def test_negative_reply_hides_pid_at_once(self):
+        for response in (reply(b"\x7f\x22\x31"), reply(b"", raw="NO DATA")):
+            handler = self.make_handler()
+            handler.connection.query.return_value = response
+            self.assertIsNone(handler.query_sensor("OIL"))
+            self.assertFalse(handler.check_supported("OIL"))
+
+    def test_answered_pid_survives_engine_off(self):
+        handler = self.make_handler()
+        handler.connection.query.return_value = reply(b"\x82")
+        self.assertEqual(handler.query_sensor("OIL"), 90)
+        handler.connection.query.return_value = reply(b"", raw="NO DATA")
+        for _ in range(5):
+            handler.query_sensor("OIL")
+        self.assertTrue(handler.check_supported("OIL"))
+
+    @patch('src.obd_handler._CachedOBD')
+    @patch('src.obd_handler.obd')
+    def test_background_check_reprobes_cached_negative(self, mock_obd_lib, mock_cached_obd):
+        self.cache.store("VIN1", "COM3", "6", ["RPM"], {"OIL": False})
+        conn = make_connection(vin=b"VIN1")
+        mock_cached_obd.return_value = conn
+        del mock_obd_lib.commands.OIL
+
+        handler = OBDHandler(capability_cache=self.cache)
+        handler.background_verify = False
+        handler.inter_command_delay = 0
+        handler.set_pro_definitions({"OIL": OIL_DEF})
+        self.assertTrue(handler.connect("COM3"))
+        self.assertFalse(handler.check_supported("OIL"))
+
+        vin = conn.query.return_value
+        conn.query.side_effect = lambda cmd, force=False: reply(b"\x82") if cmd.command == b"221234" else vin
+        handler.verify_cached_capabilities("COM3")
+        self.assertTrue(handler.check_supported("OIL"))
+        handler.disconnect()
+        self.assertEqual(CapabilityCache(self.path).get("VIN1")["pro_probes"], {"OIL": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
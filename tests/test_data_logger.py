@@ -0,0 +1,124 @@
+import csv
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.data_logger import DataLogger
+
+
+class TestDataLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.logger = DataLogger(flush_rows=10, flush_interval_ms=5000)
+        self.logger.set_directory(self.dir)
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def read_rows(self):
+        with open(self.logger.current_filepath, newline='') as f:
+            return list(csv.reader(f))
+
+    def test_rows_are_buffered_until_policy_triggers(self):
+        self.logger.start_new_log(["RPM", "SPEED"])
+        for i in range(5):
+            self.logger.write_row({"RPM": 800 + i})
+        time.sleep(0.1)
+        self.assertEqual(len(self.read_rows()), 1)
+
+        for i in range(5):
+            self.logger.write_row({"RPM": 900 + i, "SPEED": 10})
+        deadline = time.monotonic() + 2
+        while len(self.read_rows()) < 11 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        rows = self.read_rows()
+        self.assertEqual(rows[0], ["Timestamp", "Epoch", "Mono_ns", "RPM", "SPEED"])
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(rows[1][3:], ["800", ""])
+        self.assertEqual(rows[10][3:], ["904", "10"])
+
+    def test_row_time_columns(self):
+        self.logger.start_new_log(["RPM"])
+        before = time.time()
+        self.logger.write_row({"RPM": 800})
+        self.logger.write_row({"RPM": 810})
+        self.logger.flush()
+
+        first, second = self.read_rows()[1:]
+        self.assertGreaterEqual(float(first[1]), before - 1e-6)
+        self.assertLess(abs(float(first[1]) - before), 1.0)
+        self.assertEqual(first[0], time.strftime("%H:%M:%S", time.localtime(float(first[1]))))
+        self.assertGreater(int(second[2]), int(first[2]))
+
+    def test_sample_time_columns(self):
+        self.logger.record_sample_times = True
+        self.logger.start_new_log(["RPM", "SPEED"])
+        self.logger.write_row({"RPM": 800}, {"RPM": 123456789, "SPEED": 5})
+        self.logger.flush()
+
+        rows = self.read_rows()
+        self.assertEqual(rows[0][3:], ["RPM", "SPEED", "RPM_ns", "SPEED_ns"])
+        # SPEED has no value in this row, so its stale sample time is not written either
+        self.assertEqual(rows[1][3:], ["800", "", "123456789", ""])
+
+    def test_sparse_deadband_and_keyframes(self):
+        self.logger.set_sparse(True, {"RPM": 50}, keyframe_seconds=0.2)
+        self.logger.start_new_log(["RPM", "FUEL_LEVEL"])
+        self.logger.write_row({"RPM": 800, "FUEL_LEVEL": 40.0})   # first row is a keyframe
+        self.logger.write_row({"RPM": 830, "FUEL_LEVEL": 40.0})   # nothing moved: no row
+        self.logger.write_row({"RPM": 870, "FUEL_LEVEL": 40.0})   # RPM moved 70 from the last written
+        self.logger.write_row({"RPM": 880, "FUEL_LEVEL": 39.6})   # any FUEL_LEVEL change is written
+        time.sleep(0.25)
+        self.logger.write_row({"RPM": 890})                       # keyframe: every current value
+        self.logger.flush()
+
+        rows = [r[3:] for r in self.read_rows()[1:]]
+        self.assertEqual(rows, [["800", "40.0"], ["870", ""], ["", "39.6"], ["890", "39.6"]])
+
+    def test_sparse_sample_times_follow_values(self):
+        self.logger.record_sample_times = True
+        self.logger.set_sparse(True, keyframe_seconds=60)
+        self.logger.start_new_log(["RPM", "SPEED"])
+        self.logger.write_row({"RPM": 800, "SPEED": 10}, {"RPM": 1, "SPEED": 2})
+        self.logger.write_row({"RPM": 800, "SPEED": 11}, {"RPM": 3, "SPEED": 4})
+        self.logger.flush()
+
+        rows = [r[3:] for r in self.read_rows()[1:]]
+        self.assertEqual(rows, [["800", "10", "1", "2"], ["", "11", "", "4"]])
+
+    def test_interval_flush(self):
+        self.logger.set_flush_policy(flush_rows=1000, flush_interval_ms=50)
+        self.logger.start_new_log(["RPM"])
+        self.logger.write_row({"RPM": 800})
+        time.sleep(0.3)
+        self.assertEqual(len(self.read_rows()), 2)
+
+    def test_close_flushes_everything(self):
+        self.logger.start_new_log(["RPM"])
+        for i in range(3):
+            self.logger.write_row({"RPM": i})
+        self.logger.close()
+
+        self.assertEqual(len(self.read_rows()), 4)
+        # Rows after close are dropped instead of reopening the file
+        self.logger.write_row({"RPM": 99})
+        self.assertEqual(len(self.read_rows()), 4)
+
+    def test_new_log_closes_previous(self):
+        self.logger.start_new_log(["RPM"])
+        self.logger.write_row({"RPM": 1})
+        first = self.logger.current_filepath
+        time.sleep(1.1)  # log names have 1 s resolution
+        self.logger.start_new_log(["SPEED"])
+
+        with open(first, newline='') as f:
+            self.assertEqual(len(list(csv.reader(f))), 2)
+        self.assertNotEqual(first, self.logger.current_filepath)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import obd
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+# Same module object obd_handler imports (src/ is on sys.path via conftest), so TransportError matches
+from elm_transport import ElmTransport, TransportError
+from src.obd_handler import OBDHandler
+
+
+class FakePort:
+    """Serial stand-in that answers every write with a canned ELM327 reply."""
+
+    def __init__(self, reply=b"", chunk_size=7):
+        self.reply = reply
+        self.chunk_size = chunk_size
+        self.written = []
+        self._pending = b""
+
+    @property
+    def in_waiting(self):
+        return len(self._pending)
+
+    def reset_input_buffer(self):
+        self._pending = b""
+
+    def write(self, data):
+        self.written.append(data)
+        self._pending = self.reply
+
+    def read(self, size=1):
+        size = min(size, self.chunk_size)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+
+class SilentPort(FakePort):
+    """Like pyserial with python-obd's settings: read() blocks for `timeout` seconds when nothing arrives."""
+
+    def __init__(self):
+        super().__init__(b"7E8 03 41 0D 32\r")
+        self.timeout = 10
+        self.timeouts = []
+
+    def read(self, size=1):
+        chunk = super().read(size)
+        if not chunk:
+            self.timeouts.append(self.timeout)
+            time.sleep(self.timeout)
+        return chunk
+
+
+class TestElmTransport(unittest.TestCase):
+
+    def test_single_frame(self):
+        port = FakePort(b"7E8 04 41 0C 1A F8 \r\r>")
+        transport = ElmTransport(port, ecu_map={0: ECU.ENGINE})
+
+        messages = transport.request(b"010C")
+        self.assertEqual(port.written, [b"010C\r"])
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0].data, bytearray([0x41, 0x0C, 0x1A, 0xF8]))
+        self.assertEqual(messages[0].ecu, ECU.ENGINE)
+
+    def test_multi_frame_per_ecu(self):
+        # Multi-PID answer split over ISO-TP first/consecutive frames, plus a second ECU
+        reply = (b"7E8 10 08 41 0C 1A F8 0D 32\r"
+                 b"7E9 03 41 0D 32\r"
+                 b"7E8 21 05 7B 00 00 00 00 00\r\r>")
+        transport = ElmTransport(FakePort(reply), ecu_map={0: ECU.ENGINE, 1: ECU.TRANSMISSION})
+
+        messages = {m.ecu: m for m in transport.request(b"010C0D05")}
+        self.assertEqual(bytes(messages[ECU.ENGINE].data), bytes.fromhex("410C1AF80D32057B"))
+        self.assertEqual(len(messages[ECU.ENGINE].frames), 2)
+        self.assertEqual(bytes(messages[ECU.TRANSMISSION].data), bytes.fromhex("410D32"))
+
+    def test_29_bit_headers(self):
+        transport = ElmTransport(FakePort(b"18DAF110 03 41 0D 32\r\r>"), id_bits=29, ecu_map={0x10: ECU.ENGINE})
+        messages = transport.request(b"010D")
+        self.assertEqual(bytes(messages[0].data), bytes.fromhex("410D32"))
+        self.assertEqual(messages[0].ecu, ECU.ENGINE)
+
+    def test_status_lines_give_no_messages(self):
+        transport = ElmTransport(FakePort(b"NO DATA\r\r>"))
+        self.assertEqual(transport.request(b"0142"), [])
+
+    def test_missing_prompt_raises(self):
+        transport = ElmTransport(FakePort(b"7E8 03 41 0D 32\r"), timeout=0.05)
+        with self.assertRaises(TransportError):
+            transport.request(b"010D")
+
+    def test_missing_prompt_does_not_block_on_port_timeout(self):
+        port = SilentPort()
+        transport = ElmTransport(port, timeout=0.1)
+        started = time.monotonic()
+        with self.assertRaises(TransportError):
+            transport.request(b"010D")
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(all(t <= 0.1 for t in port.timeouts))
+        # python-obd's own reads keep their timeout
+        self.assertEqual(port.timeout, 10)
+
+    def test_from_connection_requires_can(self):
+        connection = MagicMock()
+        connection.interface._ELM327__protocol.id_bits = None
+        self.assertIsNone(ElmTransport.from_connection(connection))
+
+        connection.interface._ELM327__protocol.id_bits = 11
+        connection.interface._ELM327__protocol.ecu_map = {0: ECU.ENGINE}
+        self.assertIsNotNone(ElmTransport.from_connection(connection))
+
+
+class TestHandlerTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=False)
+        self.handler.connection = MagicMock()
+        self.handler.status = "Connected"
+        self.handler.inter_command_delay = 0
+        self.handler.supported_commands = {obd.commands.RPM, obd.commands.SPEED}
+
+    def test_query_goes_through_transport(self):
+        self.handler.transport = ElmTransport(FakePort(b"7E8 04 41 0C 1A F8\r\r>"), ecu_map={0: ECU.ENGINE})
+
+        self.assertEqual(self.handler.query_sensor("RPM"), 1726.0)
+        self.handler.connection.query.assert_not_called()
+
+    def test_transport_failure_falls_back_to_python_obd(self):
+        self.handler.transport = ElmTransport(FakePort(b""), timeout=0.01)
+        message = Message([])
+        message.data = bytearray([0x41, 0x0D, 0x2A])
+        response = MagicMock()
+        response.is_null.return_value = False
+        response.messages = [message]
+        self.handler.connection.query.return_value = response
+
+        self.assertEqual(self.handler.query_sensor("SPEED"), 42.0)
+        self.assertIsNone(self.handler.transport)
+        self.handler.connection.query.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+from unittest.mock import MagicMock
+
+import obd
+from obd.protocols.protocol import Frame, Message
+
+from src.link_tuner import LinkTuner, FAILURE_LIMIT
+from src.obd_handler import OBDHandler
+
+
+def reply(*raw_lines):
+    message = MagicMock()
+    message.raw.return_value = "\n".join(raw_lines)
+    return [message]
+
+
+def rpm_response(frames=1):
+    response = MagicMock()
+    response.is_null.return_value = False
+    message = Message([Frame("7E8 04 41 0C 1A F8") for _ in range(frames)])
+    message.data = bytearray([0x41, 0x0C, 0x1A, 0xF8])
+    response.messages = [message]
+    return response
+
+
+def empty_response():
+    response = MagicMock()
+    response.is_null.return_value = True
+    response.messages = []
+    return response
+
+
+class TestLinkTuner(unittest.TestCase):
+
+    def test_learns_response_count_only_when_enabled(self):
+        tuner = LinkTuner()
+        tuner.record("010C", [Message([Frame("x")])], "", 0.05)
+        self.assertEqual(tuner.suffix_for("010C"), "")
+
+        tuner.enabled = True
+        tuner.record("010C", [Message([Frame("x"), Frame("y")])], "", 0.05)
+        self.assertEqual(tuner.suffix_for("010C"), "2")
+
+    def test_latency_report(self):
+        tuner = LinkTuner()
+        tuner.record("010C", [], "", 0.010)
+        tuner.record("010C", [], "", 0.030)
+
+        count, average, last, worst = tuner.latency_report()["010C"]
+        self.assertEqual(count, 2)
+        self.assertAlmostEqual(average, 20.0)
+        self.assertAlmostEqual(last, 30.0)
+        self.assertAlmostEqual(worst, 30.0)
+        self.assertAlmostEqual(tuner.average_latency(), 20.0)
+
+
+class TestFastLink(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=False)
+        self.handler.connection = MagicMock()
+        self.handler.status = "Connected"
+        self.handler.inter_command_delay = 0
+        self.handler.supported_commands = {obd.commands.RPM}
+        self.at_commands = []
+
+        def send_and_parse(command):
+            self.at_commands.append(command)
+            return reply("OK")
+        self.handler.connection.interface.send_and_parse.side_effect = send_and_parse
+
+    def sent_requests(self):
+        return [c.args[0].command for c in self.handler.connection.query.call_args_list]
+
+    def test_enable_configures_adapter(self):
+        self.handler.set_fast_link(True)
+
+        self.assertTrue(self.handler.fast_link)
+        self.assertTrue(self.handler.link_tuner.enabled)
+        self.assertEqual(self.at_commands[0], b"ATAT2")
+        self.assertTrue(self.at_commands[1].startswith(b"ATST"))
+
+    def test_response_count_hint_appended_once_learned(self):
+        self.handler.connection.query.return_value = rpm_response()
+        self.handler.set_fast_link(True)
+
+        self.assertEqual(self.handler.query_sensor("RPM"), 1726.0)
+        self.assertEqual(self.handler.query_sensor("RPM"), 1726.0)
+        self.assertEqual(self.sent_requests(), [b"010C", b"010C1"])
+        self.assertEqual(self.handler.link_latency()["010C"][0], 2)
+
+    def test_latency_restarts_on_reconnect(self):
+        self.handler.connection.query.return_value = rpm_response()
+        self.handler.query_sensor("RPM")
+        self.handler.query_sensor("RPM")
+        self.assertEqual(self.handler.link_latency()["010C"][0], 2)
+        # Turning fast link off mid-connection keeps the statistics
+        self.handler.set_fast_link(True)
+        self.handler.set_fast_link(False)
+        self.assertEqual(self.handler.link_latency()["010C"][0], 2)
+
+        connection = self.handler.connection
+        self.handler.disconnect()
+        self.assertEqual(self.handler.link_latency(), {})
+        self.assertIsNone(self.handler.link_tuner.average_latency())
+
+        self.handler.connection = connection
+        self.handler.status = "Connected"
+        self.handler.supported_commands = {obd.commands.RPM}
+        self.handler.query_sensor("RPM")
+        self.assertEqual(self.handler.link_latency()["010C"][0], 1)
+
+    def test_no_hint_without_fast_link(self):
+        self.handler.connection.query.return_value = rpm_response()
+        self.handler.query_sensor("RPM")
+        self.handler.query_sensor("RPM")
+        self.assertEqual(self.sent_requests(), [b"010C", b"010C"])
+
+    def test_rejected_at_command_falls_back(self):
+        self.handler.connection.interface.send_and_parse.side_effect = lambda c: reply("?")
+        self.handler.set_fast_link(True)
+
+        self.assertFalse(self.handler.fast_link)
+        self.assertFalse(self.handler.link_tuner.enabled)
+
+    def test_dropped_hinted_requests_fall_back(self):
+        self.handler.connection.query.return_value = rpm_response()
+        self.handler.set_fast_link(True)
+        self.handler.query_sensor("RPM")
+
+        # Plain requests keep working but every hinted one comes back empty
+        self.handler.connection.query.side_effect = \
+            lambda cmd, force=False: empty_response() if cmd.command == b"010C1" else rpm_response()
+        for _ in range(FAILURE_LIMIT * 2):
+            self.handler.query_sensor("RPM")
+
+        self.assertFalse(self.handler.fast_link)
+        self.assertIn(b"ATAT1", self.at_commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.fleet_report import find_logs, analyze_log, analyze_logs, write_report, main
+from src.data_logger import DataLogger
+
+KEYS = ["RPM", "COOLANT_TEMP", "CONTROL_MODULE_VOLTAGE"]
+
+
+class TestFleetReport(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def record(self, name, rows, log_format="csv", rotate_mb=None, sparse=False):
+        logger = DataLogger()
+        logger.set_directory(self.dir)
+        logger.set_format(log_format)
+        logger.set_sparse(sparse)
+        logger.set_rotation(rotate_mb, None, None)
+        logger.start_new_log(KEYS)
+        for row in rows:
+            logger.write_row(row)
+        logger.close()
+        if rotate_mb:
+            return logger.manifest_path
+        path = os.path.join(self.dir, name)
+        os.rename(logger.current_filepath, path)
+        return path
+
+    def test_stats_and_issues(self):
+        # Overheats for the last 10 of 30 rows; voltage is low while the engine runs
+        rows = [{"RPM": 900, "COOLANT_TEMP": 90 + (30 if i >= 20 else 0), "CONTROL_MODULE_VOLTAGE": 12.5}
+                for i in range(30)]
+        path = self.record("a.csv", rows)
+        report = analyze_log(path, {"COOLANT_TEMP": "110"})
+
+        self.assertEqual(report["rows"], 30)
+        self.assertEqual(report["sensors"]["COOLANT_TEMP"], {"min": 90.0, "max": 120.0, "mean": 100.0, "count": 30})
+        self.assertEqual(report["issues"]["CRITICAL: Engine Overheating!"]["rows"], 10)
+        self.assertEqual(report["issues"]["WARNING: Alternator output low"]["rows"], 30)
+
+    def test_sparse_log_stats_hold_values(self):
+        # Sparse logs only write changes: RPM is written on 2 of 40 rows
+        rows = [{"RPM": 800 if i < 30 else 900, "COOLANT_TEMP": 80 + i, "CONTROL_MODULE_VOLTAGE": 14.0}
+                for i in range(40)]
+        sparse = analyze_log(self.record("sparse.csv", rows, sparse=True))
+        dense = analyze_log(self.record("dense.csv", rows))
+
+        self.assertEqual(sparse["sensors"]["RPM"], {"min": 800.0, "max": 900.0, "mean": 825.0, "count": 40})
+        self.assertEqual(sparse["sensors"], dense["sensors"])
+        # Same findings; only the wall-clock times of the two recordings differ
+        self.assertEqual({k: v["rows"] for k, v in sparse["issues"].items()},
+                         {k: v["rows"] for k, v in dense["issues"].items()})
+
+    def test_binary_and_error(self):
+        path = self.record("b.obdb", [{"RPM": 4000 + i, "COOLANT_TEMP": 50} for i in range(5)], "binary")
+        report = analyze_log(path)
+        self.assertEqual(report["sensors"]["RPM"]["max"], 4004.0)
+        self.assertNotIn("CONTROL_MODULE_VOLTAGE", report["sensors"])
+        self.assertIn("ADVICE: High RPM detected on cold engine. High risk of wear.", report["issues"])
+
+        bad = os.path.join(self.dir, "bad.obdb")
+        with open(bad, "wb") as f:
+            f.write(b"PYOBDBL1")
+        self.assertIn("error", analyze_log(bad))
+
+    def test_find_logs_skips_segments_and_copies(self):
+        self.record("a.csv", [{"RPM": 800}])
+        self.record("b.obdb", [{"RPM": 800}], "binary")
+        open(os.path.join(self.dir, "b.csv"), "w").close()
+        manifest = self.record(None, [{"RPM": 800 + i, "COOLANT_TEMP": 90} for i in range(3000)], rotate_mb=0.02)
+        self.assertGreater(len(os.listdir(self.dir)), 4)
+
+        logs = find_logs(self.dir)
+        self.assertEqual([os.path.basename(p) for p in logs],
+                         sorted(["a.csv", "b.obdb", os.path.basename(manifest)]))
+        self.assertEqual(analyze_log(manifest)["rows"], 3000)
+
+    def test_pool_matches_serial_and_reports(self):
+        for i in range(4):
+            self.record(f"t{i}.csv", [{"RPM": 800 * (i + 1), "COOLANT_TEMP": 90} for _ in range(10)])
+        logs = find_logs(self.dir)
+        serial = analyze_logs(logs, workers=1)
+        self.assertEqual(analyze_logs(logs, workers=2), serial)
+
+        out = write_report(serial, os.path.join(self.dir, "report.csv"))
+        with open(out, newline="") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(len(rows), 5)
+        self.assertIn("RPM_max", rows[0])
+        os.remove(out)
+
+        out = os.path.join(self.dir, "report.json")
+        self.assertEqual(main([self.dir, "-o", out, "-j", "1", "--limit", "RPM=2000"]), 0)
+        with open(out) as f:
+            data = json.load(f)
+        self.assertEqual(data["summary"]["trips"], 4)
+        # No voltage column reads as 0 V, as it does on the dashboard
+        self.assertEqual(data["summary"]["trips_with_issue"],
+                         {"WARNING: Alternator output low": 4, "ALERT: RPM exceeded limit": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import random
+import numpy as np
+
+from src.formula_compiler import compile_formula, evaluate_batch, FormulaError, signed
+from src.obd_handler import OBDHandler
+
+
+def legacy_eval(formula, data_bytes):
+    """The per-sample eval() path the compiler replaces, kept as the parity reference."""
+    variables = {}
+    for i, byte_val in enumerate(data_bytes):
+        if 65 + i > 90: break
+        variables[chr(65 + i)] = byte_val
+    try:
+        allowed_names = {"min": min, "max": max, "abs": abs, "signed": signed}
+        allowed_names.update(variables)
+        return float(eval(formula, {"__builtins__": {}}, allowed_names))
+    except:
+        return None
+
+
+FORMULAS = [
+    "A", "A-40", "(A*256)+B", "((A*256)+B)/100", "((A*256)+B)*0.1", "signed(A)",
+    "signed(A)*0.75", "A*100/255", "(A*256+B)/4", "max(A, B) - min(C, D)", "abs(signed(B))",
+    "A/B", "A//3 + B%7", "(A<<8|B)/1000", "A if A < 128 else A - 256", "-A + +B", "A**2/C",
+]
+
+BATCH_FORMULAS = FORMULAS + [
+    "(A/B)//C", "(A*0.5)%(B-100)", "signed(A)/signed(B)", "min(A, B, C/2) * max(signed(D), 3)",
+    "A > 10 and B / C", "A < 5 or 100 / (B - 128)", "not A", "0 < A < 100 / (B - 1)",
+    "A * 256 * 256 * 256 * 256 * 256 * 256 * 256", "(A ^ B) & ~C", "A >> 2", "True + A",
+]
+
+
+def assert_batch_matches_scalar(test, formula, matrix, lengths=None):
+    batch = evaluate_batch(formula, matrix, lengths)
+    compiled = compile_formula(formula)
+    for i, row in enumerate(matrix):
+        row_bytes = bytes(row.tolist())
+        if lengths is not None:
+            row_bytes = row_bytes[:lengths[i]]
+        expected = compiled(row_bytes)
+        if expected is None:
+            test.assertTrue(np.isnan(batch[i]), f"{formula} on {row_bytes.hex()}: {batch[i]} != None")
+        else:
+            test.assertEqual(batch[i], expected, f"{formula} on {row_bytes.hex()}")
+
+
+class TestFormulaCompiler(unittest.TestCase):
+
+    def test_matches_legacy_eval(self):
+        rng = random.Random(1234)
+        for formula in FORMULAS:
+            compiled = compile_formula(formula)
+            for _ in range(200):
+                data = bytes(rng.randint(0, 255) for _ in range(rng.randint(0, 5)))
+                self.assertEqual(compiled(data), legacy_eval(formula, data), f"{formula} on {data.hex()}")
+
+    def test_short_response_returns_none(self):
+        self.assertIsNone(compile_formula("(A*256)+B")(b'\x01'))
+        self.assertEqual(compile_formula("(A*256)+B")(b'\x01\x02\x03'), 258.0)
+
+    def test_rejects_unsafe_formulas(self):
+        for formula in ["__import__('os')", "A.real", "().__class__", "'x'", "[A]", "lambda: 1",
+                        "open('f')", "A[0]", "AA + 1", "min(A, key=B)"]:
+            with self.assertRaises(FormulaError, msg=formula):
+                compile_formula(formula)
+
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(42)
+        matrix = rng.integers(0, 256, size=(500, 5), dtype=np.uint8)
+        matrix[:10] = 0
+        matrix[10:20] = 255
+        for formula in BATCH_FORMULAS:
+            assert_batch_matches_scalar(self, formula, matrix)
+
+    def test_batch_short_rows(self):
+        matrix = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]], dtype=np.uint8)
+        lengths = [3, 1, 2]
+        assert_batch_matches_scalar(self, "(A*256)+B", matrix, lengths)
+        self.assertTrue(np.isnan(evaluate_batch("(A*256)+B", matrix, lengths)[1]))
+        self.assertTrue(np.isnan(evaluate_batch("D", matrix)).all())
+
+    def test_handler_decode_batch(self):
+        handler = OBDHandler(simulation=True)
+        handler.set_pro_definitions({
+            "OIL": ["Oil", "C", True, True, 150, "221234", "7E0", "((A*256)+B)/100"],
+        })
+        values = handler.decode_batch("OIL", np.array([[0x0A, 0x14], [0x00, 0x00]], dtype=np.uint8))
+        self.assertEqual(values.tolist(), [25.8, 0.0])
+
+    def test_handler_compiles_pack_once(self):
+        handler = OBDHandler(simulation=True)
+        handler.set_pro_definitions({
+            "GOOD": ["Good", "", True, True, 100, "221234", "7E0", "(A*256)+B"],
+            "BAD": ["Bad", "", True, True, 100, "221235", "7E0", "__import__('os')"],
+        })
+        self.assertIsNotNone(handler.compiled_formulas["(A*256)+B"])
+        self.assertIsNone(handler.compiled_formulas["__import__('os')"])
+        self.assertEqual(handler._calculate_formula("(A*256)+B", b'\x0A\x05'), 2565)
+        self.assertIsNone(handler._calculate_formula("__import__('os')", b'\x01'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.data_logger import DataLogger
+from src.log_segments import TripManifest, SegmentReader, open_log, resolve_log, compress_file
+from src.binary_log import as_csv
+from src.replay_engine import ReplayEngine, TimeIndex
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestRotation(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.logger = DataLogger(flush_rows=10)
+        self.logger.set_directory(self.dir)
+
+    def tearDown(self):
+        self.logger.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def record(self, rows):
+        self.logger.start_new_log(["RPM", "SPEED"])
+        for i in range(rows):
+            self.logger.write_row({"RPM": 800 + i, "SPEED": i})
+            if i % 10 == 9:
+                self.logger.flush()
+        self.logger.close()
+        self.assertTrue(self.logger.wait_compression(5))
+        return TripManifest.load(self.logger.manifest_path)
+
+    def test_size_rotation_with_compression(self):
+        self.logger.set_rotation(max_mb=0.001, compression="gzip")
+        manifest = self.record(200)
+
+        self.assertGreater(len(manifest.segments), 3)
+        self.assertEqual(sum(entry["rows"] for entry in manifest.segments), 200)
+        for entry, path in zip(manifest.segments, manifest.segment_paths()):
+            self.assertTrue(path.endswith(".csv.gz"))
+            self.assertEqual(entry["compressed"], os.path.basename(path))
+            self.assertFalse(os.path.exists(os.path.join(self.dir, entry["file"])))
+
+        with open_log(manifest.path) as f:
+            rows = list(csv.reader(line.decode() for line in f))
+        self.assertEqual(rows[0], ["Timestamp", "Epoch", "Mono_ns", "RPM", "SPEED"])
+        self.assertEqual([int(r[3]) for r in rows[1:]], list(range(800, 1000)))
+
+    def test_time_rotation_without_compression(self):
+        self.logger.set_rotation(max_minutes=0.05 / 60)
+        self.logger.start_new_log(["RPM"])
+        for i in range(3):
+            self.logger.write_row({"RPM": i})
+            self.logger.flush()
+            time.sleep(0.06)
+        self.logger.close()
+
+        manifest = TripManifest.load(self.logger.manifest_path)
+        self.assertGreaterEqual(len(manifest.segments), 3)
+        self.assertTrue(all(p.endswith(".csv") for p in manifest.segment_paths()))
+
+    def test_no_rotation_keeps_single_file(self):
+        self.logger.start_new_log(["RPM"])
+        self.logger.write_row({"RPM": 1})
+        self.logger.close()
+        self.assertIsNone(self.logger.manifest_path)
+        logs = [f for f in os.listdir(self.dir) if not f.endswith(".zones.json")]
+        self.assertEqual(logs, [os.path.basename(self.logger.current_filepath)])
+
+    def test_sparse_segments_start_with_keyframe(self):
+        logger = DataLogger(flush_rows=10 ** 6, flush_interval_ms=10 ** 6)
+        logger.set_directory(self.dir)
+        logger.set_sparse(True, keyframe_seconds=3600)
+        logger.set_rotation(max_mb=0.0001)
+        logger.start_new_log(["RPM", "SPEED", "FUEL"])
+        logger.write_row({"RPM": 800, "SPEED": 50, "FUEL": 40})
+        for batch in range(3):
+            for i in range(5):
+                logger.write_row({"RPM": 900 + batch * 10 + i})
+            # The writer takes a batch; rows queued meanwhile were encoded sparse before it rotates
+            with logger._cond:
+                rows, logger._pending = logger._pending, []
+            logger.write_row({"RPM": 999})
+            logger._write(rows)
+        logger.close()
+
+        manifest = TripManifest.load(logger.manifest_path)
+        segments = [p for e, p in zip(manifest.segments, manifest.segment_paths()) if e["rows"]]
+        self.assertGreater(len(segments), 2)
+        for path in segments:
+            with open(path, newline="") as f:
+                first = list(csv.reader(f))[1]
+            self.assertEqual(first[4:], ["50", "40"], path)
+
+    def test_segment_resolves_to_manifest(self):
+        self.logger.set_rotation(max_mb=0.001, compression="gzip")
+        manifest = self.record(100)
+        segment = manifest.segment_paths()[1]
+        self.assertEqual(resolve_log(segment), manifest.path)
+
+    def test_binary_segments_replay_as_csv(self):
+        self.logger.set_format("binary", None)
+        self.logger.set_rotation(max_mb=0.001)
+        # Binary segments grow a whole chunk (1024 rows) at a time
+        manifest = self.record(2500)
+        self.assertEqual(len(manifest.segments), 3)
+
+        engine = ReplayEngine(as_csv(manifest.path), None)
+        self.assertTrue(engine.open())
+        engine.start()
+        try:
+            self.assertTrue(wait_for(lambda: engine.finished))
+            self.assertEqual(engine.get("RPM"), 3299.0)
+        finally:
+            engine.stop()
+
+
+class TestSegmentReader(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.paths = []
+        for n in range(3):
+            path = os.path.join(self.dir, f"seg{n}.csv")
+            with open(path, "w", newline="") as f:
+                f.write("Timestamp,RPM\n")
+                for i in range(5):
+                    f.write(f"10:00:{n * 5 + i:02d},{n * 5 + i}\n")
+            self.paths.append(path)
+        # Middle segment compressed, the others plain
+        self.paths[1] = compress_file(self.paths[1], "gzip")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_reads_as_one_file(self):
+        with SegmentReader(self.paths) as f:
+            lines = list(f)
+        self.assertEqual(lines[0], b"Timestamp,RPM\n")
+        self.assertEqual(len(lines), 16)
+        self.assertEqual(lines[-1], b"10:00:14,14\n")
+
+    def test_tell_and_seek(self):
+        offsets = {}
+        with SegmentReader(self.paths) as f:
+            f.readline()
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                offsets[line] = offset
+
+        with SegmentReader(self.paths) as f:
+            for line in sorted(offsets, reverse=True):
+                f.seek(offsets[line])
+                self.assertEqual(f.readline(), line)
+
+    def test_time_index_over_manifest(self):
+        manifest = TripManifest(os.path.join(self.dir, "trip_log_1.manifest.json"),
+                                {"version": 1, "format": "csv",
+                                 "segments": [{"file": os.path.basename(p)} for p in self.paths]})
+        manifest.save()
+        index = TimeIndex.build(manifest.path)
+        self.assertEqual(index.duration, 14)
+        with open_log(manifest.path) as f:
+            f.seek(index.offset_for(7))
+            self.assertEqual(f.readline(), b"10:00:07,7\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
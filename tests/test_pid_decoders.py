@@ -0,0 +1,51 @@
+import unittest
+
+import obd
+from obd.protocols import ECU
+from obd.protocols.protocol import Message
+
+from src.constants import STANDARD_SENSORS
+from src.pid_decoders import STANDARD_DECODERS, decode_standard
+
+
+def python_obd_value(key, payload):
+    """What query_sensor returned before: python-obd's decoder, magnitude rounded to 2 places."""
+    cmd = obd.commands[key]
+    message = Message([])
+    message.data = bytearray([0x41, cmd.pid]) + bytearray(payload)
+    message.ecu = ECU.ENGINE
+    value = cmd([message]).value.magnitude
+    return round(value, 2) if isinstance(value, float) else value
+
+
+def payloads(size):
+    if size == 1:
+        return [bytes([a]) for a in range(256)]
+    return [bytes([a, b]) for a in range(256) for b in (0, 1, 7, 99, 127, 128, 200, 255)]
+
+
+class TestPIDDecoders(unittest.TestCase):
+
+    def test_every_standard_sensor_has_a_decoder(self):
+        self.assertEqual(set(STANDARD_DECODERS), set(STANDARD_SENSORS))
+
+    def test_parity_with_python_obd(self):
+        for key, decoder in STANDARD_DECODERS.items():
+            for payload in payloads(decoder.size):
+                expected = python_obd_value(key, payload)
+                actual = decoder(payload)
+                self.assertEqual(actual, expected, f"{key} {payload.hex()}")
+                self.assertIs(type(actual), type(expected), f"{key} {payload.hex()}")
+
+    def test_short_payload(self):
+        self.assertIsNone(decode_standard("RPM", b"\x1A"))
+        self.assertIsNone(decode_standard("SPEED", b""))
+        self.assertIsNone(decode_standard("NOT_A_PID", b"\x01"))
+
+    def test_extra_bytes_ignored(self):
+        self.assertEqual(decode_standard("RPM", b"\x1A\xF8\x00\x00"), 1726.0)
+        self.assertEqual(decode_standard("COOLANT_TEMP", b"\x5A\xFF"), 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
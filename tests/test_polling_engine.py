@@ -0,0 +1,168 @@
+import unittest
+import threading
+import time
+from src.obd_handler import OBDHandler
+from src.sensor_store import SensorStore
+from src.polling_engine import PollingEngine
+from src.poll_scheduler import PollScheduler
+
+
+class TestSensorStore(unittest.TestCase):
+
+    def test_latest_and_history(self):
+        store = SensorStore(history_len=5)
+        store.update("RPM", 800)
+        store.update("RPM", 900)
+        self.assertEqual(store.get("RPM"), 900)
+        self.assertEqual(store.history("RPM").tolist(), [800.0, 900.0])
+
+    def test_changed_since_only_returns_new_values(self):
+        store = SensorStore()
+        store.update("RPM", 800)
+        version, changes = store.changed_since(0)
+        self.assertEqual(changes, {"RPM": 800})
+
+        store.update("SPEED", 50)
+        version, changes = store.changed_since(version)
+        self.assertEqual(changes, {"SPEED": 50})
+
+        _, changes = store.changed_since(version)
+        self.assertEqual(changes, {})
+
+    def test_concurrent_writers(self):
+        store = SensorStore()
+
+        def writer(key):
+            for i in range(1000):
+                store.update(key, i)
+
+        threads = [threading.Thread(target=writer, args=(k,)) for k in ("A", "B", "C")]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        self.assertEqual(store.version, 3000)
+        self.assertEqual(store.snapshot(), {"A": 999, "B": 999, "C": 999})
+
+
+class TestPollScheduler(unittest.TestCase):
+
+    def test_earliest_deadline_first(self):
+        sched = PollScheduler()
+        sched.configure({"RPM": 10, "COOLANT_TEMP": 0.5}, now=0)
+        self.assertEqual(sorted(sched.due(now=0)), ["COOLANT_TEMP", "RPM"])
+
+        sched.mark_polled("RPM", now=0)
+        sched.mark_polled("COOLANT_TEMP", now=0)
+        self.assertEqual(sched.due(now=0.05), [])
+        self.assertEqual(sched.due(now=0.1), ["RPM"])
+        self.assertAlmostEqual(sched.next_deadline(), 0.1)
+
+    def test_most_overdue_first(self):
+        sched = PollScheduler()
+        sched.configure({"A": 1, "B": 10}, now=0)
+        sched.mark_polled("A", now=0)
+        sched.mark_polled("B", now=0)
+        self.assertEqual(sched.due(now=1.5), ["B", "A"])
+        self.assertEqual(sched.due(now=1.5, limit=1), ["B"])
+
+    def test_reports_lagging_sensors(self):
+        sched = PollScheduler()
+        sched.configure({"RPM": 10, "FUEL_LEVEL": 0.1}, now=0)
+        for step in range(20):
+            sched.mark_polled("RPM", now=step * 0.5)
+        self.assertIn("RPM", sched.lagging())
+        self.assertNotIn("FUEL_LEVEL", sched.lagging())
+
+        target, achieved = sched.rate_report()["RPM"]
+        self.assertEqual(target, 10)
+        self.assertAlmostEqual(achieved, 2.0)
+
+    def test_reconfigure_keeps_deadlines(self):
+        sched = PollScheduler()
+        sched.configure({"RPM": 1}, now=0)
+        sched.mark_polled("RPM", now=0)
+        sched.configure({"RPM": 1, "SPEED": 1}, now=0.5)
+        self.assertEqual(sched.due(now=0.5), ["SPEED"])
+
+
+class TestPollingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=True)
+        self.handler.connect()
+        self.store = SensorStore()
+        self.cycles = []
+        self.engine = PollingEngine(self.handler, self.store, on_cycle=self.on_cycle, cycle_interval=0.01)
+
+    def on_cycle(self, snapshot, times):
+        self.cycles.append((snapshot, times))
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_poll_once_fills_store(self):
+        self.engine.set_sensors(["RPM", "SPEED", "FUEL_LEVEL"])
+        snapshot = self.engine.poll_once()
+        self.engine.flush_cycle()
+
+        self.assertIn("RPM", snapshot)
+        self.assertIn("SPEED", snapshot)
+        self.assertEqual(self.store.get("RPM"), snapshot["RPM"])
+        self.assertEqual([snap for snap, _ in self.cycles], [snapshot])
+
+    def test_values_carry_sample_times(self):
+        self.engine.set_sensors(["RPM", "SPEED"])
+        before = time.monotonic_ns()
+        snapshot = self.engine.poll_once()
+        self.engine.flush_cycle()
+
+        times = self.cycles[0][1]
+        self.assertEqual(set(times), set(snapshot))
+        for key, ns in times.items():
+            self.assertEqual(ns, self.handler.sample_times[key])
+            self.assertGreaterEqual(ns, before)
+            self.assertAlmostEqual(self.store.get_timestamp(key), ns / 1e9)
+
+    def test_fast_sensors_polled_more_often(self):
+        self.engine.set_sensors(["RPM", "FUEL_LEVEL"])
+        counts = {"RPM": 0, "FUEL_LEVEL": 0}
+        start = time.monotonic()
+        for step in range(100):
+            for key in self.engine.poll_once(now=start + step * 0.1):
+                counts[key] += 1
+
+        self.assertGreater(counts["RPM"], 50)
+        self.assertLessEqual(counts["FUEL_LEVEL"], 3)
+
+    def test_graph_sensors_are_boosted(self):
+        self.assertEqual(self.engine.rate_for("FUEL_LEVEL"), 0.1)
+        self.assertEqual(self.engine.rate_for("FUEL_LEVEL", priority=("FUEL_LEVEL",)), 10)
+
+    def test_pro_pack_declared_rate(self):
+        self.handler.set_pro_definitions({
+            "VAG_OIL_TEMP": ["Oil Temp", "C", True, True, 150, "221234", "7E0", "A-40", 0.2]
+        })
+        self.assertEqual(self.engine.rate_for("VAG_OIL_TEMP"), 0.2)
+        self.assertEqual(self.engine.rate_for("UNKNOWN_PRO_SENSOR"), 1.0)
+
+    def test_background_thread_polls(self):
+        self.engine.set_sensors(["RPM"])
+        self.engine.start()
+        time.sleep(0.1)
+        self.engine.stop()
+
+        self.assertGreater(self.engine.cycle_count, 1)
+        self.assertIsNotNone(self.store.get("RPM"))
+
+    def test_idle_when_disconnected(self):
+        self.handler.disconnect()
+        self.engine.set_sensors(["RPM"])
+        self.engine.start()
+        time.sleep(0.05)
+        self.engine.stop()
+
+        self.assertEqual(self.engine.cycle_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
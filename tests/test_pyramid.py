@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+
+from src.pyramid import SeriesPyramid, PyramidSet
+from src.sensor_store import SensorStore
+
+
+def signal(n, spike_at=None):
+    t = np.arange(n) * 0.05
+    v = np.sin(t / 10)
+    if spike_at is not None:
+        v[spike_at] = 50.0
+    return t, v
+
+
+class TestSeriesPyramid(unittest.TestCase):
+
+    def test_live_appends_match_bulk_load(self):
+        t, v = signal(23456)
+        live, bulk = SeriesPyramid(), SeriesPyramid()
+        for ti, vi in zip(t, v):
+            live.append(ti, vi)
+        bulk.extend(t, v)
+        self.assertEqual([len(level) for level in live.levels], [2345, 234, 23])
+        for a, b in zip(live.levels, bulk.levels):
+            self.assertEqual(len(a), len(b))
+            self.assertTrue(np.allclose(a.lo.view(), b.lo.view()))
+            self.assertTrue(np.allclose(a.sum.view(), b.sum.view()))
+        self.assertEqual(live.levels[2].hi.view()[0], v[:1000].max())
+
+    def test_decimation_keeps_spikes_and_tail(self):
+        t, v = signal(100003, spike_at=54321)
+        series = SeriesPyramid()
+        series.extend(t, v)
+        x, y = series.query(t[0], t[-1], 500)
+        self.assertLessEqual(len(x), 1000)
+        self.assertEqual(y.max(), 50.0)
+        self.assertEqual(y.min(), v.min())
+        # The last three samples are in no bucket yet but still drawn
+        x, y = series.query(t[-5], t[-1], 500)
+        self.assertEqual(y.tolist(), v[-5:].tolist())
+
+    def test_short_window_is_raw(self):
+        t, v = signal(5000)
+        series = SeriesPyramid()
+        series.extend(t, v)
+        x, y = series.query(10.0, 20.0, 800)
+        self.assertEqual(x.tolist(), t[200:401].tolist())
+        self.assertEqual(y.tolist(), v[200:401].tolist())
+
+    def test_mean(self):
+        series = SeriesPyramid()
+        series.extend(np.arange(2000.0), np.repeat([1.0, 3.0], 1000))
+        x, mean = series.query_mean(0, 1999, 2)
+        self.assertEqual(mean.tolist(), [1.0, 3.0])
+
+    def test_time_going_back_restarts(self):
+        series = SeriesPyramid()
+        for i in range(30):
+            series.append(100.0 + i, i)
+        series.append(50.0, 7)
+        self.assertEqual(len(series), 1)
+        self.assertEqual(series.span, (50.0, 50.0))
+
+
+    def test_bounded_pyramid_keeps_whole_span(self):
+        series = SeriesPyramid(max_samples=200)
+        values = np.sin(np.arange(100000) / 500.0)
+        values[123] = 50.0
+        for i, value in enumerate(values):
+            series.append(float(i), value)
+        self.assertLessEqual(len(series), 250)
+        for level in series.levels:
+            self.assertLessEqual(len(level), 250)
+        self.assertEqual(series.span, (0.0, 99999.0))
+
+        x, y = series.query(0, 99999, 500)
+        self.assertEqual(y.max(), 50.0)
+        self.assertAlmostEqual(y.min(), values.min())
+        # The newest samples are still drawn raw
+        x, y = series.query(99990, 99999, 500)
+        self.assertEqual(y.tolist(), values[-10:].tolist())
+
+
+class TestPyramidSet(unittest.TestCase):
+
+    def test_from_columns_skips_empty_cells(self):
+        epochs = np.arange(10.0)
+        pyramids = PyramidSet.from_columns(epochs, {"RPM": np.where(epochs % 2, np.nan, epochs)})
+        x, y = pyramids.query("RPM", 0, 9, 100)
+        self.assertEqual(y.tolist(), [0.0, 2.0, 4.0, 6.0, 8.0])
+        self.assertEqual(pyramids.span(), (0.0, 8.0))
+        self.assertEqual(len(pyramids.query("SPEED", 0, 9, 100)[0]), 0)
+
+    def test_sensor_store_feeds_pyramids(self):
+        store = SensorStore()
+        for i in range(25):
+            store.update("RPM", 800 + i, timestamp=float(i))
+        store.update("STATUS", "OK", timestamp=1.0)
+        self.assertEqual(store.pyramids.keys(), ["RPM"])
+        self.assertEqual(store.pyramids.query("RPM", 20, 30, 100)[1].tolist(), [820, 821, 822, 823, 824])
+        store.clear()
+        self.assertIsNone(store.pyramids.span())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import MagicMock
+import obd
+
+from src.obd_handler import OBDHandler
+from src.query_planner import plan_queries, count_header_switches
+
+
+HEADERS = {
+    "RPM": "7E0", "SPEED": "7E0",
+    "DPF_SOOT": "7E0", "DPF_ASH": "7E0",
+    "GEAR": "7E1", "ATF_TEMP": "7E1",
+    "BATTERY_SOC": "7E4",
+    "NO_HEADER": None,
+}
+
+
+class TestPlanQueries(unittest.TestCase):
+
+    def test_groups_by_header(self):
+        keys = ["DPF_SOOT", "GEAR", "RPM", "BATTERY_SOC", "ATF_TEMP", "DPF_ASH", "SPEED"]
+        ordered = plan_queries(keys, HEADERS.get, "7E0")
+
+        self.assertEqual(sorted(ordered), sorted(keys))
+        self.assertEqual(count_header_switches(keys, HEADERS.get, "7E0"), 5)
+        # 7E0 group first (no switch), then 7E1 and 7E4
+        self.assertEqual(count_header_switches(ordered, HEADERS.get, "7E0"), 2)
+
+    def test_current_header_first_and_default_last(self):
+        keys = ["RPM", "GEAR", "BATTERY_SOC", "NO_HEADER"]
+        ordered = plan_queries(keys, HEADERS.get, "7E4")
+
+        self.assertEqual(ordered[0], "NO_HEADER")
+        self.assertEqual(ordered[1], "BATTERY_SOC")
+        self.assertEqual(ordered[-1], "RPM")
+
+    def test_adapter_default_counts_as_engine_header(self):
+        ordered = plan_queries(["GEAR", "RPM"], HEADERS.get, None)
+        self.assertEqual(ordered, ["RPM", "GEAR"])
+
+
+class TestHeaderTracking(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = OBDHandler(simulation=False)
+        self.handler.inter_command_delay = 0
+        self.handler.status = "Connected"
+        self.handler.supported_commands = {obd.commands.RPM}
+        self.handler.set_pro_definitions({
+            "DPF_SOOT": ["Soot", "g", True, True, 50, "22114F", "7E0", "A"],
+            "DPF_ASH": ["Ash", "g", True, True, 50, "221150", "7e0", "A"],
+            "GEAR": ["Gear", "", True, True, 8, "221234", "7E1", "A"],
+        })
+
+        self.sent = []
+        response = MagicMock()
+        response.is_null.return_value = False
+        response.value.magnitude = 1000.0
+        message = MagicMock()
+        message.data = b'\x41\x0C\x0C\x80'
+        response.messages = [message]
+
+        def query(cmd, force=False):
+            self.sent.append(cmd.command)
+            return response
+
+        self.handler.connection = MagicMock()
+        self.handler.connection.query.side_effect = query
+
+    def atsh_count(self):
+        return sum(1 for c in self.sent if c.startswith(b"ATSH"))
+
+    def test_redundant_header_is_skipped(self):
+        for _ in range(3):
+            self.handler.query_sensor("DPF_SOOT")
+            self.handler.query_sensor("DPF_ASH")
+        self.assertEqual(self.sent.count(b"ATSH7E0"), 1)
+
+    def test_cycle_sets_each_header_once(self):
+        keys = ["GEAR", "DPF_SOOT", "RPM", "DPF_ASH"]
+        self.handler.query_sensors(keys)
+        self.sent.clear()
+
+        values = self.handler.query_sensors(keys)
+
+        # The cycle starts on the header the previous one ended on, so only one switch is left
+        self.assertEqual(set(values), set(keys))
+        self.assertEqual(self.atsh_count(), 1)
+        self.assertEqual(self.sent[0], b"221234")
+        self.assertEqual(self.handler.current_header, "7E0")
+
+        self.sent.clear()
+        self.handler.query_sensors(keys)
+        self.assertEqual(self.sent, [b"22114F", b"010C", b"221150", b"ATSH7E1", b"221234"])
+
+    def test_standard_pid_restores_engine_header(self):
+        self.handler.query_sensor("GEAR")
+        self.handler.query_sensor("RPM")
+        self.assertEqual(self.sent, [b"ATSH7E1", b"221234", b"ATSH7E0", b"010C"])
+
+        self.sent.clear()
+        self.handler.query_sensor("RPM")
+        self.assertEqual(self.sent, [b"010C"])
+
+
+if __name__ == '__main__':
+    unittest.main()
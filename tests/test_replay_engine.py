@@ -0,0 +1,194 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.replay_engine import ReplayEngine, TimeIndex
+from src.obd_handler import OBDHandler
+
+
+def write_log(rows, header="Timestamp,RPM,SPEED"):
+    f = tempfile.NamedTemporaryFile(delete=False, suffix=".csv", mode="w", newline="")
+    f.write(header + "\n")
+    for row in rows:
+        f.write(row + "\n")
+    f.close()
+    return f.name
+
+
+def clock(seconds):
+    seconds = int(seconds) % 86400
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTimeIndex(unittest.TestCase):
+
+    def setUp(self):
+        # Two rows per second for five minutes starting 10:00:00, RPM = elapsed seconds
+        rows = [f"{clock(36000 + i // 2)},{i // 2},{i % 2}" for i in range(600)]
+        self.path = write_log(rows)
+
+    def tearDown(self):
+        for path in (self.path, TimeIndex.path_for(self.path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_build_writes_sidecar_and_reloads(self):
+        index = TimeIndex.build(self.path)
+        self.assertEqual(index.duration, 299)
+        self.assertTrue(os.path.exists(TimeIndex.path_for(self.path)))
+
+        loaded = TimeIndex.load(self.path)
+        self.assertEqual(list(loaded.offsets), list(index.offsets))
+        self.assertEqual(loaded.first_time, 36000)
+
+    def test_offset_points_at_row(self):
+        index = TimeIndex.build(self.path)
+        with open(self.path, "rb") as f:
+            f.seek(index.offset_for(120))
+            self.assertTrue(f.readline().startswith(b"10:02:00,120,"))
+
+    def test_stale_sidecar_ignored(self):
+        TimeIndex.build(self.path)
+        with open(self.path, "a") as f:
+            f.write("10:05:00,300,0\n")
+        self.assertIsNone(TimeIndex.load(self.path))
+
+    def test_midnight_wrap(self):
+        path = write_log([clock(86398 + i) + f",{i},0" for i in range(5)])
+        try:
+            index = TimeIndex.build(path)
+            self.assertEqual(index.duration, 4)
+        finally:
+            os.remove(path)
+            os.remove(TimeIndex.path_for(path))
+
+
+class TestReplayEngine(unittest.TestCase):
+
+    def setUp(self):
+        rows = [f"{clock(36000 + i)},{1000 + i}," + ("" if i % 2 else str(i)) for i in range(100)]
+        self.path = write_log(rows)
+        self.engine = None
+
+    def tearDown(self):
+        if self.engine:
+            self.engine.stop()
+        for path in (self.path, TimeIndex.path_for(self.path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def start(self, speed):
+        self.engine = ReplayEngine(self.path, speed)
+        self.assertTrue(self.engine.open())
+        self.engine.start()
+        return self.engine
+
+    def test_real_time_holds_first_row(self):
+        engine = self.start(1.0)
+        self.assertTrue(wait_for(lambda: engine.get("RPM") is not None))
+        time.sleep(0.2)
+        self.assertEqual(engine.get("RPM"), 1000.0)
+
+    def test_max_speed_reaches_end_and_fills_gaps(self):
+        engine = self.start(None)
+        self.assertTrue(wait_for(lambda: engine.finished))
+        self.assertEqual(engine.get("RPM"), 1099.0)
+        # The last row has an empty SPEED cell, so the previous value is kept
+        self.assertEqual(engine.get("SPEED"), 98.0)
+        self.assertEqual(engine.position, 99)
+
+    def test_seek(self):
+        engine = self.start(1.0)
+        self.assertTrue(wait_for(lambda: engine.index is not None))
+        self.assertTrue(engine.seek(50))
+        self.assertTrue(wait_for(lambda: engine.get("RPM") == 1050.0))
+        self.assertEqual(engine.position, 50)
+
+    def test_epoch_and_sample_time_columns(self):
+        rows = [f"{clock(36000 + i)},{1.7e9 + i * 0.25:.6f},{5_000_000_000 + i * 250_000_000},"
+                f"{1000 + i},{i},{5_000_000_000 + i * 250_000_000 - 100_000_000}," for i in range(8)]
+        path = write_log(rows, header="Timestamp,Epoch,Mono_ns,RPM,SPEED,RPM_ns,SPEED_ns")
+        try:
+            self.engine = ReplayEngine(path, None)
+            self.assertTrue(self.engine.open())
+            self.assertEqual(self.engine.headers, ["RPM", "SPEED"])
+            self.engine.start()
+            self.assertTrue(wait_for(lambda: self.engine.finished))
+
+            self.assertEqual(self.engine.get("RPM"), 1007.0)
+            self.assertAlmostEqual(self.engine.position, 1.75)
+            row_ns = (1.7e9 + 7 * 0.25) * 1e9
+            # RPM was sampled 100 ms before its row was written; SPEED has no sample time
+            self.assertAlmostEqual(self.engine.sample_time_ns("RPM"), row_ns - 100_000_000, delta=1000)
+            self.assertAlmostEqual(self.engine.sample_time_ns("SPEED"), row_ns, delta=1000)
+        finally:
+            self.engine.stop()
+            for p in (path, TimeIndex.path_for(path)):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def test_seek_fills_sparse_values(self):
+        # FUEL only in keyframes (every 10 s); seeking between them must still show it
+        rows = [f"{clock(36000 + i)},{1000 + i}," + (str(50 - i // 10) if i % 10 == 0 else "") for i in range(100)]
+        path = write_log(rows, header="Timestamp,RPM,FUEL")
+        try:
+            self.engine = ReplayEngine(path, 1.0)
+            self.assertTrue(self.engine.open())
+            self.engine.start()
+            self.assertTrue(wait_for(lambda: self.engine.index is not None))
+            self.assertTrue(self.engine.seek(57))
+            self.assertTrue(wait_for(lambda: self.engine.get("RPM") == 1057.0))
+            self.assertEqual(self.engine.get("FUEL"), 45.0)
+        finally:
+            self.engine.stop()
+            for p in (path, TimeIndex.path_for(path)):
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def test_speed_change(self):
+        engine = self.start(1.0)
+        self.assertTrue(wait_for(lambda: engine.get("RPM") is not None))
+        engine.set_speed(100.0)
+        self.assertTrue(wait_for(lambda: engine.get("RPM") >= 1010.0, timeout=1.0))
+
+
+class TestHandlerReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.path = write_log([f"{clock(36000 + i)},{800 + i},{i}" for i in range(10)])
+        self.handler = OBDHandler()
+
+    def tearDown(self):
+        self.handler.stop_replay()
+        for path in (self.path, TimeIndex.path_for(self.path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_replay_serves_queries(self):
+        self.assertTrue(self.handler.start_replay(self.path, speed=None))
+        self.assertTrue(self.handler.is_connected())
+        self.assertTrue(self.handler.check_supported("RPM"))
+        self.assertFalse(self.handler.check_supported("MAF"))
+        self.assertTrue(wait_for(lambda: self.handler.query_sensor("RPM") == 809.0))
+        self.assertEqual(self.handler.query_sensors(["RPM", "SPEED", "MAF"]), {"RPM": 809.0, "SPEED": 9.0})
+
+    def test_disconnect_stops_replay(self):
+        self.handler.start_replay(self.path)
+        self.handler.disconnect()
+        self.assertFalse(self.handler.replay_mode)
+        self.assertFalse(self.handler.replay_active)
+        self.assertEqual(self.handler.status, "Disconnected")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+
+from src.ring_buffer import RingBuffer
+from src.sensor_store import SensorStore
+from src.dyno_engine import DynoEngine
+from src.diagnostic_engine import DiagnosticEngine
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_wraparound_keeps_order(self):
+        ring = RingBuffer(4)
+        for i in range(10):
+            ring.append(float(i), i * 10.0)
+        t, v = ring.view()
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.dropped, 6)
+        self.assertEqual(t.tolist(), [6.0, 7.0, 8.0, 9.0])
+        self.assertEqual(v.tolist(), [60.0, 70.0, 80.0, 90.0])
+
+    def test_view_is_read_only_and_not_a_copy(self):
+        ring = RingBuffer(3)
+        for i in range(5):
+            ring.append(float(i), float(i))
+        t, v = ring.view()
+        self.assertFalse(v.flags.writeable)
+        self.assertTrue(np.shares_memory(v, ring._v))
+        self.assertTrue(v.flags.c_contiguous)
+
+    def test_since_and_latest(self):
+        ring = RingBuffer(100)
+        for i in range(20):
+            ring.append(i * 0.5, float(i))
+        t, v = ring.since(7.0)
+        self.assertEqual(t[0], 7.0)
+        self.assertEqual(v.tolist(), [14.0, 15.0, 16.0, 17.0, 18.0, 19.0])
+        self.assertEqual(ring.latest(2).tolist(), [18.0, 19.0])
+        self.assertEqual(len(ring.latest(0)), 0)
+
+    def test_time_going_back_starts_over(self):
+        ring = RingBuffer(10)
+        for i in range(5):
+            ring.append(float(i), 1.0)
+        ring.append(1.5, 2.0)
+        self.assertEqual(ring.view()[0].tolist(), [1.5])
+
+    def test_memory_is_fixed(self):
+        ring = RingBuffer(1000)
+        size = ring.nbytes
+        for i in range(5000):
+            ring.append(float(i), float(i))
+        self.assertEqual(ring.nbytes, size)
+        self.assertEqual(size, 32 * 1000)
+
+
+class TestBoundedHistory(unittest.TestCase):
+
+    def test_sensor_store_retention(self):
+        store = SensorStore(retention_seconds=1)
+        for i in range(store.history_len * 3):
+            store.update("RPM", 1000 + i, timestamp=i * 0.05)
+        t, v = store.series("RPM")
+        self.assertEqual(len(v), store.history_len)
+        self.assertEqual(v[-1], 1000 + store.history_len * 3 - 1)
+        self.assertEqual(store.series("RPM", since=t[-2])[1].tolist(), v[-2:].tolist())
+        store.update("DTC", "P0300")
+        self.assertEqual(len(store.history("DTC")), 0)
+
+    def test_sensor_store_history_is_the_pyramid_ring(self):
+        store = SensorStore(history_len=100)
+        for i in range(250):
+            store.update("RPM", float(i), timestamp=float(i))
+        ring = store.pyramids._series["RPM"].raw
+        v = store.history("RPM")
+        self.assertEqual(ring.nbytes, 32 * 100)
+        self.assertFalse(v.flags.writeable)
+        self.assertTrue(np.shares_memory(v, ring._v))
+        self.assertEqual(v.tolist(), [float(i) for i in range(150, 250)])
+        # The graph still reaches back past the ring through the summaries
+        self.assertEqual(store.pyramids.span("RPM"), (0.0, 249.0))
+
+    def test_dyno_takes_every_sample_between_frames(self):
+        store = SensorStore()
+        dyno = DynoEngine()
+        points = []
+        for frame in range(4):
+            # Five polls land between two UI frames
+            for i in range(5):
+                t = frame * 1.0 + i * 0.2
+                store.update("RPM", 2000 + 100 * (frame * 5 + i), timestamp=t)
+                store.update("SPEED", 20 + 2 * (frame * 5 + i), timestamp=t)
+            points += dyno.calculate_series(1500, store.series("SPEED"), store.series("RPM"))
+        self.assertEqual(len(points), 20)
+        self.assertEqual([p[0] for p in points], [2000.0 + 100 * i for i in range(20)])
+        self.assertGreater(dyno.peak_hp, 0)
+        self.assertEqual(dyno.calculate_series(1500, store.series("SPEED"), store.series("RPM")), [])
+
+    def test_analysis_reads_recent_median(self):
+        store = SensorStore()
+        for i in range(100):
+            store.update("COOLANT_TEMP", 90.0 if i != 95 else 300.0, timestamp=i * 0.5)
+        self.assertEqual(DiagnosticEngine.recent_value(store.series("COOLANT_TEMP"), now=50.0), 90.0)
+        self.assertIsNone(DiagnosticEngine.recent_value(store.series("COOLANT_TEMP"), now=500.0))
+        self.assertIsNone(DiagnosticEngine.recent_value(store.series("RPM")))
+
+
+if __name__ == "__main__":
+    unittest.main()
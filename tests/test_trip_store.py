@@ -0,0 +1,118 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.trip_store import TripStore, parse_condition, group_windows, main
+from src.binary_log import BinaryLogWriter
+from src.data_logger import DataLogger
+
+KEYS = ["COOLANT_TEMP", "SPEED"]
+
+
+def drive(n, start=1.7e9, hot_from=50):
+    # One row per second; the engine overheats from row `hot_from` and SPEED is only logged every 5 s
+    return [(start + i, 0, [90 + (25 if i >= hot_from else 0), 100 if i % 5 == 0 else ""], None)
+            for i in range(n)]
+
+
+class TestTripStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = TripStore(os.path.join(self.dir, "trips.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_write_and_window(self):
+        trip = self.store.begin_trip("trip_a", KEYS, "WVWZZZ", 1.7e9)
+        self.assertEqual(self.store.write_rows(trip, KEYS, drive(100)), 120)
+        self.store.end_trip(trip, 1.7e9 + 99)
+
+        info = self.store.trips()[0]
+        self.assertEqual((info["name"], info["vehicle"], info["sensors"]), ("trip_a", "WVWZZZ", KEYS))
+        data = self.store.window(trip, ["SPEED", "RPM"], 1.7e9 + 10, 1.7e9 + 20)
+        self.assertEqual([t - 1.7e9 for t, _ in data["SPEED"]], [10, 15, 20])
+        self.assertEqual(data["RPM"], [])
+
+    def test_exact_sample_times(self):
+        trip = self.store.begin_trip("trip_a", KEYS)
+        self.store.write_rows(trip, KEYS, [(1000.0, 5_000_000_000, [90, 80], [4_750_000_000, ""])])
+        data = self.store.window(trip, KEYS)
+        self.assertEqual(data["COOLANT_TEMP"][0][0], 999.75)
+        self.assertEqual(data["SPEED"][0][0], 1000.0)
+
+    def test_find_uses_latest_value_of_other_sensors(self):
+        trip = self.store.begin_trip("trip_a", KEYS)
+        self.store.write_rows(trip, KEYS, drive(100))
+        other = self.store.begin_trip("trip_b", KEYS)
+        self.store.write_rows(other, KEYS, drive(100, hot_from=1000))
+
+        moments = self.store.find([parse_condition("COOLANT_TEMP>110"), parse_condition("SPEED>=80")])
+        self.assertEqual(len(moments), 50)
+        self.assertEqual({m[0] for m in moments}, {trip})
+        self.assertEqual(moments[1][2], {"COOLANT_TEMP": 115.0, "SPEED": 100.0})
+        self.assertEqual([(w[0], w[1] - 1.7e9, w[2] - 1.7e9, w[3]) for w in group_windows(moments)],
+                         [(trip, 50, 99, 50)])
+
+        self.assertEqual(self.store.find([("COOLANT_TEMP", ">", 110), ("RPM", ">", 0)]), [])
+        with self.assertRaises(ValueError):
+            self.store.find([("SPEED", "; DROP TABLE samples", 1)])
+
+    def test_import_csv_and_binary(self):
+        src = os.path.join(self.dir, "trip_log_1.csv")
+        with open(src, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Epoch", "Mono_ns"] + KEYS + ["SPEED_ns"])
+            for epoch, _, values, _ in drive(10):
+                writer.writerow([time.strftime("%H:%M:%S", time.localtime(epoch)), epoch, 0] + values + [""])
+        trip = self.store.import_log(src)
+        self.assertEqual(self.store.trips()[0]["sensors"], KEYS)
+        self.assertEqual(len(self.store.window(trip, ["SPEED"])["SPEED"]), 2)
+
+        binary = os.path.join(self.dir, "trip_log_2.obdb")
+        writer = BinaryLogWriter(binary, KEYS)
+        writer.write_rows(drive(10))
+        writer.close()
+        trip = self.store.import_log(binary)
+        self.assertEqual(len(self.store.window(trip, ["COOLANT_TEMP"])["COOLANT_TEMP"]), 10)
+
+    def test_cli(self):
+        db = os.path.join(self.dir, "cli.db")
+        self.assertEqual(main([db, "trips"]), 0)
+        self.assertEqual(main([db, "find", "SPEED"]), 1)
+        self.assertEqual(main([db]), 2)
+
+
+class TestDataLoggerTripStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.store = TripStore(os.path.join(self.dir, "trips.db"))
+        self.logger = DataLogger()
+        self.logger.set_directory(self.dir)
+        self.logger.set_trip_store(self.store, "VIN123")
+
+    def tearDown(self):
+        self.logger.close()
+        self.store.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_logger_writes_trip(self):
+        self.logger.start_new_log(KEYS)
+        for i in range(20):
+            self.logger.write_row({"COOLANT_TEMP": 90 + i, "SPEED": i})
+        self.logger.close()
+
+        trip = self.store.trips()[0]
+        self.assertEqual(trip["vehicle"], "VIN123")
+        self.assertIsNotNone(trip["ended"])
+        self.assertEqual(len(self.store.find([("COOLANT_TEMP", ">=", 100)], [trip["id"]])), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from src.ui.refresh import FrameClock, WidgetState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingWidget:
+    def __init__(self):
+        self.calls = []
+
+    def configure(self, **options):
+        self.calls.append(options)
+
+
+class TestFrameClock(unittest.TestCase):
+
+    def test_frame_time_does_not_slow_the_rate(self):
+        clock = FakeClock()
+        frames = FrameClock(20, clock=clock)
+        self.assertEqual(frames.next_delay(), 50)
+        clock.now += 0.050 + 0.030  # the frame took 30 ms
+        self.assertEqual(frames.next_delay(), 20)
+        clock.now += 0.020 + 0.005
+        self.assertEqual(frames.next_delay(), 45)
+
+    def test_missed_frames_are_skipped(self):
+        clock = FakeClock()
+        frames = FrameClock(10, clock=clock)
+        frames.next_delay()
+        clock.now += 0.350  # a stall of several frames
+        self.assertEqual(frames.next_delay(), 50)
+
+
+class TestWidgetState(unittest.TestCase):
+
+    def test_only_changed_options_reach_the_widget(self):
+        state = WidgetState()
+        button = RecordingWidget()
+        self.assertTrue(state.configure(button, state="normal", text="CLEAR CODES"))
+        for _ in range(10):
+            self.assertFalse(state.configure(button, state="normal", text="CLEAR CODES"))
+        state.configure(button, state="disabled", text="CLEAR CODES")
+        self.assertEqual(button.calls, [{"state": "normal", "text": "CLEAR CODES"}, {"state": "disabled"}])
+
+    def test_forget_configures_again(self):
+        state = WidgetState()
+        button = RecordingWidget()
+        state.configure(button, text="A")
+        state.forget(button)
+        state.configure(button, text="A")
+        self.assertEqual(len(button.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
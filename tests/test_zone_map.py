@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.zone_map import ZoneMap, ZoneMapBuilder, zone_path, parse_condition
+from src.data_logger import DataLogger
+from src.replay_engine import ReplayEngine
+from src.fleet_report import analyze_log, analyze_logs, find_logs
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def coolant(i):
+    # Overheats for rows 2500-2599 only
+    return 118 if 2500 <= i < 2600 else 90
+
+
+class TestZoneMap(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def record(self, rows=3000, **rotation):
+        logger = DataLogger(flush_rows=400)
+        logger.set_directory(self.dir)
+        logger.zone_block_rows = 500
+        logger.set_rotation(**rotation)
+        logger.start_new_log(["COOLANT_TEMP", "SPEED", "STATUS"])
+        for i in range(rows):
+            logger.write_row({"COOLANT_TEMP": coolant(i), "SPEED": i % 100, "STATUS": "OK"})
+        logger.close()
+        return logger
+
+    def test_logger_writes_blocks(self):
+        logger = self.record()
+        path = logger.current_filepath
+        self.assertTrue(os.path.exists(zone_path(path)))
+
+        zones = ZoneMap.load(path)
+        self.assertTrue(zones.complete)
+        self.assertEqual(zones.rows, 3000)
+        self.assertEqual([b["row"] for b in zones.blocks], [0, 500, 1000, 1500, 2000, 2500])
+        self.assertEqual(zones.blocks[0]["min"][:2], [90.0, 0.0])
+        self.assertEqual(zones.blocks[0]["count"], [500, 500, 0])
+
+        self.assertEqual(zones.candidate_blocks("COOLANT_TEMP", ">", 110), [5])
+        self.assertEqual(zones.candidate_blocks("SPEED", ">=", 99), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(zones.candidate_blocks("STATUS", "=", 1), [])
+        self.assertFalse(zones.may_match([parse_condition("COOLANT_TEMP<80")]))
+        self.assertEqual(zones.value_range("COOLANT_TEMP"), (90.0, 118.0))
+        self.assertEqual(zones.value_range("COOLANT_TEMP", end=zones.blocks[4]["end"]), (90.0, 90.0))
+
+    def test_segmented_trip_has_one_zone_map(self):
+        logger = self.record(max_mb=0.02)
+        zones = ZoneMap.load(logger.manifest_path)
+        self.assertEqual(zones.path, zone_path(logger.current_filepath))
+        self.assertEqual(zones.rows, 3000)
+
+    def test_unfinished_trip_keeps_tail_searchable(self):
+        builder = ZoneMapBuilder(os.path.join(self.dir, "t.zones.json"), ["RPM"], block_rows=2)
+        self.assertTrue(builder.add_rows([(10.0, 0, [800], None), (11.0, 0, [""], None), (12.0, 0, [900], None)]))
+        builder.save()
+        zones = ZoneMap.load(builder.path)
+        self.assertEqual(zones.blocks[0]["count"], [1])
+        self.assertTrue(zones.may_match([("RPM", ">", 5000)]))
+        self.assertEqual(zones.time_ranges("RPM", ">", 5000), [(11.0, None)])
+
+    def test_from_columns_matches_builder(self):
+        logger = self.record(rows=1200)
+        built = ZoneMap.load(logger.current_filepath)
+        epochs = np.array([b["start"] for b in built.blocks])
+        zones = ZoneMap.from_columns(np.arange(1200.0), {"COOLANT_TEMP": np.full(1200, 90.0),
+                                                         "SPEED": np.arange(1200.0) % 100}, block_rows=500)
+        self.assertEqual(len(epochs), len(zones.blocks))
+        self.assertEqual([b["max"][1] for b in zones.blocks], [b["max"][1] for b in built.blocks])
+
+    def test_replay_find_next(self):
+        logger = self.record()
+        engine = ReplayEngine(logger.current_filepath, speed=None)
+        self.assertTrue(engine.open())
+        engine.start()
+        try:
+            self.assertTrue(wait_for(lambda: engine.index is not None))
+            self.assertIsNotNone(engine.zones)
+            first = engine.find_next("COOLANT_TEMP", ">", 110, after=0)
+            self.assertIsNotNone(first)
+            self.assertIsNone(engine.find_next("COOLANT_TEMP", ">", 110, after=engine.index.duration))
+            self.assertIsNone(engine.find_next("COOLANT_TEMP", "<", 50, after=0))
+        finally:
+            engine.stop()
+
+    def test_fleet_report_where(self):
+        logger = self.record()
+        # Both trips may start within the same second
+        hot = os.path.join(self.dir, "hot.csv")
+        os.rename(zone_path(logger.current_filepath), zone_path(hot))
+        os.rename(logger.current_filepath, hot)
+        self.assertEqual(len(analyze_logs([hot], workers=1, where=[("COOLANT_TEMP", ">", 110)])), 1)
+
+        # Ruled out by the zone map alone: the log itself is never opened
+        with open(hot, "w") as f:
+            f.write("garbage")
+        self.assertIsNone(analyze_log(hot, where=[("COOLANT_TEMP", "<", 50)]))
+
+        os.remove(zone_path(hot))
+        self.record(rows=100)
+        cold = [p for p in find_logs(self.dir) if p != hot][0]
+        self.assertIsNone(analyze_log(cold, where=[("COOLANT_TEMP", ">", 110)]))
+        os.remove(zone_path(cold))
+        self.assertIsNone(analyze_log(cold, where=[("COOLANT_TEMP", ">", 110)]))
+        # A zone map is written for logs that had none
+        self.assertTrue(os.path.exists(zone_path(cold)))
+
+
+if __name__ == '__main__':
+    unittest.main()